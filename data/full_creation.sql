@@ -5,7 +5,7 @@ CREATE DATABASE IF NOT EXISTS soccer_analytics;
 USE soccer_analytics;
 
 -- Drop existing objects if they exist (for easy re-execution)
-DROP TABLE IF EXISTS match_team_statistics, match_lineups, player_match_statistics, video_segments, match_events, analysis_reports, staff, players, matches, teams, users, formations, reunions, training_sessions, events;
+DROP TABLE IF EXISTS analysis_jobs, match_team_statistics, match_lineups, player_match_statistics, video_segments, match_events, analysis_reports, staff, players, matches, teams, users, formations, reunions, training_sessions, events;
 
 -- Independent Tables
 CREATE TABLE users (
@@ -78,6 +78,7 @@ CREATE TABLE players (
     country_code CHAR(2),
     image_url VARCHAR(255) NULL,
     market_value DECIMAL(10,2),
+    INDEX idx_players_team_name (team_id, name),
     FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE
 );
 
@@ -99,6 +100,8 @@ CREATE TABLE matches (
     home_score TINYINT UNSIGNED DEFAULT 0,
     away_score TINYINT UNSIGNED DEFAULT 0,
     event_id CHAR(36),
+    INDEX idx_matches_home_date (home_team_id, date_time),
+    INDEX idx_matches_away_date (away_team_id, date_time),
     FOREIGN KEY (home_team_id) REFERENCES teams(id),
     FOREIGN KEY (away_team_id) REFERENCES teams(id),
     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE SET NULL
@@ -112,6 +115,7 @@ CREATE TABLE match_events (
     minute SMALLINT UNSIGNED NOT NULL,
     video_timestamp FLOAT,
     coordinates VARCHAR(50),
+    INDEX idx_match_events_match_minute (match_id, minute),
     FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
     FOREIGN KEY (player_id) REFERENCES players(id)
 );
@@ -140,6 +144,8 @@ CREATE TABLE player_match_statistics (
     defensive_coverage_km DECIMAL(5,2) DEFAULT 0.0,
     notes TEXT,
     rating DECIMAL(3,1),
+    INDEX idx_pms_match_player (match_id, player_id),
+    INDEX idx_pms_player_match (player_id, match_id),
     FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
     FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE CASCADE
 );
@@ -151,6 +157,7 @@ CREATE TABLE analysis_reports (
     report_data JSON,
     generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     generated_by CHAR(36),
+    INDEX idx_analysis_reports_match_generated (match_id, generated_at),
     FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
     FOREIGN KEY (generated_by) REFERENCES users(id)
 );
@@ -164,6 +171,7 @@ CREATE TABLE video_segments (
     end_time_sec FLOAT NOT NULL,
     description VARCHAR(255),
     video_url VARCHAR(255),
+    INDEX idx_video_segments_match_start (match_id, start_time_sec),
     FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
     FOREIGN KEY (event_id) REFERENCES match_events(id) ON DELETE SET NULL,
     FOREIGN KEY (analysis_report_id) REFERENCES analysis_reports(id) ON DELETE SET NULL
@@ -177,6 +185,7 @@ CREATE TABLE match_lineups (
     is_starting BOOLEAN NOT NULL,
     player_id CHAR(36) NOT NULL,
     position_in_formation VARCHAR(50),
+    INDEX idx_match_lineups_match_team (match_id, team_id),
     FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
     FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE,
     FOREIGN KEY (formation_id) REFERENCES formations(id) ON DELETE SET NULL,
@@ -198,10 +207,30 @@ CREATE TABLE match_team_statistics (
     transition_speed_data JSON,
     build_up_patterns JSON,
     defensive_block_patterns JSON,
+    physical_data JSON,
+    INDEX idx_mts_match_team (match_id, team_id),
     FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
     FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE
 );
 
+CREATE TABLE analysis_jobs (
+    id CHAR(36) PRIMARY KEY,
+    match_id CHAR(36),
+    user_id CHAR(36),
+    status ENUM('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED') NOT NULL DEFAULT 'PENDING',
+    progress_percent DECIMAL(5,2) DEFAULT 0.0,
+    runner VARCHAR(100),
+    result JSON,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL,
+    INDEX idx_analysis_jobs_status_runner (status, runner),
+    INDEX idx_analysis_jobs_match (match_id, created_at),
+    FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+);
+
 -- UUID Triggers (add after all tables exist)
 DELIMITER //
 CREATE TRIGGER before_users_insert BEFORE INSERT ON users FOR EACH ROW
@@ -234,6 +263,8 @@ CREATE TRIGGER before_events_insert BEFORE INSERT ON events FOR EACH ROW
 BEGIN IF NEW.id IS NULL THEN SET NEW.id = UUID(); END IF; END//
 CREATE TRIGGER before_match_team_statistics_insert BEFORE INSERT ON match_team_statistics FOR EACH ROW
 BEGIN IF NEW.id IS NULL THEN SET NEW.id = UUID(); END IF; END//
+CREATE TRIGGER before_analysis_jobs_insert BEFORE INSERT ON analysis_jobs FOR EACH ROW
+BEGIN IF NEW.id IS NULL THEN SET NEW.id = UUID(); END IF; END//
 DELIMITER ;
 
 -- End of schema & triggers
@@ -0,0 +1,15 @@
+-- V0001 down: drop the query indexes.
+--
+-- An index that currently backs a foreign key cannot be dropped on its own, so a
+-- plain index on the foreign key column is added back in the same statement.
+
+ALTER TABLE video_segments ADD INDEX match_id (match_id), DROP INDEX idx_video_segments_match_start, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE analysis_reports ADD INDEX match_id (match_id), DROP INDEX idx_analysis_reports_match_generated, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE match_lineups ADD INDEX match_id (match_id), DROP INDEX idx_match_lineups_match_team, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE match_team_statistics ADD INDEX match_id (match_id), DROP INDEX idx_mts_match_team, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE player_match_statistics ADD INDEX player_id (player_id), DROP INDEX idx_pms_player_match, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE player_match_statistics ADD INDEX match_id (match_id), DROP INDEX idx_pms_match_player, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE match_events ADD INDEX match_id (match_id), DROP INDEX idx_match_events_match_minute, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE matches ADD INDEX away_team_id (away_team_id), DROP INDEX idx_matches_away_date, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE matches ADD INDEX home_team_id (home_team_id), DROP INDEX idx_matches_home_date, ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE players ADD INDEX team_id (team_id), DROP INDEX idx_players_team_name, ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,37 @@
+-- V0001: composite indexes for the services' hot queries.
+--
+-- Each index is built online (ALGORITHM=INPLACE, LOCK=NONE): reads and writes on
+-- the table continue while it is built. InnoDB appends the primary key (id) to every
+-- secondary index, so (a, b) also serves ORDER BY a, b, id keyset pages.
+-- Where a new index starts with a foreign key column, the index InnoDB created
+-- for the foreign key is dropped automatically.
+--
+-- Already covered, nothing added: users WHERE email (UNIQUE), teams WHERE user_id
+-- and formations WHERE user_id (foreign key indexes, id appended).
+
+-- players WHERE team_id IN (...) ORDER BY name, id
+ALTER TABLE players ADD INDEX idx_players_team_name (team_id, name), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- matches WHERE home_team_id IN (...) OR away_team_id IN (...) ORDER BY date_time DESC:
+-- one index per side of the OR so MySQL can union both ranges (index_merge).
+ALTER TABLE matches ADD INDEX idx_matches_home_date (home_team_id, date_time), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE matches ADD INDEX idx_matches_away_date (away_team_id, date_time), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- match_events WHERE match_id = ? ORDER BY minute
+ALTER TABLE match_events ADD INDEX idx_match_events_match_minute (match_id, minute), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- player_match_statistics by match (details, persistence) and by player (history)
+ALTER TABLE player_match_statistics ADD INDEX idx_pms_match_player (match_id, player_id), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE player_match_statistics ADD INDEX idx_pms_player_match (player_id, match_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- match_team_statistics WHERE match_id = ? AND team_id = ? (analytics upsert)
+ALTER TABLE match_team_statistics ADD INDEX idx_mts_match_team (match_id, team_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- match_lineups WHERE match_id = ? [AND team_id = ?]
+ALTER TABLE match_lineups ADD INDEX idx_match_lineups_match_team (match_id, team_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- analysis_reports per match, newest first
+ALTER TABLE analysis_reports ADD INDEX idx_analysis_reports_match_generated (match_id, generated_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- video_segments per match in time order
+ALTER TABLE video_segments ADD INDEX idx_video_segments_match_start (match_id, start_time_sec), ALGORITHM=INPLACE, LOCK=NONE;
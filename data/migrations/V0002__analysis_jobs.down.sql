@@ -0,0 +1,3 @@
+-- V0002 down: drop the analysis job queue table.
+
+DROP TABLE IF EXISTS analysis_jobs;
@@ -0,0 +1,21 @@
+-- V0002: analysis job queue table (persistent video analysis jobs).
+--
+-- IF NOT EXISTS: databases that ran the former ad-hoc create script already have it.
+
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id CHAR(36) PRIMARY KEY,
+    match_id CHAR(36),
+    user_id CHAR(36),
+    status ENUM('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED') NOT NULL DEFAULT 'PENDING',
+    progress_percent DECIMAL(5,2) DEFAULT 0.0,
+    runner VARCHAR(100),
+    result JSON,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL,
+    INDEX idx_analysis_jobs_status_runner (status, runner),
+    INDEX idx_analysis_jobs_match (match_id, created_at),
+    FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+);
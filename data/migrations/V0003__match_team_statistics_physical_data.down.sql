@@ -0,0 +1,3 @@
+-- V0003 down: drop the tracking analytics column.
+
+ALTER TABLE match_team_statistics DROP COLUMN physical_data;
@@ -0,0 +1,7 @@
+-- V0003: tracking analytics per team on match_team_statistics.
+--
+-- A nullable column is added with ALGORITHM=INSTANT: only the table metadata
+-- changes, so the table is not rebuilt. A database that already has the column
+-- (from the former ad-hoc script) runs `migrate.py up --to 2`, then `baseline --to 3`.
+
+ALTER TABLE match_team_statistics ADD COLUMN physical_data JSON, ALGORITHM=INSTANT;
@@ -0,0 +1,94 @@
+"""Startup benchmark: how long a fresh interpreter takes to import the API.
+
+Each run imports `app` in a new process (the cost a worker pays on every deploy or
+restart), and the median is compared against --max-seconds so a slow new import at
+module level fails CI instead of going unnoticed:
+
+    python scripts/bench_startup.py --runs 7 --max-seconds 1.5
+
+--first-request also times the lifespan plus one GET / through the TestClient
+(this needs the database to be reachable). --top lists the slowest imports of one
+extra run, from `python -X importtime`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import time
+started = time.perf_counter()
+import app
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    client.get('/').raise_for_status()
+print(time.perf_counter() - started)
+"""
+
+
+def _run(snippet: str, env: dict) -> float:
+    result = subprocess.run([sys.executable, '-c', snippet], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"benchmark run failed with exit code {result.returncode}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int):
+    """(cumulative seconds, module) of the `top` slowest top-level imports of `app`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=False)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Direct imports of `app` are indented by exactly one level.
+        if name.startswith('   ') and not name.startswith('     '):
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=None, help='Fail when the median is above this')
+    parser.add_argument('--first-request', action='store_true', help='Time startup up to the first response')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list (0 to skip)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SRC_DIR, env.get('PYTHONPATH')]))
+    # Measure the API itself, not a model load.
+    env.setdefault('DETECTION_PRELOAD', 'lazy')
+
+    snippet = FIRST_REQUEST_SNIPPET if args.first_request else IMPORT_SNIPPET
+    timings = [_run(snippet, env) for _ in range(max(1, args.runs))]
+    median = statistics.median(timings)
+    label = 'first response' if args.first_request else 'import app'
+    print(f"{label}: median {median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s over {len(timings)} runs")
+
+    if args.top:
+        print("Slowest imports:")
+        for seconds, name in slowest_imports(env, args.top):
+            print(f"  {seconds:8.3f}s  {name}")
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAIL: {label} took {median:.3f}s, limit is {args.max_seconds:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""EXPLAIN regression check for the services' hot queries.
+
+Runs EXPLAIN on each query below against the configured database (DB_* variables)
+and fails when an index the query relies on is missing or not applicable, or when a
+table is read with a full scan over more than --max-scan-rows estimated rows:
+
+    python scripts/explain_check.py --max-scan-rows 1000
+
+The list and page queries come from the services themselves (their KeysetQuery
+builders), so a changed ORDER BY or filter is checked as it ships. On a nearly
+empty database MySQL may still choose a scan for tiny tables, which is why scans
+only fail above the row threshold; the index checks hold at any size.
+"""
+import argparse
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pymysql
+
+from database import DB_CONFIG
+from pagination import PageParams
+from services.analysis_report_service import _REPORT_LIST
+from services.match_event_service import _EVENT_LIST
+from services.match_service import _MATCH_LIST, _match_filters
+from services.player_service import _PLAYER_LIST
+from services.team_service import _SELECT_USER_TEAM_IDS_SQL
+from services.user_service import _SELECT_USER_BY_EMAIL_SQL
+from services.video_segment_service import _SEGMENT_LIST
+
+# Placeholder values: EXPLAIN plans the query without needing matching rows.
+TEAM_IDS = [str(uuid.uuid4()), str(uuid.uuid4())]
+MATCH_ID = str(uuid.uuid4())
+PLAYER_ID = str(uuid.uuid4())
+USER_ID = str(uuid.uuid4())
+
+SCOPE = "(m.home_team_id IN %s OR m.away_team_id IN %s)"
+
+
+def _page(query, where, params, after=None):
+    page = PageParams(cursor=None, limit=100, fields=None, include_total=False)
+    page.after = after
+    return query.page_sql(where, params, page)
+
+
+def checks():
+    """(name, sql, params, {table alias: index the plan must be able to use})."""
+    match_where, match_params = _match_filters(TEAM_IDS)
+    return [
+        ("user by email", _SELECT_USER_BY_EMAIL_SQL, ('coach@example.com',), {'users': 'email'}),
+        ("team ids of user", _SELECT_USER_TEAM_IDS_SQL, (USER_ID,), {'teams': None}),
+        ("player list", *_page(_PLAYER_LIST, "team_id IN %s", (TEAM_IDS,)), {'players': 'idx_players_team_name'}),
+        ("player list, next page", *_page(_PLAYER_LIST, "team_id IN %s", (TEAM_IDS,), ['M', PLAYER_ID]),
+         {'players': 'idx_players_team_name'}),
+        ("match list", *_page(_MATCH_LIST, match_where, match_params),
+         {'m': ('idx_matches_home_date', 'idx_matches_away_date')}),
+        ("match events of match", "SELECT * FROM match_events WHERE match_id = %s ORDER BY minute ASC", (MATCH_ID,),
+         {'match_events': 'idx_match_events_match_minute'}),
+        ("match event list of match", *_page(_EVENT_LIST, "match_id = %s", (MATCH_ID,)),
+         {'match_events': 'idx_match_events_match_minute'}),
+        ("player statistics of match",
+         "SELECT * FROM player_match_statistics WHERE match_id = %s", (MATCH_ID,),
+         {'player_match_statistics': 'idx_pms_match_player'}),
+        ("player statistics history",
+         "SELECT pms.* FROM player_match_statistics pms JOIN matches m ON pms.match_id = m.id "
+         f"WHERE pms.player_id = %s AND {SCOPE} ORDER BY m.date_time DESC", (PLAYER_ID, TEAM_IDS, TEAM_IDS),
+         {'pms': 'idx_pms_player_match'}),
+        ("team statistics upsert",
+         "SELECT id FROM match_team_statistics WHERE match_id = %s AND team_id = %s ORDER BY id LIMIT 1",
+         (MATCH_ID, TEAM_IDS[0]), {'match_team_statistics': 'idx_mts_match_team'}),
+        ("lineups of match", "SELECT * FROM match_lineups WHERE match_id = %s", (MATCH_ID,),
+         {'match_lineups': 'idx_match_lineups_match_team'}),
+        ("report list of match", *_page(_REPORT_LIST, f"{SCOPE} AND ar.match_id = %s", (TEAM_IDS, TEAM_IDS, MATCH_ID)),
+         {'ar': 'idx_analysis_reports_match_generated'}),
+        ("segment list of match", *_page(_SEGMENT_LIST, f"{SCOPE} AND vs.match_id = %s", (TEAM_IDS, TEAM_IDS, MATCH_ID)),
+         {'vs': 'idx_video_segments_match_start'}),
+    ]
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+    return cursor.fetchall()
+
+
+def problems(plan, expected, max_scan_rows):
+    found = []
+    by_table = {row['table']: row for row in plan}
+    for table, index in expected.items():
+        row = by_table.get(table)
+        if row is None:
+            found.append(f"{table}: not in the plan")
+            continue
+        possible = set((row.get('possible_keys') or '').split(','))
+        wanted = (index,) if isinstance(index, str) else index or ()
+        missing = [name for name in wanted if name not in possible]
+        if missing:
+            found.append(f"{table}: cannot use {', '.join(missing)} (possible keys: {row.get('possible_keys')})")
+    for row in plan:
+        if row.get('type') == 'ALL' and (row.get('rows') or 0) > max_scan_rows:
+            found.append(f"{row['table']}: full scan of ~{row['rows']} rows")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-scan-rows', type=int, default=1000, help='Largest full table scan tolerated')
+    parser.add_argument('--verbose', action='store_true', help='Print every plan')
+    args = parser.parse_args()
+
+    conn = pymysql.connect(**DB_CONFIG)
+    failed = 0
+    try:
+        with conn.cursor() as cursor:
+            for name, sql, params, expected in checks():
+                plan = explain(cursor, sql, params)
+                found = problems(plan, expected, args.max_scan_rows)
+                print(f"{'FAIL' if found else 'ok  '} {name}")
+                for problem in found:
+                    print(f"       {problem}")
+                if found or args.verbose:
+                    for row in plan:
+                        print(f"       {row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row.get('Extra') or ''}")
+                failed += bool(found)
+    finally:
+        conn.close()
+    print(f"{failed} of {len(checks())} queries failed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
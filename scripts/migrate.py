@@ -0,0 +1,62 @@
+"""Schema migrations: show, apply, revert or baseline the versions in data/migrations.
+
+    python scripts/migrate.py status
+    python scripts/migrate.py up [--to VERSION]
+    python scripts/migrate.py down [--to VERSION]     # default: revert the latest one
+    python scripts/migrate.py baseline [--to VERSION]
+
+Uses the DB_* variables of the API. A database created from data/full_creation.sql
+already has every migration in it: run `baseline` once so they are recorded as
+applied. An interrupted `up` is safe to rerun; it continues where it stopped.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pymysql
+
+from database import DB_CONFIG
+from migrations import MIGRATIONS_DIR, MigrationError, MigrationRunner
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('status', 'up', 'down', 'baseline'))
+    parser.add_argument('--to', type=int, default=None, help='Target version')
+    parser.add_argument('--dir', default=MIGRATIONS_DIR, help='Migrations directory')
+    args = parser.parse_args()
+
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        with MigrationRunner(conn, args.dir) as runner:
+            if args.command == 'status':
+                for row in runner.status():
+                    finished = row['finished_at'] or ''
+                    print(f"V{row['version']:04d}  {row['name']:<40} {row['state']:<30} {finished}")
+                return 0
+            if args.command == 'up':
+                done = runner.upgrade(args.to)
+            elif args.command == 'baseline':
+                done = runner.baseline(args.to)
+                for migration in done:
+                    print(f"Recorded V{migration.version} {migration.name} as applied")
+            else:
+                target = args.to
+                if target is None:
+                    applied = sorted(runner.applied())
+                    target = applied[-2] if len(applied) > 1 else 0
+                done = runner.downgrade(target)
+            if not done:
+                print("Nothing to do")
+    except MigrationError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
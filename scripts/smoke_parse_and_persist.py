@@ -1,6 +1,9 @@
 """Smoke test: parse example CSVs (from AI model repo) and persist to DB.
 
-Run this script from the backend project root after setting DB env vars.
+Run this script from the backend project root after setting DB env vars, with the
+id of the match the CSVs belong to:
+
+    python scripts/smoke_parse_and_persist.py <match_id>
 """
 import os
 import sys
@@ -25,7 +28,7 @@ with tempfile.TemporaryDirectory() as tmpdir:
     gen = get_db()
     conn = next(gen)
     try:
-        summary = parse_and_persist_results(tmpdir, conn, match_id='')
+        summary = parse_and_persist_results(tmpdir, conn, match_id=sys.argv[1] if len(sys.argv) > 1 else '')
         print('Persist summary:', summary)
     finally:
         try:
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict
+
+# Analyzer outputs kept per cache entry.
+CACHED_OUTPUTS = ('player_metrics.csv', 'ball_metrics.csv')
+
+ANALYSIS_CACHE_DIR = os.environ.get('ANALYSIS_CACHE_DIR', './analysis_cache')
+# 0 disables the cache.
+ANALYSIS_CACHE_MAX_BYTES = int(float(os.environ.get('ANALYSIS_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+# Set when deploying a new analyzer build; otherwise the binary's size and mtime stand in for it.
+ANALYZER_VERSION = os.environ.get('ANALYZER_VERSION', '')
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_fingerprint(path: str) -> str:
+    if not path:
+        return ''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return path
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _copy_or_link(src: str, dst: str):
+    # Hard links make restores free; eviction unlinking the cache copy does not affect them.
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class AnalysisResultCache:
+    """On-disk store of analyzer CSV outputs keyed by video content and analyzer setup.
+
+    Each entry is a directory named after its key. Entries are touched on every hit and
+    the least recently used ones are evicted once the store grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, video_sha256: str, test_runner: str, model_path: str, calib_path: str) -> str:
+        analyzer_version = ANALYZER_VERSION or _file_fingerprint(test_runner)
+        parts = [video_sha256, analyzer_version, _file_fingerprint(model_path), _file_fingerprint(calib_path)]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def restore(self, key: str, out_dir: str) -> bool:
+        """Copy a cached run's outputs into `out_dir`; False on a miss."""
+        if not self.enabled:
+            return False
+        entry = self._entry_dir(key)
+        try:
+            for name in CACHED_OUTPUTS:
+                _copy_or_link(os.path.join(entry, name), os.path.join(out_dir, name))
+            now = time.time()
+            os.utime(entry, (now, now))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, out_dir: str):
+        """Save a finished run's outputs, then evict old entries beyond the size limit."""
+        if not self.enabled:
+            return
+        if not all(os.path.exists(os.path.join(out_dir, name)) for name in CACHED_OUTPUTS):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        staging = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            for name in CACHED_OUTPUTS:
+                shutil.copyfile(os.path.join(out_dir, name), os.path.join(staging, name))
+            # Rename is atomic, so readers never see a half-written entry.
+            os.rename(staging, self._entry_dir(key))
+        except OSError:
+            # Another run stored the same key first.
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+            size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+            entries.append((entry.stat().st_mtime, size, entry.path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._entries() if os.path.isdir(self.directory) else []
+            return {
+                'enabled': self.enabled,
+                'entries': len(entries),
+                'size_bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+analysis_cache = AnalysisResultCache(ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES)
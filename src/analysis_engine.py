@@ -1,33 +1,90 @@
-import cv2
 import numpy as np
 import os
 import csv
 import json
 import tempfile
 import subprocess
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
 
 # Services used to persist results (import here to avoid circular imports in other modules)
 from services.analysis_report_service import AnalysisReportService
+from models.analysis_report import AnalysisReportCreate
 from services.player_match_statistics_service import PlayerMatchStatisticsService
+from services.match_details_cache import invalidate_match_details
+from analysis_cache import analysis_cache, file_sha256
+from tracking_store import tracking_store
+from tracking_analytics import persist_match_analytics, team_sides
+from inference_engine import OnnxDetector
+
+# Rows per multi-row INSERT when persisting analyzer output.
+PERSIST_BATCH_SIZE = int(os.environ.get('PERSIST_BATCH_SIZE', '1000'))
+# Seconds before a single analyzer run is killed.
+ANALYZER_TIMEOUT = float(os.environ.get('ANALYZER_TIMEOUT', str(60 * 60)))
+# Detection model for single images; an ONNX export (e.g. `yolo export model=yolov8l.pt format=onnx dynamic=True`).
+DETECTION_MODEL_PATH = os.environ.get('DETECTION_MODEL_PATH', 'yolov8l.pt')
+# When the API loads the model: `background` (start serving at once), `blocking`
+# (before accepting requests) or `lazy` (on the first detection request).
+DETECTION_PRELOAD = os.environ.get('DETECTION_PRELOAD', 'background')
+# Run one dummy forward pass after loading so the first request does not pay for it.
+DETECTION_WARMUP = os.environ.get('DETECTION_WARMUP', '1') == '1'
 
 
 class FootballAnalyzer:
-    """Light wrapper for single-image analysis.
+    """Single-image detection; the full-video analysis is delegated to the C++ `test_runner` binary.
 
-    Note: The heavy video analysis is delegated to the C++ `test_runner` binary.
+    With an ONNX model (`DETECTION_MODEL_PATH`) images go through `OnnxDetector`;
+    otherwise, or if the model cannot be loaded, the placeholder detections below
+    are returned. Constructing the analyzer is cheap: the model is loaded by the
+    first `load()` call, which the analyze methods make if nobody did before.
     """
-    def __init__(self, model_path: str = 'yolov8l.pt'):
-        # Still allow a Python-based analyzer for quick single-image ops.
-        print(f"Initializing analyzer (python wrapper) with model (placeholder): {model_path}")
+    def __init__(self, model_path: str = DETECTION_MODEL_PATH):
         self.model_path = model_path
+        self.detector: Optional[OnnxDetector] = None
+        self.loaded = False
+        self._load_lock = threading.Lock()
+
+    def load(self, warmup: bool = False):
+        """Load the model once; concurrent callers wait for the first one to finish."""
+        if self.loaded:
+            return
+        with self._load_lock:
+            if self.loaded:
+                return
+            try:
+                self._load_model(warmup)
+            finally:
+                self.loaded = True
+
+    def _load_model(self, warmup: bool):
+        if not self.model_path.endswith('.onnx') or not os.path.exists(self.model_path):
+            print(f"Initializing analyzer (python wrapper) with model (placeholder): {self.model_path}")
+            return
+        import cv2
+
+        started = time.perf_counter()
+        try:
+            detector = OnnxDetector(self.model_path)
+            if warmup:
+                detector.detect_batch([np.zeros((detector.input_size, detector.input_size, 3), dtype=np.uint8)])
+        except cv2.error as e:
+            print(f"Warning: could not load detection model {self.model_path}, using placeholder detections: {e}")
+            return
+        self.detector = detector
+        print(f"Loaded detection model {self.model_path} in {time.perf_counter() - started:.2f}s")
+
+    def analyze_batch(self, images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        self.load()
+        if self.detector is not None:
+            return self.detector.detect_batch(images)
+        return [self.analyze_single_image(image) for image in images]
 
     def analyze_single_image(self, image):
-        """Analyzes a single image for player and ball detection.
-
-        This remains a lightweight placeholder. For full-video analysis the
-        backend will call the high-performance C++ binary.
-        """
+        """Analyzes a single image for player and ball detection."""
+        self.load()
+        if self.detector is not None:
+            return self.detector.detect_batch([image])[0]
         print("Analyzing single image (placeholder)...")
         return [
             {"box": [100, 150, 50, 50], "label": "player", "confidence": 0.95, "color": (0, 255, 0)},
@@ -35,53 +92,225 @@ class FootballAnalyzer:
         ]
 
 
-def _parse_player_metrics_csv(csv_path: str) -> List[Dict[str, Any]]:
-    """Parse `player_metrics.csv` generated by the C++ tool.
-
-    Returns a list of dicts with keys matching PlayerMatchStatisticsCreate fields
-    plus frame/player_id info.
+# Declared column types for the analyzer CSVs as (dtype, value used for empty cells).
+# Columns not listed here are typed from the first data row. -1 marks a missing id.
+PLAYER_METRICS_SCHEMA = {
+    'frame': (np.int32, -1),
+    'timestamp': (np.float64, np.nan),
+    'match_id': ('U36', ''),
+    'player_id': (np.int32, -1),
+    'team_id': (np.int32, -1),
+    'team_side': ('U8', ''),
+    'jersey_number': (np.int32, -1),
+    'minutes_played': (np.int32, 0),
+    'shots': (np.int32, 0),
+    'shots_on_target': (np.int32, 0),
+    'passes': (np.int32, 0),
+    'accurate_passes': (np.int32, 0),
+    'tackles': (np.int32, 0),
+    'interceptions': (np.int32, 0),
+    'clearances': (np.int32, 0),
+    'saves': (np.int32, 0),
+    'fouls_committed': (np.int32, 0),
+    'fouls_suffered': (np.int32, 0),
+    'offsides': (np.int32, 0),
+    'total_distance_meters': (np.float64, np.nan),
+    'rating': (np.float64, np.nan),
+    'x': (np.float64, np.nan),
+    'y': (np.float64, np.nan),
+    'speed': (np.float64, np.nan),
+}
+
+BALL_METRICS_SCHEMA = {
+    'frame': (np.int32, -1),
+    'timestamp': (np.float64, np.nan),
+    'x': (np.float64, np.nan),
+    'y': (np.float64, np.nan),
+    'speed': (np.float64, np.nan),
+    'possession_player_id': (np.int32, -1),
+}
+
+
+# Missing-value fill of columns not in a schema, by dtype kind. Text columns are
+# unsized ('U'): they are read by the `csv` path and sized from their longest value.
+_INFERRED_FILLS = {'i': -1, 'f': np.nan, 'U': ''}
+
+
+def _infer_column(value: str):
+    if value == '':
+        return np.float64, _INFERRED_FILLS['f']
+    try:
+        int(value)
+        return np.int64, _INFERRED_FILLS['i']
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return np.float64, _INFERRED_FILLS['f']
+    except ValueError:
+        return 'U', _INFERRED_FILLS['U']
+
+
+def _column_fill(table: np.ndarray, schema: Dict[str, Any], name: str):
+    if name in schema:
+        return schema[name][1]
+    return _INFERRED_FILLS.get(table.dtype[name].kind)
+
+
+def _parse_cell(cell: str, column_dtype, fill):
+    """One CSV cell as `column_dtype`; empty cells become `fill`, "2.0" is read as 2."""
+    if cell == '':
+        return fill
+    kind = np.dtype(column_dtype).kind
+    if kind in 'iu':
+        return int(float(cell))
+    if kind == 'f':
+        return float(cell)
+    return cell
+
+
+def _has_quotes(csv_path: str) -> bool:
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            if b'"' in chunk:
+                return True
+    return False
+
+
+def _read_metrics_csv(csv_path: str, schema: Dict[str, Any]) -> np.ndarray:
+    """Load an analyzer CSV into a NumPy structured array, one typed field per column.
+
+    Clean files go through the C parser in `np.loadtxt` in a single pass. Files with
+    quoted fields, empty cells, numbers written differently from their column type
+    ("2.0" in an integer column) or text columns outside the schema are parsed with
+    the `csv` module and converted cell by cell, filling empty cells with the
+    column's missing value. Text columns are as wide as their longest value.
     """
-    results = []
     if not os.path.exists(csv_path):
-        return results
+        return np.empty(0, dtype=[])
     with open(csv_path, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Convert numeric fields when possible (defensive)
-            converted = {}
-            for k, v in row.items():
-                if v is None or v == '':
-                    converted[k] = None
-                    continue
-                # Try int then float else keep string
-                try:
-                    converted[k] = int(v)
-                    continue
-                except Exception:
-                    pass
-                try:
-                    converted[k] = float(v)
-                    continue
-                except Exception:
-                    converted[k] = v
-            results.append(converted)
-    return results
-
-
-def _parse_ball_metrics_csv(csv_path: str) -> List[Dict[str, Any]]:
-    # Similar parsing for ball metrics
-    return _parse_player_metrics_csv(csv_path)
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        first_row = next(reader, None)
+    if not header:
+        return np.empty(0, dtype=[])
+    names = [name.strip() for name in header]
+
+    columns = []
+    for i, name in enumerate(names):
+        if name in schema:
+            columns.append(schema[name])
+        else:
+            columns.append(_infer_column(first_row[i].strip() if first_row and i < len(first_row) else ''))
+    dtype = np.dtype([(name, column_dtype) for name, (column_dtype, _) in zip(names, columns)])
+    if first_row is None:
+        return np.empty(0, dtype=dtype)
+
+    # np.loadtxt splits on every comma, including those inside quoted fields, and
+    # needs a width for text columns up front.
+    unsized_text = any(dtype[name].kind == 'U' and dtype[name].itemsize == 0 for name in names)
+    if not unsized_text and not _has_quotes(csv_path):
+        try:
+            return np.loadtxt(csv_path, delimiter=',', skiprows=1, dtype=dtype, ndmin=1, encoding='utf-8')
+        except ValueError:
+            pass
+
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None)
+        rows = [row for row in reader if row]
+    fields = []
+    for i, (name, (column_dtype, fill)) in enumerate(zip(names, columns)):
+        cells = [row[i].strip() if i < len(row) else '' for row in rows]
+        if name not in schema and np.dtype(column_dtype).kind in 'iu' and any('.' in c or 'e' in c.lower() for c in cells):
+            # Typed from the first row only; later rows hold fractions.
+            column_dtype, fill = np.float64, np.nan
+        try:
+            values = np.array([_parse_cell(cell, column_dtype, fill) for cell in cells], dtype=column_dtype)
+        except (ValueError, OverflowError):
+            print(f"Warning: column {name} in {os.path.basename(csv_path)} is not {np.dtype(column_dtype)}; keeping it as text")
+            values = np.array(cells, dtype=str)
+        fields.append((name, values))
+    table = np.empty(len(rows), dtype=[(name, values.dtype if len(values) else np.dtype(column_dtype))
+                                       for (name, values), (column_dtype, _) in zip(fields, columns)])
+    for name, values in fields:
+        table[name] = values
+    return table
+
+
+def _missing_value(value, fill) -> bool:
+    if isinstance(value, float):
+        return value != value
+    return fill is not None and value == fill and fill != 0
+
+
+def _table_records(table: np.ndarray, schema: Dict[str, Any], limit: int = None) -> List[Dict[str, Any]]:
+    """Convert rows to JSON-friendly dicts; missing cells become None."""
+    names = table.dtype.names or ()
+    fills = [_column_fill(table, schema, name) for name in names]
+    rows = table[:limit].tolist() if limit is not None else table.tolist()
+    return [
+        {name: (None if _missing_value(value, fill) else value) for name, value, fill in zip(names, row, fills)}
+        for row in rows
+    ]
+
+
+def _text_to_float(cell: str) -> float:
+    try:
+        return float(cell or 0)
+    except ValueError:
+        return 0.0
 
 
-def analyze_football_match(video_path: str, db_connection, match_id: str = '') -> Dict[str, Any]:
-    """Run the C++ analyzer on `video_path`, parse outputs and persist to DB.
+def _float_column(table: np.ndarray, name: str) -> np.ndarray:
+    """A column as floats with missing or unparseable cells as 0."""
+    if name not in (table.dtype.names or ()):
+        return np.zeros(len(table))
+    column = table[name]
+    if column.dtype.kind in 'US':
+        # Kept as text because some cell is not a number.
+        column = np.array([_text_to_float(str(cell).strip()) for cell in column], dtype=np.float64)
+    return np.nan_to_num(column.astype(np.float64))
+
+
+def _int_column(table: np.ndarray, name: str) -> List[int]:
+    return _float_column(table, name).astype(np.int64).tolist()
+
+
+def _table_match_id(table: np.ndarray) -> str:
+    """The match id written by the analyzer, if all of its rows agree on one."""
+    if 'match_id' not in (table.dtype.names or ()):
+        return ''
+    ids = np.unique(np.char.strip(table['match_id'].astype(str)))
+    ids = ids[ids != '']
+    return str(ids[0]) if len(ids) == 1 else ''
+
+
+def _squad_player_ids(player_table: np.ndarray, squad: Dict[Tuple[str, int], str]) -> List[Optional[str]]:
+    """Player id of each analyzer row from its team side and jersey number, None if unknown."""
+    names = player_table.dtype.names or ()
+    if not squad or 'team_side' not in names or 'jersey_number' not in names:
+        return [None] * len(player_table)
+    sides = np.char.lower(np.char.strip(player_table['team_side'].astype(str))).tolist()
+    return [squad.get((side, number)) for side, number in zip(sides, _int_column(player_table, 'jersey_number'))]
+
+
+def _players_detected(player_table: np.ndarray) -> int:
+    if 'player_id' not in (player_table.dtype.names or ()):
+        return 0
+    ids = player_table['player_id']
+    if ids.dtype.kind in 'iu':
+        ids = ids[ids >= 0]
+    return int(len(np.unique(ids)))
+
+
+def resolve_analyzer_paths() -> Tuple[str, str, str]:
+    """Locate the C++ analyzer binary, model and calibration as `(test_runner, model, calib)`.
 
     Expected environment variables to configure paths:
       - TEST_RUNNER_PATH: path to C++ binary (default: ./build/test_runner)
       - MODEL_PATH: path to ONNX model (optional)
       - CALIB_PATH: path to calibration.yaml (optional)
-
-    The C++ binary must output `player_metrics.csv` and `ball_metrics.csv` in the output dir.
     """
     # Prefer an explicit env override
     test_runner = os.environ.get('TEST_RUNNER_PATH', '')
@@ -111,111 +340,181 @@ def analyze_football_match(video_path: str, db_connection, match_id: str = '') -
 
     if not test_runner or not os.path.exists(test_runner):
         raise FileNotFoundError(f"C++ analyzer binary not found. Checked TEST_RUNNER_PATH and sibling repo; tried: {test_runner}")
+    return test_runner, model_path, calib_path
+
+
+def build_analyzer_command(video_path: str, out_dir: str) -> List[str]:
+    test_runner, model_path, calib_path = resolve_analyzer_paths()
+    cmd: List[str] = [test_runner, '--video', video_path, '--output-dir', out_dir]
+    if model_path:
+        cmd += ['--model', model_path]
+    if calib_path:
+        cmd += ['--calib', calib_path]
+    return cmd
 
+
+def analysis_cache_key(video_sha256: str) -> str:
+    """Result cache key for a video under the current analyzer binary, model and calibration."""
+    return analysis_cache.key(video_sha256, *resolve_analyzer_paths())
+
+
+def read_analysis_tables(out_dir: str):
+    """Parse the analyzer's `player_metrics.csv` and `ball_metrics.csv` from `out_dir`."""
+    player_table = _read_metrics_csv(os.path.join(out_dir, 'player_metrics.csv'), PLAYER_METRICS_SCHEMA)
+    ball_table = _read_metrics_csv(os.path.join(out_dir, 'ball_metrics.csv'), BALL_METRICS_SCHEMA)
+    return player_table, ball_table
+
+
+def build_analysis_result(video_path: str, player_table: np.ndarray, ball_table: np.ndarray) -> Dict[str, Any]:
+    """JSON-friendly summary returned to clients and stored on analysis jobs."""
+    summary_stats = {
+        'players_detected': _players_detected(player_table),
+        'player_rows': len(player_table),
+        'ball_rows': len(ball_table),
+    }
+    return {
+        'message': 'Analysis complete',
+        'video_path': video_path,
+        'summary_stats': summary_stats,
+        'player_rows_sample': _table_records(player_table, PLAYER_METRICS_SCHEMA, limit=5),
+        'ball_rows_sample': _table_records(ball_table, BALL_METRICS_SCHEMA, limit=5)
+    }
+
+
+def analyze_football_match(video_path: str, db_connection, match_id: str = '') -> Dict[str, Any]:
+    """Run the C++ analyzer on `video_path`, parse outputs and persist to DB.
+
+    This blocks for the whole run; the API goes through `services.job_manager`
+    instead, which runs the same steps as a background job.
+    The C++ binary must output `player_metrics.csv` and `ball_metrics.csv` in the output dir.
+    """
     # Prepare a temporary output directory for CSVs
     with tempfile.TemporaryDirectory() as out_dir:
-        cmd: List[str] = [test_runner, '--video', video_path, '--output-dir', out_dir]
-        if model_path:
-            cmd += ['--model', model_path]
-        if calib_path:
-            cmd += ['--calib', calib_path]
+        cmd = build_analyzer_command(video_path, out_dir)
+        cache_key = analysis_cache_key(file_sha256(video_path)) if analysis_cache.enabled else None
 
-        # Run the C++ analyzer (blocking). Consider making this async in future.
-        try:
-            print(f"Running C++ analyzer: {' '.join(cmd)}")
-            completed = subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=60*60)
-            print('Analyzer stdout:', completed.stdout[:1000])
-            print('Analyzer stderr:', completed.stderr[:1000])
-        except subprocess.CalledProcessError as e:
-            print('Analyzer failed:', e.stderr)
-            raise
-        except subprocess.TimeoutExpired:
-            raise RuntimeError('C++ analyzer timed out')
-
-        # Parse CSV outputs
-        player_csv = os.path.join(out_dir, 'player_metrics.csv')
-        ball_csv = os.path.join(out_dir, 'ball_metrics.csv')
-
-        player_rows = _parse_player_metrics_csv(player_csv)
-        ball_rows = _parse_ball_metrics_csv(ball_csv)
-
-        # Persist results to DB using helper
+        if cache_key and analysis_cache.restore(cache_key, out_dir):
+            print('Reusing cached analyzer output for', video_path)
+        else:
+            try:
+                print(f"Running C++ analyzer: {' '.join(cmd)}")
+                completed = subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=ANALYZER_TIMEOUT)
+                print('Analyzer stdout:', completed.stdout[:1000])
+                print('Analyzer stderr:', completed.stderr[:1000])
+            except subprocess.CalledProcessError as e:
+                print('Analyzer failed:', e.stderr)
+                raise
+            except subprocess.TimeoutExpired:
+                raise RuntimeError('C++ analyzer timed out')
+            if cache_key:
+                analysis_cache.store(cache_key, out_dir)
+
+        # Parse CSV outputs once
+        player_table, ball_table = read_analysis_tables(out_dir)
+
+        # Persist results to DB using helper (reusing the tables parsed above)
         try:
-            parse_and_persist_results(out_dir, db_connection, match_id)
+            parse_and_persist_results(out_dir, db_connection, match_id, player_table=player_table, ball_table=ball_table)
         except Exception as e:
             print('Warning: error while persisting results:', e)
 
-        # Build a JSON-friendly summary to return to client
-        summary_stats = {
-            'players_detected': len(set([r.get('player_id') for r in player_rows if r.get('player_id') is not None])),
-            'player_rows': len(player_rows),
-            'ball_rows': len(ball_rows),
-        }
+        return build_analysis_result(video_path, player_table, ball_table)
 
-        return {
-            'message': 'Analysis complete',
-            'video_path': video_path,
-            'summary_stats': summary_stats,
-            'player_rows_sample': player_rows[:5],
-            'ball_rows_sample': ball_rows[:5]
-        }
 
-
-def parse_and_persist_results(output_dir: str, db_connection, match_id: str = '') -> Dict[str, Any]:
+def parse_and_persist_results(output_dir: str, db_connection, match_id: str = '',
+                              player_table: np.ndarray = None, ball_table: np.ndarray = None,
+                              generated_by: Optional[str] = None) -> Dict[str, Any]:
     """Parse CSVs in `output_dir` and persist into DB. Returns summary dict.
 
     This helper allows the backend or a smoke-test to persist existing CSVs without
-    requiring the analyzer to run in the same process.
-    """
-    player_csv = os.path.join(output_dir, 'player_metrics.csv')
-    ball_csv = os.path.join(output_dir, 'ball_metrics.csv')
+    requiring the analyzer to run in the same process. Callers that already parsed
+    the CSVs pass the tables in so the files are not read twice.
 
-    player_rows = _parse_player_metrics_csv(player_csv)
-    ball_rows = _parse_ball_metrics_csv(ball_csv)
+    Analyzer player ids are tracker ids, not player ids: a row is stored for the
+    player wearing its `jersey_number` on its `team_side` ("home"/"away"), and rows
+    that match no squad player are skipped and counted. `generated_by` is the user
+    the report is recorded for (None for the pipeline itself).
+    """
+    if player_table is None:
+        player_table = _read_metrics_csv(os.path.join(output_dir, 'player_metrics.csv'), PLAYER_METRICS_SCHEMA)
+    if ball_table is None:
+        ball_table = _read_metrics_csv(os.path.join(output_dir, 'ball_metrics.csv'), BALL_METRICS_SCHEMA)
 
     ar_service = AnalysisReportService(db_connection)
     pms_service = PlayerMatchStatisticsService(db_connection)
 
     summary = {
-        'player_rows': len(player_rows),
-        'ball_rows': len(ball_rows),
+        'player_rows': len(player_table),
+        'ball_rows': len(ball_table),
     }
 
-    report_create = type('R', (), {})()
-    report_create.match_id = match_id or ''
-    report_create.report_type = 'full_match_analysis'
-    report_create.report_data = summary
-    report_create.generated_by = 'c++-analyzer'
-
-    try:
-        ar_service.create_analysis_report(report_create, [])
-    except Exception as e:
-        print('Warning: failed to persist analysis report:', e)
-
-    for row in player_rows:
+    match_id = match_id or _table_match_id(player_table)
+    if not match_id:
+        print("Warning: analyzer output has no match id; nothing persisted")
+        summary['persisted_rows'] = 0
+        return summary
+    player_ids = _squad_player_ids(player_table, pms_service.get_squad_numbers(match_id))
+    summary['unmapped_player_rows'] = sum(player_id is None for player_id in player_ids)
+    if summary['unmapped_player_rows']:
+        print(f"Warning: {summary['unmapped_player_rows']} analyzer rows of match {match_id} match no squad player; skipped")
+
+    # Numeric columns are converted in bulk; the per-row dicts are only needed for `notes`.
+    records = _table_records(player_table, PLAYER_METRICS_SCHEMA)
+    int_columns = {name: _int_column(player_table, name) for name in (
+        'minutes_played', 'shots', 'shots_on_target', 'passes', 'accurate_passes', 'tackles',
+        'interceptions', 'clearances', 'saves', 'fouls_committed', 'fouls_suffered', 'offsides')}
+    distance_km = (_float_column(player_table, 'total_distance_meters') / 1000.0).tolist()
+    ratings = _float_column(player_table, 'rating').tolist()
+
+    stats_rows = []
+    for i, row in enumerate(records):
+        if player_ids[i] is None:
+            continue
         stats = type('S', (), {})()
-        stats.match_id = match_id or row.get('match_id', '')
-        stats.player_id = str(row.get('player_id', row.get('id', 'unknown')))
-        stats.minutes_played = int(row.get('minutes_played', 0) or 0)
-        stats.shots = int(row.get('shots', 0) or 0)
-        stats.shots_on_target = int(row.get('shots_on_target', 0) or 0)
-        stats.passes = int(row.get('passes', 0) or 0)
-        stats.accurate_passes = int(row.get('accurate_passes', 0) or 0)
-        stats.tackles = int(row.get('tackles', 0) or 0)
-        stats.interceptions = int(row.get('interceptions', 0) or 0)
-        stats.clearances = int(row.get('clearances', 0) or 0)
-        stats.saves = int(row.get('saves', 0) or 0)
-        stats.fouls_committed = int(row.get('fouls_committed', 0) or 0)
-        stats.fouls_suffered = int(row.get('fouls_suffered', 0) or 0)
-        stats.offsides = int(row.get('offsides', 0) or 0)
-        dist_m = float(row.get('total_distance_meters', 0) or 0)
-        stats.distance_covered_km = dist_m / 1000.0
+        stats.match_id = match_id
+        stats.player_id = player_ids[i]
+        for name, values in int_columns.items():
+            setattr(stats, name, values[i])
+        stats.distance_covered_km = distance_km[i]
         stats.notes = json.dumps(row)
-        stats.rating = float(row.get('rating', 0) or 0)
+        stats.rating = ratings[i]
+        stats_rows.append(stats)
 
+    # Frame-level positions go to the tracking store rather than the database.
+    if match_id:
         try:
-            pms_service.create_player_match_statistics(stats, [])
+            summary['tracking'] = tracking_store.write(match_id, player_table, ball_table)
         except Exception as e:
-            print('Warning: failed to persist player stats for', stats.player_id, e)
+            print(f"Warning: could not store tracking data for match {match_id}: {e}")
 
+    # One transaction per run: either the whole analysis lands or none of it does.
+    started = time.perf_counter()
+    try:
+        summary['persisted_rows'] = pms_service.bulk_create_player_match_statistics(stats_rows, batch_size=PERSIST_BATCH_SIZE, commit=False)
+        elapsed = time.perf_counter() - started
+        summary['persist_seconds'] = round(elapsed, 3)
+        summary['rows_per_sec'] = round(summary['persisted_rows'] / elapsed, 1) if elapsed > 0 else None
+
+        report_create = AnalysisReportCreate(
+            match_id=match_id,
+            report_type='full_match_analysis',
+            report_data=summary,
+            generated_by=generated_by,
+        )
+        ar_service.create_analysis_report(report_create, [], commit=False)
+
+        db_connection.commit()
+    except Exception:
+        db_connection.rollback()
+        raise
+    invalidate_match_details(match_id)
+
+    print(f"Persisted {summary['persisted_rows']} player rows in {summary['persist_seconds']}s ({summary['rows_per_sec']} rows/sec)")
+
+    # Analytics stage: distance, speed zones, sprints and heatmaps from the stored tracks.
+    if summary.get('tracking', {}).get('players'):
+        try:
+            summary['analytics'] = persist_match_analytics(db_connection, match_id, team_sides(player_table))
+        except Exception as e:
+            print(f"Warning: could not compute tracking analytics for match {match_id}: {e}")
     return summary
@@ -1,63 +1,28 @@
 #uvicorn app:app --host 0.0.0.0 --port 8000
-from fastapi import FastAPI, Depends, File, UploadFile, HTTPException, status
+from fastapi import FastAPI, Depends, File, UploadFile, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from typing import Optional
-
-from database import get_db, Connection
-from analysis_engine import FootballAnalyzer, analyze_football_match, parse_and_persist_results
-from services.user_service import UserService
+from fastapi.security import OAuth2PasswordRequestForm
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import List, Optional
+
+from database import get_pool_stats, pool
+from async_database import get_async_db, close_pool as close_async_pool
+from dependencies import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, get_current_active_user, get_user_team_ids
+from analysis_engine import FootballAnalyzer, DETECTION_PRELOAD, DETECTION_WARMUP
+from analysis_cache import analysis_cache
+from inference_engine import MicroBatcher, DetectorOverloadedError
+from services.user_service import AsyncUserService
+from services.password_hasher import password_hasher, HasherOverloadedError
+from services.job_manager import job_manager
+from services.video_analysis_service import start_video_analysis
+from services.upload_staging import enforce_content_length, iter_upload_file, upload_suffix, remove_stale_uploads
+from services.batch_detection_service import decode_image, open_frame_source, stream_batch_detections
 from models.user import User, UserCreate
 
-import cv2
-import numpy as np
-import tempfile
-import os
-
-# --- Configuration for JWT --- #
-# TODO: Use environment variables for these in production
-SECRET_KEY = "your-secret-key" # openssl rand -hex 32
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/token")
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Connection = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user_service = UserService(db)
-    user = user_service.get_user_by_email(email=email)
-    if user is None:
-        raise credentials_exception
-    return user
-
-async def get_current_active_user(current_user: User = Depends(get_current_user)):
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+import asyncio
 
 # Import controllers
 from controllers.team_controller import router as team_router
@@ -75,13 +40,56 @@ from controllers.reunion_controller import router as reunion_router
 from controllers.training_session_controller import router as training_session_router
 from controllers.event_controller import router as event_router # New import
 from controllers.match_team_statistics_controller import router as match_team_statistics_router # New import
+from controllers.match_analysis_controller import router as match_analysis_router
+from controllers.analysis_job_controller import router as analysis_job_router
+from controllers.tracking_controller import router as tracking_router
+from controllers.export_controller import router as export_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the connection pool up to its minimum size; a DB outage at boot
+    # should not stop the API from starting.
+    try:
+        pool.fill()
+    except Exception as e:
+        print(f"Warning: could not pre-fill database pool: {e}")
+    # Jobs left PENDING/PROCESSING by a previous run of this host can never finish.
+    try:
+        interrupted = await job_manager.recover_interrupted_jobs()
+        if interrupted:
+            print(f"Marked {interrupted} interrupted analysis job(s) as failed")
+    except Exception as e:
+        print(f"Warning: could not recover analysis jobs: {e}")
+    remove_stale_uploads()
+    # Load the detection model off the event loop. In the default background mode the
+    # API serves right away and the first detection request waits for the load.
+    if DETECTION_PRELOAD == 'blocking':
+        await asyncio.to_thread(single_image_analyzer.load, DETECTION_WARMUP)
+    elif DETECTION_PRELOAD == 'background':
+        asyncio.get_running_loop().run_in_executor(None, single_image_analyzer.load, DETECTION_WARMUP)
+    detection_batcher.start()
+    yield
+    await detection_batcher.close()
+    await job_manager.shutdown()
+    password_hasher.shutdown()
+    await close_async_pool()
+    pool.close()
 
 app = FastAPI(
     title="Football Match Analysis API",
     description="API for analyzing football match videos using YOLOv8 and managing related data.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+@app.exception_handler(HasherOverloadedError)
+async def hasher_overloaded_handler(request: Request, exc: HasherOverloadedError):
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(DetectorOverloadedError)
+async def detector_overloaded_handler(request: Request, exc: DetectorOverloadedError):
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 # Mount the static directory to serve images
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -93,6 +101,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers of the list endpoints, readable by the browser client.
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Include routers
@@ -111,14 +121,21 @@ app.include_router(reunion_router, prefix="/api", tags=["Reunions"])
 app.include_router(training_session_router, prefix="/api", tags=["Training Sessions"])
 app.include_router(event_router, prefix="/api", tags=["Events"]) # New router
 app.include_router(match_team_statistics_router, prefix="/api", tags=["Match Team Statistics"]) # New router
+app.include_router(match_analysis_router, prefix="/api")
+app.include_router(analysis_job_router, prefix="/api", tags=["Analysis Jobs"])
+app.include_router(tracking_router, prefix="/api")
+app.include_router(export_router, prefix="/api")
 
-# Initialize the FootballAnalyzer for single image analysis (can be reused)
+# Initialize the FootballAnalyzer for single image analysis (can be reused); the
+# model itself is loaded by the lifespan hook or on first use.
 single_image_analyzer = FootballAnalyzer()
+# Concurrent /detect requests share forward passes.
+detection_batcher = MicroBatcher(single_image_analyzer.analyze_batch)
 
 @app.post("/api/token", tags=["Authentication"])
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Connection = Depends(get_db)):
-    user_service = UserService(db)
-    user = user_service.get_user_by_email(email=form_data.username)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_email(email=form_data.username)
 
     # Case 1: User not found
     if not user:
@@ -129,7 +146,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         )
     
     # Case 2: Incorrect password
-    if not user_service.verify_password(form_data.password, str(user.password_hash)):
+    if not await user_service.verify_password(form_data.password, str(user.password_hash)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password.",
@@ -144,13 +161,13 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/register", tags=["Authentication"])
-async def register_user(user_create: UserCreate, db: Connection = Depends(get_db)):
-    user_service = UserService(db)
-    existing_user = user_service.get_user_by_email(email=user_create.email)
+async def register_user(user_create: UserCreate, db = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    existing_user = await user_service.get_user_by_email(email=user_create.email)
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     
-    new_user = user_service.create_user(user_create)
+    new_user = await user_service.create_user(user_create)
 
     # Generate access token for immediate login
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -163,17 +180,41 @@ async def register_user(user_create: UserCreate, db: Connection = Depends(get_db
 async def read_root():
     return {"message": "Welcome to the Football Match Analysis API"}
 
+@app.get("/api/monitoring/db_pool", tags=["Monitoring"])
+async def read_db_pool_stats():
+    """Connection pool counters, used to size DB_POOL_MIN_SIZE/DB_POOL_MAX_SIZE."""
+    return get_pool_stats()
+
+@app.get("/api/monitoring/password_hasher", tags=["Monitoring"])
+async def read_password_hasher_stats():
+    """bcrypt worker pool queue depth and rejection counters."""
+    return password_hasher.stats()
+
+@app.get("/api/monitoring/analysis_jobs", tags=["Monitoring"])
+async def read_analysis_job_stats():
+    """Running/queued analyzer jobs in this worker against ANALYSIS_MAX_CONCURRENCY."""
+    return job_manager.stats()
+
+@app.get("/api/monitoring/analysis_cache", tags=["Monitoring"])
+async def read_analysis_cache_stats():
+    """Size and hit rate of the on-disk analyzer result cache."""
+    return await asyncio.to_thread(analysis_cache.stats)
+
+@app.get("/api/monitoring/detector", tags=["Monitoring"])
+async def read_detector_stats():
+    """Batches, images and average batch size of the /detect micro-batcher."""
+    return {'model_loaded': single_image_analyzer.detector is not None, 'model_ready': single_image_analyzer.loaded, **detection_batcher.stats()}
+
 @app.post("/detect", tags=["Analysis"])
 async def detect_objects_in_image(file: UploadFile = File(...), current_user: dict = Depends(get_current_active_user)):
     """Analyzes a single image for player and ball detection."""
     contents = await file.read()
-    np_image = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(np_image, cv2.IMREAD_COLOR)
+    image = await asyncio.to_thread(decode_image, contents)
 
     if image is None:
         raise HTTPException(status_code=400, detail="Could not decode image")
 
-    detected_objects = single_image_analyzer.analyze_single_image(image)
+    detected_objects = await detection_batcher.submit(image)
     
     # Convert numpy arrays/tuples in detected_objects to lists for JSON serialization
     for obj in detected_objects:
@@ -183,24 +224,20 @@ async def detect_objects_in_image(file: UploadFile = File(...), current_user: di
     # Example: Ensure all keys are serializable and match frontend expectations
     return {"filename": file.filename, "detections": detected_objects}
 
-@app.post("/analyze_match", tags=["Analysis"])
-async def analyze_match_video(file: UploadFile = File(...), match_id: str = None, db: Connection = Depends(get_db), current_user: dict = Depends(get_current_active_user)):
-    """Analyzes a full football match video, saves results to the database, and returns summary statistics."""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-            tmp_file.write(await file.read())
-            video_path = tmp_file.name
-        
-        # Perform analysis
-        analysis_results = analyze_football_match(video_path, db, match_id or '')
-        # Ensure analysis_results is JSON serializable
-        return analysis_results
-    except Exception as e:
-        # Improved error handling for frontend
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'video_path' in locals() and os.path.exists(video_path):
-            os.remove(video_path)
+@app.post("/detect/batch", tags=["Analysis"], dependencies=[Depends(enforce_content_length)])
+async def detect_objects_in_images(files: Optional[List[UploadFile]] = File(None), archive: Optional[UploadFile] = File(None), current_user: User = Depends(get_current_active_user)):
+    """Detects players and ball in many frames (multipart `files` or a zip/tar `archive`).
+
+    Streams NDJSON, one line per frame in upload order, as each sub-batch is done.
+    """
+    frames = open_frame_source(files, archive)
+    return StreamingResponse(stream_batch_detections(frames, single_image_analyzer), media_type="application/x-ndjson")
+
+@app.post("/analyze_match", tags=["Analysis"], status_code=202, dependencies=[Depends(enforce_content_length)])
+async def analyze_match_video(file: UploadFile = File(...), match_id: str = None, current_user: User = Depends(get_current_active_user), user_team_ids: List[str] = Depends(get_user_team_ids)):
+    """Queues a full football match video for analysis and returns the job to poll at /api/jobs/{job_id}."""
+    job = await start_video_analysis(iter_upload_file(file), upload_suffix(file.filename), current_user.id, match_id or None, user_team_ids)
+    return {"job_id": job.id, "status": job.status, "match_id": job.match_id}
 
 # --- Authentication Example ---
 # If your frontend uses authentication, add dependencies to endpoints:
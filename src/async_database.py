@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiomysql
+
+from database import DB_CONFIG, POOL_CONFIG
+
+# Same database and sizing as the synchronous pool, but with aiomysql so that
+# `async def` routes can await their queries instead of blocking the event loop.
+ASYNC_DB_CONFIG = {
+    'host': DB_CONFIG['host'],
+    'user': DB_CONFIG['user'],
+    'password': DB_CONFIG['password'],
+    'db': DB_CONFIG['db'],
+    'charset': DB_CONFIG['charset'],
+    'cursorclass': aiomysql.DictCursor,
+    'autocommit': False,
+}
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool():
+    """Return the process-wide aiomysql pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    minsize=POOL_CONFIG['min_size'],
+                    maxsize=POOL_CONFIG['max_size'],
+                    pool_recycle=int(POOL_CONFIG['max_lifetime']),
+                    **ASYNC_DB_CONFIG,
+                )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+@asynccontextmanager
+async def connection():
+    """Lease an async connection for the duration of an `async with` block."""
+    db_pool = await get_pool()
+    conn = await db_pool.acquire()
+    try:
+        yield conn
+    finally:
+        try:
+            # End any transaction left open by read-only requests.
+            await conn.rollback()
+        except Exception:
+            conn.close()
+        db_pool.release(conn)
+
+
+async def get_async_db():
+    """Dependency function to lease an async database connection."""
+    async with connection() as conn:
+        yield conn
@@ -0,0 +1,129 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Optional shared backend so that every worker sees the same entries and
+# invalidations, e.g. CACHE_REDIS_URL=redis://localhost:6379/0
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', '')
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float = 60, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+class RedisCache:
+    """TTL cache stored in Redis; values must be JSON-serializable.
+
+    Backend errors are logged and treated as misses so a Redis outage
+    degrades to database lookups instead of failing requests.
+    """
+
+    def __init__(self, client, namespace: str, ttl: float = 60):
+        self.client = client
+        self.prefix = f"coach_pro:{namespace}:"
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.prefix + str(key))
+        except Exception as e:
+            print(f"Warning: cache backend unavailable: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: Hashable, value: Any):
+        try:
+            self.client.set(self.prefix + str(key), json.dumps(value), ex=max(1, math.ceil(self.ttl)))
+        except Exception as e:
+            print(f"Warning: cache backend unavailable: {e}")
+
+    def delete(self, key: Hashable):
+        try:
+            self.client.delete(self.prefix + str(key))
+        except Exception as e:
+            print(f"Warning: failed to invalidate cache key {key}: {e}")
+
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=self.prefix + '*'):
+                self.client.delete(key)
+        except Exception as e:
+            print(f"Warning: failed to clear cache {self.prefix}: {e}")
+
+    def stats(self):
+        return {'backend': 'redis', 'hits': self.hits, 'misses': self.misses}
+
+
+_redis_client = None
+
+def _get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(CACHE_REDIS_URL)
+    return _redis_client
+
+
+def make_cache(namespace: str, ttl: float = 60, maxsize: int = 1024):
+    """Build a cache for `namespace`: shared Redis when CACHE_REDIS_URL is set, in-process otherwise.
+
+    Values should stay JSON-serializable so either backend can hold them.
+    """
+    if CACHE_REDIS_URL:
+        try:
+            return RedisCache(_get_redis_client(), namespace, ttl=ttl)
+        except ImportError:
+            print("Warning: CACHE_REDIS_URL is set but the redis package is not installed; using in-process cache")
+    return TTLCache(ttl=ttl, maxsize=maxsize)
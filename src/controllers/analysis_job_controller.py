@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from async_database import get_async_db, connection as async_connection
+from services.analysis_job_service import AsyncAnalysisJobService
+from services.video_analysis_service import job_event_stream
+from models.analysis_job import AnalysisJob
+from models.user import User
+from dependencies import get_current_active_user
+
+router = APIRouter()
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJob)
+async def get_analysis_job(job_id: str, db = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
+    service = AsyncAnalysisJobService(db)
+    job = await service.get_job(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job_events(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """Server-Sent Events with progress, fps and ETA until the job completes or fails."""
+    # The connection is released before the stream starts: a yield dependency would
+    # hold it until the job finishes.
+    async with async_connection() as db:
+        job = await AsyncAnalysisJobService(db).get_job(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(job_event_stream(job, current_user.id), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
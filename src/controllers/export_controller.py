@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Literal, Optional
+from datetime import date
+from services.export_service import (
+    EXPORT_MEDIA_TYPES, ExportStream,
+    export_player_match_statistics, export_analysis_reports, export_match_events,
+)
+from dependencies import get_user_team_ids
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+ExportFormat = Literal["ndjson", "json"]
+
+
+def _stream_response(name: str, format: str, user_team_ids: List[str], open_stream) -> Response:
+    extension = "ndjson" if format == "ndjson" else "json"
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{extension}"'}
+    if not user_team_ids:
+        return Response(content="[]" if format == "json" else "", media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+    stream: ExportStream = open_stream()
+    # The background task only matters when the body was never read to the end.
+    return StreamingResponse(stream, media_type=stream.media_type, headers=headers, background=BackgroundTask(stream.close))
+
+
+@router.get("/player_match_statistics")
+def export_player_match_statistics_rows(
+    format: ExportFormat = "ndjson",
+    match_id: Optional[str] = None,
+    since: Optional[date] = Query(None, description="First match date (inclusive)"),
+    until: Optional[date] = Query(None, description="Last match date (inclusive)"),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+):
+    """Streams every player statistics row of the user's matches (e.g. a season with since/until)."""
+    return _stream_response("player_match_statistics", format, user_team_ids,
+                            lambda: export_player_match_statistics(user_team_ids, format, match_id, since, until))
+
+
+@router.get("/analysis_reports")
+def export_analysis_report_rows(
+    format: ExportFormat = "ndjson",
+    match_id: Optional[str] = None,
+    since: Optional[date] = Query(None, description="First match date (inclusive)"),
+    until: Optional[date] = Query(None, description="Last match date (inclusive)"),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+):
+    return _stream_response("analysis_reports", format, user_team_ids,
+                            lambda: export_analysis_reports(user_team_ids, format, match_id, since, until))
+
+
+@router.get("/match_events")
+def export_match_event_rows(
+    format: ExportFormat = "ndjson",
+    match_id: Optional[str] = None,
+    since: Optional[date] = Query(None, description="First match date (inclusive)"),
+    until: Optional[date] = Query(None, description="Last match date (inclusive)"),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+):
+    return _stream_response("match_events", format, user_team_ids,
+                            lambda: export_match_events(user_team_ids, format, match_id, since, until))
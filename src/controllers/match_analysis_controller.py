@@ -1,32 +1,62 @@
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, Depends
-from typing import Dict
-from database import get_db
-from services.video_analysis_service import start_video_analysis, get_analysis_status
-from services.match_service import MatchService
-from services.player_match_statistics_service import PlayerMatchStatisticsService
+from fastapi import APIRouter, UploadFile, File, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from async_database import get_async_db, connection as async_connection
+from services.video_analysis_service import start_video_analysis, get_analysis_status, job_event_stream
+from services.upload_staging import enforce_content_length, iter_upload_file, upload_suffix
+from services.analysis_job_service import AsyncAnalysisJobService
+from models.analysis_job import AnalysisJob
+from models.user import User
+from dependencies import get_current_active_user, get_user_team_ids
 
 router = APIRouter(prefix="/matches", tags=["match-analysis"])
 
-@router.post("/{match_id}/analyze")
+@router.post("/{match_id}/analyze", response_model=AnalysisJob, status_code=202, dependencies=[Depends(enforce_content_length)])
 async def analyze_match_video(
     match_id: str,
     video: UploadFile = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
-    db = Depends(get_db)
-) -> Dict:
-    """Start video analysis for a match. Returns immediately with status tracking info."""
-    match_service = MatchService(db)
-    player_stats_service = PlayerMatchStatisticsService(db)
-    
+    current_user: User = Depends(get_current_active_user),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+) -> AnalysisJob:
+    """Start video analysis for a match. Returns immediately with the job to poll."""
     return await start_video_analysis(
+        chunks=iter_upload_file(video),
+        suffix=upload_suffix(video.filename),
+        user_id=current_user.id,
         match_id=match_id,
-        video_file=video,
-        background_tasks=background_tasks,
-        match_service=match_service,
-        player_stats_service=player_stats_service
+        user_team_ids=user_team_ids,
     )
 
-@router.get("/{match_id}/analysis-status")
-async def check_analysis_status(match_id: str) -> Dict:
+@router.post("/{match_id}/analyze/stream", response_model=AnalysisJob, status_code=202, dependencies=[Depends(enforce_content_length)])
+async def analyze_match_video_stream(
+    match_id: str,
+    request: Request,
+    x_filename: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+) -> AnalysisJob:
+    """Start video analysis from a raw request body (the video bytes, no multipart).
+
+    The body is written to the staging directory as it arrives, so large
+    recordings are never held in memory or spooled twice.
+    """
+    return await start_video_analysis(
+        chunks=request.stream(),
+        suffix=upload_suffix(x_filename),
+        user_id=current_user.id,
+        match_id=match_id,
+        user_team_ids=user_team_ids,
+    )
+
+@router.get("/{match_id}/analysis-status", response_model=AnalysisJob)
+async def check_analysis_status(match_id: str, db = Depends(get_async_db), current_user: User = Depends(get_current_active_user)) -> AnalysisJob:
     """Get current status of video analysis for a match."""
-    return get_analysis_status(match_id)
\ No newline at end of file
+    return await get_analysis_status(match_id, current_user.id, AsyncAnalysisJobService(db))
+
+@router.get("/{match_id}/analysis-events")
+async def stream_analysis_events(match_id: str, current_user: User = Depends(get_current_active_user)):
+    """Server-Sent Events with progress, fps and ETA for the match's latest analysis job."""
+    # Look the job up on a short-lived connection rather than one held for the whole stream.
+    async with async_connection() as db:
+        job = await get_analysis_status(match_id, current_user.id, AsyncAnalysisJobService(db))
+    return StreamingResponse(job_event_stream(job, current_user.id), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
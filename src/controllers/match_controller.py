@@ -1,47 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from typing import List, Optional
-from database import get_db, Connection
-from services.match_service import MatchService
-from services.team_service import TeamService # New import
+from database import get_db, pool, Connection
+from async_database import get_async_db
+from services.match_service import MatchService, AsyncMatchService
+from services.match_details_cache import get_or_build_match_details, etag_matches
 from models.match import Match, MatchCreate
 from models.match_details import MatchDetails
-from app import get_current_active_user # Import the dependency
+from dependencies import get_current_active_user, get_user_team_ids # Import the dependency
 from models.user import User # Import User model
+from pagination import PageParams, page_response
 
 router = APIRouter()
 
 @router.post("/matches", response_model=Match)
-def create_match(match: MatchCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def create_match(match: MatchCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = MatchService(db)
     return service.create_match(match, user_team_ids)
 
 @router.get("/matches", response_model=List[Match])
-def get_all_matches(status: Optional[str] = None, event_id: Optional[str] = None, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
-    service = MatchService(db)
-    return service.get_all_matches(user_team_ids, status=status, event_id=event_id)
+async def get_all_matches(status: Optional[str] = None, event_id: Optional[str] = None, page: PageParams = Depends(), db = Depends(get_async_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
+    service = AsyncMatchService(db)
+    return page_response(await service.list_matches(user_team_ids, page, status=status, event_id=event_id))
 
 @router.get("/matches/{match_id}", response_model=Match)
-def get_match(match_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
-    service = MatchService(db)
-    match = service.get_match(match_id, user_team_ids)
+async def get_match(match_id: str, db = Depends(get_async_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
+    service = AsyncMatchService(db)
+    match = await service.get_match(match_id, user_team_ids)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
     return match
 
 @router.put("/matches/{match_id}", response_model=Match)
-def update_match(match_id: str, match_update: MatchCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def update_match(match_id: str, match_update: MatchCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = MatchService(db)
     match = service.update_match(match_id, match_update, user_team_ids)
     if not match:
@@ -49,22 +39,24 @@ def update_match(match_id: str, match_update: MatchCreate, db: Connection = Depe
     return match
 
 @router.delete("/matches/{match_id}")
-def delete_match(match_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def delete_match(match_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = MatchService(db)
     if not service.delete_match(match_id, user_team_ids):
         raise HTTPException(status_code=404, detail="Match not found")
     return {"message": "Match deleted successfully"}
 
 @router.get("/matches/{match_id}/details", response_model=MatchDetails)
-def get_match_details(match_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
-    service = MatchService(db)
-    details = service.get_match_details(match_id, user_team_ids, current_user.id)
-    if not details:
+def get_match_details(match_id: str, if_none_match: Optional[str] = Header(None), current_user: User = Depends(get_current_active_user), user_team_ids: List[str] = Depends(get_user_team_ids)):
+    def build():
+        # Only lease a connection when the payload is not cached.
+        with pool.connection() as db:
+            return MatchService(db).get_match_details(match_id, user_team_ids, current_user.id)
+
+    cached = get_or_build_match_details(match_id, current_user.id, user_team_ids, build)
+    if not cached:
         raise HTTPException(status_code=404, detail="Match details not found")
-    return details
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Optional
+from pagination import PageParams, page_response
 from database import get_db, Connection
 from services.match_event_service import MatchEventService
 from models.match_event import MatchEvent, MatchEventCreate
-from app import get_current_active_user # Import the dependency
+from dependencies import get_current_active_user # Import the dependency
 
 router = APIRouter()
 
@@ -13,9 +14,9 @@ def create_match_event(event: MatchEventCreate, db: Connection = Depends(get_db)
     return service.create_match_event(event)
 
 @router.get("/match_events", response_model=List[MatchEvent])
-def get_all_match_events(db: Connection = Depends(get_db), current_user: dict = Depends(get_current_active_user)):
+def get_all_match_events(match_id: Optional[str] = None, page: PageParams = Depends(), db: Connection = Depends(get_db), current_user: dict = Depends(get_current_active_user)):
     service = MatchEventService(db)
-    return service.get_all_match_events()
+    return page_response(service.list_match_events(page, match_id=match_id))
 
 @router.get("/match_events/{event_id}", response_model=MatchEvent)
 def get_match_event(event_id: str, db: Connection = Depends(get_db), current_user: dict = Depends(get_current_active_user)):
@@ -1,35 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from typing import List
+from pagination import PageParams, page_response
 from database import get_db, Connection
 from services.player_service import PlayerService
-from services.team_service import TeamService # New import
 from models.player import Player, PlayerCreate
-from app import get_current_active_user # Import the dependency
-from models.user import User # Import User model
+from dependencies import get_user_team_ids # Import the dependency
 
 router = APIRouter()
 
 @router.post("/players", response_model=Player)
-def create_player(player: PlayerCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def create_player(player: PlayerCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = PlayerService(db)
     return service.create_player(player, user_team_ids)
 
 @router.get("/players", response_model=List[Player])
-def get_all_players(db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def get_all_players(page: PageParams = Depends(), db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = PlayerService(db)
-    return service.get_all_players(user_team_ids)
+    return page_response(service.list_players(user_team_ids, page))
 
 @router.get("/players/{player_id}", response_model=Player)
-def get_player(player_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def get_player(player_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = PlayerService(db)
     player = service.get_player(player_id, user_team_ids)
     if not player:
@@ -37,10 +27,7 @@ def get_player(player_id: str, db: Connection = Depends(get_db), current_user: U
     return player
 
 @router.put("/players/{player_id}", response_model=Player)
-def update_player(player_id: str, player_update: PlayerCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def update_player(player_id: str, player_update: PlayerCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = PlayerService(db)
     player = service.update_player(player_id, player_update, user_team_ids)
     if not player:
@@ -48,20 +35,14 @@ def update_player(player_id: str, player_update: PlayerCreate, db: Connection =
     return player
 
 @router.delete("/players/{player_id}")
-def delete_player(player_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def delete_player(player_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = PlayerService(db)
     if not service.delete_player(player_id, user_team_ids):
         raise HTTPException(status_code=404, detail="Player not found")
     return {"message": "Player deleted successfully"}
 
 @router.post("/players/{player_id}/upload_image", response_model=Player)
-def upload_player_image(player_id: str, file: UploadFile = File(...), db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def upload_player_image(player_id: str, file: UploadFile = File(...), db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = PlayerService(db)
     
     # First, verify the player belongs to one of the user's teams
@@ -3,40 +3,39 @@ from typing import List
 from database import get_db, Connection
 from services.staff_service import StaffService
 from models.staff import Staff, StaffCreate
-from app import get_current_active_user # Import the dependency
-from models.user import User # Import User model
+from dependencies import get_user_team_ids # Import the dependency
 
 router = APIRouter()
 
 @router.post("/staff", response_model=Staff)
-def create_staff(staff: StaffCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def create_staff(staff: StaffCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = StaffService(db)
-    return service.create_staff(staff)
+    return service.create_staff(staff, user_team_ids)
 
 @router.get("/staff", response_model=List[Staff])
-def get_all_staff(db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def get_all_staff(db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = StaffService(db)
-    return service.get_all_staff()
+    return service.get_all_staff(user_team_ids)
 
 @router.get("/staff/{staff_id}", response_model=Staff)
-def get_staff(staff_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def get_staff(staff_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = StaffService(db)
-    staff = service.get_staff(staff_id)
+    staff = service.get_staff(staff_id, user_team_ids)
     if not staff:
         raise HTTPException(status_code=404, detail="Staff not found")
     return staff
 
 @router.put("/staff/{staff_id}", response_model=Staff)
-def update_staff(staff_id: str, staff_update: StaffCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def update_staff(staff_id: str, staff_update: StaffCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = StaffService(db)
-    staff = service.update_staff(staff_id, staff_update)
+    staff = service.update_staff(staff_id, staff_update, user_team_ids)
     if not staff:
         raise HTTPException(status_code=404, detail="Staff not found")
     return staff
 
 @router.delete("/staff/{staff_id}")
-def delete_staff(staff_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def delete_staff(staff_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = StaffService(db)
-    if not service.delete_staff(staff_id):
+    if not service.delete_staff(staff_id, user_team_ids):
         raise HTTPException(status_code=404, detail="Staff not found")
     return {"message": "Staff deleted successfully"}
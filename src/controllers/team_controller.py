@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from typing import List
 from database import get_db, Connection
-from services.team_service import TeamService
+from async_database import get_async_db
+from services.team_service import TeamService, AsyncTeamService
 from models.team import Team, TeamCreate
-from app import get_current_active_user # Import the dependency
+from dependencies import get_current_active_user # Import the dependency
 from models.user import User # Import User model
 
 router = APIRouter()
@@ -14,9 +15,9 @@ def create_team(team: TeamCreate, db: Connection = Depends(get_db), current_user
     return service.create_team(team, current_user.id)
 
 @router.get("/teams", response_model=List[Team])
-def get_all_teams(db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    service = TeamService(db)
-    return service.get_all_teams(current_user.id)
+async def get_all_teams(db = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
+    service = AsyncTeamService(db)
+    return await service.get_all_teams(current_user.id)
 
 @router.get("/teams/by_name/{name}", response_model=Team)
 def get_team_by_name(name: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
@@ -27,9 +28,9 @@ def get_team_by_name(name: str, db: Connection = Depends(get_db), current_user:
     return team
 
 @router.get("/teams/{team_id}", response_model=Team)
-def get_team(team_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    service = TeamService(db)
-    team = service.get_team(team_id, current_user.id)
+async def get_team(team_id: str, db = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
+    service = AsyncTeamService(db)
+    team = await service.get_team(team_id, current_user.id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team
@@ -0,0 +1,53 @@
+import asyncio
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Literal, Optional
+from async_database import get_async_db
+from services.match_service import AsyncMatchService
+from services.tracking_service import get_tracking_window, get_player_heatmaps, parse_player_ids, encode_tracking_json, encode_tracking_npy
+from dependencies import get_user_team_ids
+
+router = APIRouter(prefix="/matches", tags=["tracking"])
+
+@router.get("/{match_id}/tracking")
+async def get_match_tracking(
+    match_id: str,
+    entity: Literal["players", "ball"] = "players",
+    start: Optional[float] = Query(None, ge=0, description="Window start in seconds"),
+    end: Optional[float] = Query(None, ge=0, description="Window end in seconds"),
+    start_frame: Optional[int] = Query(None, ge=0),
+    end_frame: Optional[int] = Query(None, ge=0),
+    players: Optional[str] = Query(None, description="Comma-separated player ids"),
+    step: int = Query(1, ge=1, description="Keep every Nth frame"),
+    format: Literal["json", "npy"] = "json",
+    db = Depends(get_async_db),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+):
+    """Frame-level positions for a time window, read from the match's tracking store."""
+    window = await get_tracking_window(
+        match_id, entity, user_team_ids, AsyncMatchService(db),
+        start=start, end=end, start_frame=start_frame, end_frame=end_frame,
+        player_ids=parse_player_ids(players), step=step,
+    )
+    if format == "npy":
+        body = await asyncio.to_thread(encode_tracking_npy, window)
+        return Response(content=body, media_type="application/octet-stream", headers={"Content-Disposition": f'attachment; filename="{match_id}-{entity}.npy"'})
+    body = await asyncio.to_thread(encode_tracking_json, match_id, entity, window)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/{match_id}/tracking/heatmaps")
+async def get_match_heatmaps(
+    match_id: str,
+    start: Optional[float] = Query(None, ge=0, description="Window start in seconds"),
+    end: Optional[float] = Query(None, ge=0, description="Window end in seconds"),
+    start_frame: Optional[int] = Query(None, ge=0),
+    end_frame: Optional[int] = Query(None, ge=0),
+    players: Optional[str] = Query(None, description="Comma-separated player ids"),
+    db = Depends(get_async_db),
+    user_team_ids: List[str] = Depends(get_user_team_ids),
+):
+    """Time-weighted heatmaps per tracked player and analyzer team label."""
+    return await get_player_heatmaps(
+        match_id, user_team_ids, AsyncMatchService(db),
+        start=start, end=end, start_frame=start_frame, end_frame=end_frame,
+        player_ids=parse_player_ids(players),
+    )
@@ -1,35 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Optional
+from pagination import PageParams, page_response
 from database import get_db, Connection
 from services.video_segment_service import VideoSegmentService
 from models.video_segment import VideoSegment, VideoSegmentCreate
-from app import get_current_active_user # Import the dependency
-from services.team_service import TeamService # New import
-from models.user import User # Import User model
+from dependencies import get_user_team_ids # Import the dependency
 
 router = APIRouter()
 
 @router.post("/video_segments", response_model=VideoSegment)
-def create_video_segment(segment: VideoSegmentCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def create_video_segment(segment: VideoSegmentCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = VideoSegmentService(db)
     return service.create_video_segment(segment, user_team_ids)
 
 @router.get("/video_segments", response_model=List[VideoSegment])
-def get_all_video_segments(db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def get_all_video_segments(match_id: Optional[str] = None, page: PageParams = Depends(), db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = VideoSegmentService(db)
-    return service.get_all_video_segments(user_team_ids)
+    return page_response(service.list_video_segments(user_team_ids, page, match_id=match_id))
 
 @router.get("/video_segments/{segment_id}", response_model=VideoSegment)
-def get_video_segment(segment_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def get_video_segment(segment_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = VideoSegmentService(db)
     segment = service.get_video_segment(segment_id, user_team_ids)
     if not segment:
@@ -37,10 +27,7 @@ def get_video_segment(segment_id: str, db: Connection = Depends(get_db), current
     return segment
 
 @router.put("/video_segments/{segment_id}", response_model=VideoSegment)
-def update_video_segment(segment_id: str, segment_update: VideoSegmentCreate, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def update_video_segment(segment_id: str, segment_update: VideoSegmentCreate, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = VideoSegmentService(db)
     segment = service.update_video_segment(segment_id, segment_update, user_team_ids)
     if not segment:
@@ -48,10 +35,7 @@ def update_video_segment(segment_id: str, segment_update: VideoSegmentCreate, db
     return segment
 
 @router.delete("/video_segments/{segment_id}")
-def delete_video_segment(segment_id: str, db: Connection = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    team_service = TeamService(db)
-    user_teams = team_service.get_all_teams(current_user.id)
-    user_team_ids = [team.id for team in user_teams]
+def delete_video_segment(segment_id: str, db: Connection = Depends(get_db), user_team_ids: List[str] = Depends(get_user_team_ids)):
     service = VideoSegmentService(db)
     if not service.delete_video_segment(segment_id, user_team_ids):
         raise HTTPException(status_code=404, detail="Video Segment not found")
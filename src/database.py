@@ -3,6 +3,11 @@ from pymysql.cursors import DictCursor
 from pymysql.connections import Connection
 
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
 
 # Database configuration (use environment variables; defaults target XAMPP local setup)
 DB_CONFIG = {
@@ -15,15 +20,253 @@ DB_CONFIG = {
     'cursorclass': DictCursor
 }
 
+# Connection pool sizing (seconds for the time based settings)
+POOL_CONFIG = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '20')),
+    'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+    'idle_timeout': float(os.environ.get('DB_POOL_IDLE_TIMEOUT', '300')),
+    'checkout_timeout': float(os.environ.get('DB_POOL_CHECKOUT_TIMEOUT', '10')),
+}
+
+
+class PoolTimeoutError(pymysql.OperationalError):
+    """Raised when no connection could be leased before `checkout_timeout`."""
+
+
+class _PooledConnection:
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Thread-safe pool of PyMySQL connections.
+
+    Connections are health-checked with `ping()` on checkout, replaced once they
+    exceed `max_lifetime`, and closed after `idle_timeout` seconds unused (while
+    keeping at least `min_size` open). Any open transaction is rolled back when a
+    connection is returned so the next lease never sees a stale snapshot.
+    """
+
+    def __init__(self, config: Dict, min_size: int = 2, max_size: int = 20,
+                 max_lifetime: float = 1800, idle_timeout: float = 300,
+                 checkout_timeout: float = 10):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.config = config
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._recycled = 0
+        self._failed_checks = 0
+
+    def _open(self) -> _PooledConnection:
+        conn = pymysql.connect(**self.config)
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(conn)
+
+    def _discard(self, item: _PooledConnection):
+        try:
+            item.conn.close()
+        except Exception:
+            pass
+
+    def _expired(self, item: _PooledConnection, now: float) -> bool:
+        return self.max_lifetime > 0 and now - item.created_at > self.max_lifetime
+
+    def _reap_idle(self, now: float):
+        """Drop idle connections over their idle timeout. Caller holds the lock."""
+        if self.idle_timeout <= 0:
+            return []
+        reaped = []
+        # Oldest idle connections sit at the left of the deque.
+        while self._idle and self._size > self.min_size and now - self._idle[0].last_used > self.idle_timeout:
+            reaped.append(self._idle.popleft())
+            self._size -= 1
+            self._recycled += 1
+        return reaped
+
+    def acquire(self) -> Connection:
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            item = None
+            must_open = False
+            with self._cond:
+                stale = self._reap_idle(time.monotonic())
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f"Timed out after {self.checkout_timeout}s waiting for a database connection")
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if self._idle:
+                    # LIFO keeps the hottest connections busy and lets the rest idle out.
+                    item = self._idle.pop()
+                else:
+                    self._size += 1
+                    must_open = True
+                self._in_use += 1
+            for old in stale:
+                self._discard(old)
+
+            if must_open:
+                try:
+                    item = self._open()
+                except Exception:
+                    self._forget()
+                    raise
+                return self._lease(item)
+
+            now = time.monotonic()
+            if self._expired(item, now):
+                self._discard(item)
+                with self._cond:
+                    self._recycled += 1
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                continue
+            try:
+                item.conn.ping(reconnect=False)
+            except Exception:
+                self._discard(item)
+                with self._cond:
+                    self._failed_checks += 1
+                    self._recycled += 1
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                continue
+            return self._lease(item)
+
+    def _lease(self, item: _PooledConnection) -> Connection:
+        item.conn._pool_item = item
+        return item.conn
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify()
+
+    def release(self, conn: Connection, discard: bool = False):
+        item = getattr(conn, '_pool_item', None)
+        if item is None:
+            conn.close()
+            return
+        if not discard:
+            try:
+                # End any transaction left open by read-only requests.
+                conn.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        if not discard and self._expired(item, now):
+            discard = True
+            with self._cond:
+                self._recycled += 1
+        if discard:
+            self._discard(item)
+            self._forget()
+            return
+        item.last_used = now
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(item)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Lease a connection for the duration of a `with` block."""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except pymysql.err.OperationalError:
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def fill(self):
+        """Open connections until `min_size` are available."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                item = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append(item)
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for item in idle:
+            self._discard(item)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'created': self._created,
+                'recycled': self._recycled,
+                'failed_health_checks': self._failed_checks,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            }
+
+
+pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
+
+def get_pool_stats() -> Dict:
+    return pool.stats()
+
+
 def get_db():
-    """Dependency function to get a database connection and ensure it's closed."""
+    """Dependency function to lease a pooled database connection and return it afterwards."""
     conn = None
+    discard = False
     try:
-        conn = pymysql.connect(**DB_CONFIG)
+        conn = pool.acquire()
         yield conn
-    except pymysql.Error as e:
+    except pymysql.err.OperationalError as e:
+        # Connection-level failures: don't hand this connection to anyone else.
+        discard = True
         print(f"Error connecting to database: {e}")
         raise
+    except pymysql.Error as e:
+        print(f"Database error: {e}")
+        raise
     finally:
         if conn:
-            conn.close()
+            pool.release(conn, discard=discard)
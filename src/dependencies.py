@@ -0,0 +1,72 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from async_database import connection as async_connection
+from services.user_service import AsyncUserService, get_cached_principal, cache_principal
+from services.team_service import AsyncTeamService, get_cached_team_ids
+from models.user import User
+
+# Request dependencies shared by `app` and the controllers. They live here rather
+# than in `app` so controllers can import them without importing the application.
+
+# --- Configuration for JWT --- #
+# TODO: Use environment variables for these in production
+SECRET_KEY = "your-secret-key" # openssl rand -hex 32
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/token")
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=15)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        email: str = payload.get("sub")
+        if email is None:
+            raise credentials_exception
+    except JWTError:
+        raise credentials_exception
+    # The token signature is verified above; the cache only saves the user lookup.
+    user = get_cached_principal(email)
+    if user is not None:
+        return user
+    async with async_connection() as db:
+        user_service = AsyncUserService(db)
+        user = await user_service.get_user_by_email(email=email)
+    if user is None:
+        raise credentials_exception
+    cache_principal(user)
+    return user
+
+async def get_current_active_user(current_user: User = Depends(get_current_user)):
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+async def get_user_team_ids(current_user: User = Depends(get_current_active_user)) -> List[str]:
+    """Ids of the teams owned by the current user, used to scope every query.
+
+    Served from the per-user team scope cache; a connection is only leased on a miss.
+    """
+    user_team_ids = get_cached_team_ids(current_user.id)
+    if user_team_ids is not None:
+        return user_team_ids
+    async with async_connection() as db:
+        return await AsyncTeamService(db).get_team_ids(current_user.id)
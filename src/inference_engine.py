@@ -0,0 +1,239 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Square network input size the model was exported with.
+DETECTION_INPUT_SIZE = int(os.environ.get('DETECTION_INPUT_SIZE', '640'))
+DETECTION_CONF_THRESHOLD = float(os.environ.get('DETECTION_CONF_THRESHOLD', '0.25'))
+DETECTION_NMS_THRESHOLD = float(os.environ.get('DETECTION_NMS_THRESHOLD', '0.45'))
+# Comma-separated class names in model output order; empty means a COCO model
+# (class 0 "person" reported as player, 32 "sports ball" as ball, others dropped).
+DETECTION_CLASS_NAMES = os.environ.get('DETECTION_CLASS_NAMES', '')
+# Images per forward pass and how long the first request of a batch waits for company.
+DETECTION_MAX_BATCH = int(os.environ.get('DETECTION_MAX_BATCH', '8'))
+DETECTION_MAX_WAIT_MS = float(os.environ.get('DETECTION_MAX_WAIT_MS', '5'))
+# Requests queued before /detect answers 503 (0 = unbounded).
+DETECTION_MAX_PENDING = int(os.environ.get('DETECTION_MAX_PENDING', '256'))
+
+_COCO_CLASSES = {0: 'player', 32: 'ball'}
+_LABEL_COLORS = {'player': (0, 255, 0), 'ball': (255, 255, 255)}
+_DEFAULT_COLOR = (255, 0, 0)
+_LETTERBOX_FILL = 114
+
+# cv2 is imported inside the methods that use it: importing this module (and with
+# it the API) should not pay for OpenCV until a model is actually loaded.
+
+
+class DetectorOverloadedError(RuntimeError):
+    """Raised when the detection queue is full."""
+
+
+class OnnxDetector:
+    """YOLOv8 ONNX model run on CPU with OpenCV's DNN module.
+
+    `detect_batch` letterboxes all images into one preallocated NCHW blob and runs a
+    single forward pass. Models exported with a fixed batch size of 1 are detected on
+    the first batched call and run image by image from then on.
+    """
+
+    def __init__(self, model_path: str, input_size: int = DETECTION_INPUT_SIZE, max_batch: int = DETECTION_MAX_BATCH,
+                 class_names: str = DETECTION_CLASS_NAMES):
+        self.model_path = model_path
+        self.input_size = input_size
+        self.max_batch = max(1, max_batch)
+        self.classes = dict(enumerate(name.strip() for name in class_names.split(','))) if class_names else _COCO_CLASSES
+        import cv2
+
+        self._net = cv2.dnn.readNetFromONNX(model_path)
+        self._blob = np.empty((self.max_batch, 3, input_size, input_size), dtype=np.float32)
+        self._fixed_batch = False
+        # The blob and the network are shared; one forward pass at a time.
+        self._lock = threading.Lock()
+
+    def new_batch_buffer(self) -> np.ndarray:
+        return np.empty((self.max_batch, 3, self.input_size, self.input_size), dtype=np.float32)
+
+    def prepare(self, image: np.ndarray, out: np.ndarray):
+        """Letterbox `image` into one slot of a batch buffer; returns what `detect_prepared` needs to map boxes back.
+
+        Safe to call from several threads at once on different slots.
+        """
+        import cv2
+
+        # Resize keeping the aspect ratio, pad to the input size and write CHW RGB into `out`.
+        size = self.input_size
+        height, width = image.shape[:2]
+        scale = min(size / height, size / width)
+        new_w, new_h = int(round(width * scale)), int(round(height * scale))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+        canvas = np.full((size, size, 3), _LETTERBOX_FILL, dtype=np.uint8)
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=out, casting='unsafe')
+        return scale, pad_x, pad_y, width, height
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        self._net.setInput(blob)
+        return self._net.forward()
+
+    def _postprocess(self, output: np.ndarray, scale: float, pad_x: int, pad_y: int, width: int, height: int) -> List[Dict]:
+        import cv2
+
+        # YOLOv8 output per image is (4 + classes, anchors): cx, cy, w, h then class scores.
+        predictions = output.T
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = (confidences >= DETECTION_CONF_THRESHOLD) & np.isin(class_ids, list(self.classes))
+        boxes = predictions[keep, :4].astype(np.float64)
+        class_ids, confidences = class_ids[keep], confidences[keep]
+        if not len(boxes):
+            return []
+        # Centre/size in network pixels to a top-left box in image pixels, clipped to the image.
+        x1 = np.clip((boxes[:, 0] - boxes[:, 2] / 2 - pad_x) / scale, 0, width)
+        y1 = np.clip((boxes[:, 1] - boxes[:, 3] / 2 - pad_y) / scale, 0, height)
+        x2 = np.clip((boxes[:, 0] + boxes[:, 2] / 2 - pad_x) / scale, 0, width)
+        y2 = np.clip((boxes[:, 1] + boxes[:, 3] / 2 - pad_y) / scale, 0, height)
+        boxes = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+        indices = cv2.dnn.NMSBoxesBatched(boxes.tolist(), confidences.tolist(), class_ids.tolist(),
+                                          DETECTION_CONF_THRESHOLD, DETECTION_NMS_THRESHOLD)
+        detections = []
+        for i in np.asarray(indices, dtype=np.int64).reshape(-1):
+            label = self.classes[int(class_ids[i])]
+            detections.append({
+                "box": [int(round(v)) for v in boxes[i]],
+                "label": label,
+                "confidence": round(float(confidences[i]), 4),
+                "color": _LABEL_COLORS.get(label, _DEFAULT_COLOR),
+            })
+        return detections
+
+    def _detect_blob(self, blob: np.ndarray, letterboxes: Sequence[tuple]) -> List[List[Dict]]:
+        import cv2
+
+        if self._fixed_batch or len(blob) == 1:
+            outputs = [self._forward(blob[i:i + 1])[0] for i in range(len(blob))]
+        else:
+            try:
+                outputs = self._forward(blob)
+            except cv2.error:
+                print(f"Warning: {self.model_path} does not accept batches; running images one at a time")
+                self._fixed_batch = True
+                outputs = [self._forward(blob[i:i + 1])[0] for i in range(len(blob))]
+        return [self._postprocess(output, *letterbox) for output, letterbox in zip(outputs, letterboxes)]
+
+    def detect_prepared(self, blob: np.ndarray, letterboxes: Sequence[tuple]) -> List[List[Dict]]:
+        """Detections for images already written into `blob` with `prepare`."""
+        with self._lock:
+            return self._detect_blob(blob, letterboxes)
+
+    def detect_batch(self, images: Sequence[np.ndarray]) -> List[List[Dict]]:
+        results = []
+        with self._lock:
+            for start in range(0, len(images), self.max_batch):
+                chunk = images[start:start + self.max_batch]
+                blob = self._blob[:len(chunk)]
+                letterboxes = [self.prepare(image, blob[i]) for i, image in enumerate(chunk)]
+                results.extend(self._detect_blob(blob, letterboxes))
+        return results
+
+
+class MicroBatcher:
+    """Coalesces concurrent detection requests into batched calls on one worker thread.
+
+    The first queued image waits at most `max_wait_ms` for others; whatever has
+    arrived by then (up to `max_batch`) goes through `detect_batch` in one call.
+    While a batch runs, the next one fills up, so the event loop is never blocked
+    and the model sees full batches under load.
+    """
+
+    def __init__(self, detect_batch: Callable[[List[np.ndarray]], List[List[Dict]]], max_batch: int = DETECTION_MAX_BATCH,
+                 max_wait_ms: float = DETECTION_MAX_WAIT_MS, max_pending: int = DETECTION_MAX_PENDING):
+        self.detect_batch = detect_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.images = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='detector')
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, image: np.ndarray) -> List[Dict]:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((image, future))
+        except asyncio.QueueFull:
+            raise DetectorOverloadedError('Too many detection requests queued; retry shortly')
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            batch = [(image, future) for image, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.detect_batch, [image for image, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.busy_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.images += len(batch)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches,
+            'images': self.images,
+            'avg_batch_size': round(self.images / self.batches, 2) if self.batches else None,
+            'busy_seconds': round(self.busy_seconds, 3),
+        }
@@ -0,0 +1,407 @@
+"""Versioned schema migrations and chunked backfills.
+
+Migrations live in MIGRATIONS_DIR and are applied in version order:
+
+    V0001__query_indexes.up.sql     statements separated by `;` at the end of a line
+    V0001__query_indexes.down.sql   optional, undoes the up script
+    V0002__some_change.py           defines up(conn) and optionally down(conn)
+
+Applied versions are recorded in `schema_migrations`. MySQL commits every DDL
+statement on its own, so the runner records each finished statement too: a run
+that stops halfway (error, lost connection, Ctrl-C) resumes at the next statement.
+Python migrations are rerun from the start, so they should check before changing
+the schema (`column_exists`, `index_exists`). Their data changes go through
+`backfill`, which resumes where it stopped.
+"""
+import hashlib
+import importlib.util
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import pymysql
+
+# Directory holding the V<version>__<name> migration files.
+MIGRATIONS_DIR = os.environ.get(
+    'MIGRATIONS_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'migrations')))
+# Seconds a DDL statement waits for a table's metadata lock before it gives up and
+# retries. While it waits, every new query on that table queues behind it, so the
+# wait is kept short.
+MIGRATION_LOCK_WAIT_TIMEOUT = int(os.environ.get('MIGRATION_LOCK_WAIT_TIMEOUT', '5'))
+MIGRATION_DDL_RETRIES = int(os.environ.get('MIGRATION_DDL_RETRIES', '20'))
+
+# Rows per backfill chunk (one transaction each), the pause between chunks, and the
+# chunk duration above which the chunk size is halved.
+BACKFILL_BATCH_SIZE = int(os.environ.get('BACKFILL_BATCH_SIZE', '1000'))
+BACKFILL_PAUSE_SECONDS = float(os.environ.get('BACKFILL_PAUSE_SECONDS', '0.1'))
+BACKFILL_MAX_CHUNK_SECONDS = float(os.environ.get('BACKFILL_MAX_CHUNK_SECONDS', '1.0'))
+
+_MIGRATION_FILE_RE = re.compile(r'^V(\d+)__(\w+?)(?:\.(up|down))?\.(sql|py)$')
+_LOCK_NAME = 'schema_migrations'
+_LOCK_WAIT_TIMEOUT_ERRORS = (1205,)
+
+_CREATE_MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT UNSIGNED PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    statements_done INT UNSIGNED NOT NULL DEFAULT 0,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL
+)"""
+_CREATE_BACKFILLS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_backfills (
+    name VARCHAR(255) PRIMARY KEY,
+    last_key VARCHAR(255) NOT NULL DEFAULT '',
+    rows_done BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL
+)"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    up_path: str
+    down_path: Optional[str]
+
+    @property
+    def is_python(self) -> bool:
+        return self.up_path.endswith('.py')
+
+    @property
+    def checksum(self) -> str:
+        with open(self.up_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """All migrations in `directory`, by version; a version may appear only once."""
+    found: Dict[int, Dict[str, Any]] = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE_RE.match(filename)
+        if not match:
+            continue
+        version, name, direction, ext = int(match.group(1)), match.group(2), match.group(3), match.group(4)
+        if (ext == 'sql') != (direction is not None):
+            raise MigrationError(f"{filename}: SQL migrations end in .up.sql/.down.sql, Python ones in .py")
+        entry = found.setdefault(version, {'name': name})
+        if entry['name'] != name:
+            raise MigrationError(f"Version {version} is used by both {entry['name']} and {name}")
+        key = 'down' if direction == 'down' else 'up'
+        if key in entry:
+            raise MigrationError(f"Version {version} has more than one {key} migration")
+        entry[key] = os.path.join(directory, filename)
+    migrations = []
+    for version, entry in sorted(found.items()):
+        if 'up' not in entry:
+            raise MigrationError(f"Version {version} ({entry['name']}) has no up migration")
+        down = entry['up'] if entry['up'].endswith('.py') else entry.get('down')
+        migrations.append(Migration(version, entry['name'], entry['up'], down))
+    return migrations
+
+
+def split_sql(text: str) -> List[str]:
+    """Statements of a migration script: `--` comment lines dropped, split on a trailing `;`."""
+    statements, current = [], []
+    for line in text.splitlines():
+        if line.strip().startswith('--') or not line.strip():
+            continue
+        current.append(line)
+        if line.rstrip().endswith(';'):
+            statements.append('\n'.join(current).rstrip().rstrip(';'))
+            current = []
+    if current:
+        statements.append('\n'.join(current))
+    return statements
+
+
+def execute_ddl(conn, sql: str, params: Sequence[Any] = ()):
+    """Run one schema statement, retrying while the table's metadata lock is busy.
+
+    Online DDL still needs a brief exclusive metadata lock at start and end; a long
+    transaction holding the table would make it wait (and block the app queries
+    behind it), so it times out quickly and tries again a little later.
+    """
+    for attempt in range(MIGRATION_DDL_RETRIES + 1):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, tuple(params) or None)
+            return
+        except pymysql.err.OperationalError as e:
+            if e.args[0] not in _LOCK_WAIT_TIMEOUT_ERRORS or attempt == MIGRATION_DDL_RETRIES:
+                raise
+            print(f"Warning: metadata lock busy, retrying in {attempt + 1}s: {sql.splitlines()[0][:80]}")
+            time.sleep(attempt + 1)
+
+
+def column_exists(conn, table: str, column: str) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() "
+                       "AND table_name = %s AND column_name = %s", (table, column))
+        return cursor.fetchone() is not None
+
+
+def index_exists(conn, table: str, index: str) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                       "AND table_name = %s AND index_name = %s LIMIT 1", (table, index))
+        return cursor.fetchone() is not None
+
+
+def ensure_tables(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(_CREATE_MIGRATIONS_TABLE_SQL)
+        cursor.execute(_CREATE_BACKFILLS_TABLE_SQL)
+    conn.commit()
+
+
+def _table_rows_estimate(conn, table: str) -> int:
+    # InnoDB's statistics estimate; COUNT(*) would scan the whole table.
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+        row = cursor.fetchone()
+    return int(row['table_rows'] or 0) if row else 0
+
+
+def backfill(conn, name: str, table: str, assignments: str, where: str = '', params: Sequence[Any] = (),
+             batch_size: int = BACKFILL_BATCH_SIZE, pause_seconds: float = BACKFILL_PAUSE_SECONDS,
+             max_chunk_seconds: float = BACKFILL_MAX_CHUNK_SECONDS,
+             progress: Optional[Callable[[str], None]] = print) -> int:
+    """`UPDATE table SET assignments WHERE where`, in primary-key chunks that can be resumed.
+
+    Each chunk updates the rows of one `id` range in its own short transaction, so
+    row locks are held only briefly and replicas keep up; the position is saved in
+    `schema_backfills` in the same transaction, and a rerun with the same `name`
+    continues after the last finished chunk. A chunk slower than `max_chunk_seconds`
+    halves the chunk size, and the run pauses `pause_seconds` between chunks to leave
+    room for application traffic. Rows written by the application while it runs must
+    already get the new values from the application itself.
+
+    `assignments` and `where` are SQL fragments; `params` fill their placeholders,
+    those of `assignments` first. Returns the number of rows scanned.
+    """
+    ensure_tables(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT last_key, rows_done, finished_at FROM schema_backfills WHERE name = %s", (name,))
+        state = cursor.fetchone()
+        if state is None:
+            cursor.execute("INSERT INTO schema_backfills (name) VALUES (%s)", (name,))
+            state = {'last_key': '', 'rows_done': 0, 'finished_at': None}
+    conn.commit()
+    if state['finished_at'] is not None:
+        return int(state['rows_done'])
+
+    last_key, rows_done = state['last_key'], int(state['rows_done'])
+    estimate = _table_rows_estimate(conn, table)
+    size = max(1, batch_size)
+    if progress and last_key:
+        progress(f"{name}: resuming after {rows_done} rows")
+    filter_sql = f"({where}) AND " if where else ''
+    while True:
+        started = time.perf_counter()
+        with conn.cursor() as cursor:
+            # Upper key of the chunk, found by walking the primary key index.
+            cursor.execute(f"SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s, 1", (last_key, size - 1))
+            row = cursor.fetchone()
+            upper = row['id'] if row else None
+            if upper is None:
+                # Last chunk: everything after the previous one, rows inserted meanwhile included.
+                cursor.execute(f"SELECT COUNT(*) AS n FROM {table} WHERE id > %s", (last_key,))
+                scanned = cursor.fetchone()['n']
+                cursor.execute(f"UPDATE {table} SET {assignments} WHERE {filter_sql}id > %s", (*params, last_key))
+                cursor.execute("UPDATE schema_backfills SET rows_done = %s, finished_at = NOW() WHERE name = %s",
+                               (rows_done + scanned, name))
+            else:
+                scanned = size
+                cursor.execute(f"UPDATE {table} SET {assignments} WHERE {filter_sql}id > %s AND id <= %s",
+                               (*params, last_key, upper))
+                cursor.execute("UPDATE schema_backfills SET last_key = %s, rows_done = %s WHERE name = %s",
+                               (upper, rows_done + scanned, name))
+            rows_done += scanned
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        if progress:
+            percent = f" (~{min(100.0, 100.0 * rows_done / estimate):.0f}%)" if estimate else ''
+            progress(f"{name}: {rows_done} rows{percent}, last chunk {scanned} rows in {elapsed:.2f}s")
+        if upper is None:
+            return rows_done
+        last_key = upper
+        if elapsed > max_chunk_seconds and size > 1:
+            size = max(1, size // 2)
+        elif elapsed < max_chunk_seconds / 4 and size < batch_size:
+            size = min(batch_size, size * 2)
+        if pause_seconds > 0:
+            time.sleep(pause_seconds)
+
+
+def reset_backfill(conn, name: str):
+    """Forget a backfill's progress, so it starts over; for a migration's down(conn)."""
+    ensure_tables(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM schema_backfills WHERE name = %s", (name,))
+    conn.commit()
+
+
+def _load_python(path: str):
+    spec = importlib.util.spec_from_file_location(f"migration_{os.path.basename(path)[:-3]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MigrationRunner:
+    """Applies and reverts the migrations of one directory on one connection.
+
+    Only one runner works on a database at a time (a MySQL named lock); a second
+    one fails right away instead of racing the first.
+    """
+
+    def __init__(self, conn, directory: str = MIGRATIONS_DIR):
+        self.conn = conn
+        self.migrations = discover(directory)
+
+    def __enter__(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (_LOCK_NAME,))
+            if not cursor.fetchone()['acquired']:
+                raise MigrationError("Another migration run holds the lock on this database")
+            cursor.execute("SET SESSION lock_wait_timeout = %s", (MIGRATION_LOCK_WAIT_TIMEOUT,))
+        ensure_tables(self.conn)
+        return self
+
+    def __exit__(self, *exc):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+
+    def applied(self) -> Dict[int, Dict[str, Any]]:
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT version, name, checksum, statements_done, started_at, finished_at FROM schema_migrations")
+            return {row['version']: row for row in cursor.fetchall()}
+
+    def status(self) -> List[Dict[str, Any]]:
+        """One row per known migration: version, name, state and when it finished."""
+        applied = self.applied()
+        rows = []
+        for migration in self.migrations:
+            record = applied.pop(migration.version, None)
+            if record is None:
+                state = 'pending'
+            elif record['finished_at'] is None:
+                state = f"partial ({record['statements_done']} statements)"
+            elif record['checksum'] != migration.checksum:
+                state = 'applied, file changed since'
+            else:
+                state = 'applied'
+            rows.append({'version': migration.version, 'name': migration.name, 'state': state,
+                         'finished_at': record['finished_at'] if record else None})
+        # Applied versions whose files are gone (e.g. a branch switch).
+        for version, record in sorted(applied.items()):
+            rows.append({'version': version, 'name': record['name'], 'state': 'applied, file missing',
+                         'finished_at': record['finished_at']})
+        return rows
+
+    def upgrade(self, target: Optional[int] = None) -> List[Migration]:
+        """Apply pending migrations up to `target` (all by default), finishing a partial one first."""
+        applied = self.applied()
+        done = []
+        for migration in self.migrations:
+            if target is not None and migration.version > target:
+                break
+            record = applied.get(migration.version)
+            if record is not None and record['finished_at'] is not None:
+                continue
+            self._apply(migration, record)
+            done.append(migration)
+        return done
+
+    def downgrade(self, target: int) -> List[Migration]:
+        """Revert applied migrations newer than `target`, newest first."""
+        applied = self.applied()
+        done = []
+        for migration in reversed(self.migrations):
+            if migration.version <= target or migration.version not in applied:
+                continue
+            if migration.down_path is None:
+                raise MigrationError(f"V{migration.version} {migration.name} has no down migration")
+            self._revert(migration)
+            done.append(migration)
+        return done
+
+    def baseline(self, target: Optional[int] = None) -> List[Migration]:
+        """Record migrations up to `target` as applied without running them.
+
+        For databases created from data/full_creation.sql, which already contains them.
+        """
+        applied = self.applied()
+        done = []
+        with self.conn.cursor() as cursor:
+            for migration in self.migrations:
+                if target is not None and migration.version > target:
+                    break
+                if migration.version in applied:
+                    continue
+                cursor.execute("INSERT INTO schema_migrations (version, name, checksum, finished_at) VALUES (%s, %s, %s, NOW())",
+                               (migration.version, migration.name, migration.checksum))
+                done.append(migration)
+        self.conn.commit()
+        return done
+
+    def _apply(self, migration: Migration, record: Optional[Dict[str, Any]]):
+        checksum = migration.checksum
+        with self.conn.cursor() as cursor:
+            if record is None:
+                cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                               (migration.version, migration.name, checksum))
+                skip = 0
+            elif record['checksum'] != checksum:
+                raise MigrationError(f"V{migration.version} {migration.name} changed since it was partially applied; "
+                                     "finish or undo it by hand and delete its schema_migrations row")
+            else:
+                skip = record['statements_done']
+        self.conn.commit()
+        started = time.perf_counter()
+        print(f"Applying V{migration.version} {migration.name}" + (f" from statement {skip + 1}" if skip else ''))
+        if migration.is_python:
+            _load_python(migration.up_path).up(self.conn)
+            self.conn.commit()
+        else:
+            with open(migration.up_path, encoding='utf-8') as f:
+                statements = split_sql(f.read())
+            for number, statement in enumerate(statements[skip:], start=skip + 1):
+                try:
+                    execute_ddl(self.conn, statement)
+                except pymysql.Error as e:
+                    raise MigrationError(f"V{migration.version} {migration.name}, statement {number}: {e}") from e
+                with self.conn.cursor() as cursor:
+                    cursor.execute("UPDATE schema_migrations SET statements_done = %s WHERE version = %s", (number, migration.version))
+                self.conn.commit()
+        with self.conn.cursor() as cursor:
+            cursor.execute("UPDATE schema_migrations SET finished_at = NOW() WHERE version = %s", (migration.version,))
+        self.conn.commit()
+        print(f"Applied V{migration.version} {migration.name} in {time.perf_counter() - started:.1f}s")
+
+    def _revert(self, migration: Migration):
+        started = time.perf_counter()
+        print(f"Reverting V{migration.version} {migration.name}")
+        if migration.is_python:
+            module = _load_python(migration.down_path)
+            if not hasattr(module, 'down'):
+                raise MigrationError(f"V{migration.version} {migration.name} has no down(conn)")
+            module.down(self.conn)
+        else:
+            with open(migration.down_path, encoding='utf-8') as f:
+                for number, statement in enumerate(split_sql(f.read()), start=1):
+                    try:
+                        execute_ddl(self.conn, statement)
+                    except pymysql.Error as e:
+                        raise MigrationError(f"V{migration.version} {migration.name} down, statement {number}: {e}") from e
+        with self.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (migration.version,))
+        self.conn.commit()
+        print(f"Reverted V{migration.version} {migration.name} in {time.perf_counter() - started:.1f}s")
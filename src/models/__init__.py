@@ -1,5 +1,6 @@
 __all__ = [
     "AnalysisReport", "AnalysisReportCreate",
+    "AnalysisJob", "AnalysisJobStatusEnum",
     "Formation", "FormationCreate",
     "MatchLineup", "MatchLineupCreate",
     "Match", "MatchCreate",
@@ -16,6 +17,7 @@ __all__ = [
 ]
 
 from .analysis_report import AnalysisReport, AnalysisReportCreate
+from .analysis_job import AnalysisJob, AnalysisJobStatusEnum
 from .formation import Formation, FormationCreate
 from .match_lineup import MatchLineup, MatchLineupCreate
 from .match import Match, MatchCreate
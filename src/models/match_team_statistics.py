@@ -16,6 +16,7 @@ class MatchTeamStatisticsBase(BaseModel):
     transition_speed_data: Optional[Dict[str, Any]] = None
     build_up_patterns: Optional[Dict[str, Any]] = None
     defensive_block_patterns: Optional[Dict[str, Any]] = None
+    physical_data: Optional[Dict[str, Any]] = None
 
 class MatchTeamStatisticsCreate(MatchTeamStatisticsBase):
     pass
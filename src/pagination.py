@@ -0,0 +1,165 @@
+import base64
+import json
+import os
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Rows per page when a list request sends no `limit`, and the largest `limit` accepted.
+PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', '100'))
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '1000'))
+
+
+class PageParams:
+    """Query parameters of a paginated list endpoint; use as `page: PageParams = Depends()`."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+        include_total: bool = Query(False, description="Send the total row count in X-Total-Count"),
+    ):
+        self.after = decode_cursor(cursor) if cursor else None
+        self.limit = limit
+        self.fields = [name.strip() for name in fields.split(',') if name.strip()] if fields else None
+        self.include_total = include_total
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    # Datetimes and decimals travel as their str() form, which MySQL compares correctly.
+    raw = json.dumps(list(values), default=str, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or not all(isinstance(v, (str, int, float)) for v in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class KeysetQuery:
+    """A list query paged by keyset: `WHERE (sort key) > last seen key ORDER BY key LIMIT n`.
+
+    `columns` maps every response field to its SQL expression; `order_by` names the
+    sort fields, the last of which must be unique (the row id) so the order is total
+    and no row is skipped or repeated between pages. Unlike OFFSET, the cost of a page
+    does not grow with its position in the list.
+    """
+
+    def __init__(self, from_sql: str, columns: Dict[str, str], order_by: Sequence[str], descending: bool = False):
+        self.from_sql = from_sql
+        self.columns = columns
+        self.order_by = list(order_by)
+        self.descending = descending
+
+    def _select(self, fields: Optional[List[str]]) -> str:
+        if fields:
+            unknown = [name for name in fields if name not in self.columns]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields {', '.join(unknown)}; choose from {', '.join(self.columns)}")
+            names = list(dict.fromkeys(fields + self.order_by))
+        else:
+            names = list(self.columns)
+        return ", ".join(self.columns[name] if self.columns[name] == name else f"{self.columns[name]} AS {name}" for name in names)
+
+    def _after(self, values: List[Any]) -> Tuple[str, List[Any]]:
+        # (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y), which MySQL
+        # turns into an index range scan.
+        if len(values) != len(self.order_by):
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this list")
+        op = '<' if self.descending else '>'
+        keys = [self.columns[name] for name in self.order_by]
+        terms, params = [], []
+        for i, key in enumerate(keys):
+            equal = [f"{prefix} = %s" for prefix in keys[:i]]
+            terms.append("(" + " AND ".join(equal + [f"{key} {op} %s"]) + ")")
+            params.extend(values[:i + 1])
+        return "(" + " OR ".join(terms) + ")", params
+
+    def page_sql(self, where: str, params: Sequence[Any], page: PageParams) -> Tuple[str, tuple]:
+        params = list(params)
+        if page.after is not None:
+            after, after_params = self._after(page.after)
+            where = f"({where}) AND {after}" if where else after
+            params.extend(after_params)
+        direction = ' DESC' if self.descending else ''
+        order = ", ".join(self.columns[name] + direction for name in self.order_by)
+        sql = f"SELECT {self._select(page.fields)} FROM {self.from_sql}"
+        if where:
+            sql += f" WHERE {where}"
+        # One extra row tells whether there is a next page.
+        sql += f" ORDER BY {order} LIMIT %s"
+        params.append(page.limit + 1)
+        return sql, tuple(params)
+
+    def count_sql(self, where: str, params: Sequence[Any]) -> Tuple[str, tuple]:
+        sql = f"SELECT COUNT(*) AS total FROM {self.from_sql}"
+        if where:
+            sql += f" WHERE {where}"
+        return sql, tuple(params)
+
+    def make_page(self, rows: List[Dict[str, Any]], page: PageParams, build: Callable[[Dict[str, Any]], Any],
+                  total: Optional[int] = None) -> Page:
+        """Trim the look-ahead row; full rows go through `build`, projected ones stay dicts."""
+        next_cursor = None
+        if len(rows) > page.limit:
+            rows = rows[:page.limit]
+            next_cursor = encode_cursor([rows[-1][name] for name in self.order_by])
+        if page.fields:
+            items = [{name: row[name] for name in page.fields} for row in rows]
+        else:
+            items = [build(row) for row in rows]
+        return Page(items, next_cursor, total)
+
+
+def fetch_page(cursor, query: KeysetQuery, where: str, params: Sequence[Any], page: PageParams,
+               build: Callable[[Dict[str, Any]], Any]) -> Page:
+    """Run a keyset page (and the count when asked for) on a sync dict cursor."""
+    cursor.execute(*query.page_sql(where, params, page))
+    rows = cursor.fetchall()
+    total = None
+    if page.include_total:
+        cursor.execute(*query.count_sql(where, params))
+        total = cursor.fetchone()['total']
+    return query.make_page(list(rows), page, build, total)
+
+
+async def fetch_page_async(cursor, query: KeysetQuery, where: str, params: Sequence[Any], page: PageParams,
+                           build: Callable[[Dict[str, Any]], Any]) -> Page:
+    await cursor.execute(*query.page_sql(where, params, page))
+    rows = await cursor.fetchall()
+    total = None
+    if page.include_total:
+        await cursor.execute(*query.count_sql(where, params))
+        total = (await cursor.fetchone())['total']
+    return query.make_page(list(rows), page, build, total)
+
+
+def page_response(page: Page) -> JSONResponse:
+    """The page items as JSON with the X-Next-Cursor / X-Total-Count headers."""
+    headers = {}
+    if page.next_cursor:
+        headers['X-Next-Cursor'] = page.next_cursor
+    if page.total is not None:
+        headers['X-Total-Count'] = str(page.total)
+    # Decimals as strings, matching how the response models serialize them.
+    content = jsonable_encoder(page.items, custom_encoder={Decimal: str})
+    return JSONResponse(content=content, headers=headers)
+
+
+def empty_page(page: PageParams) -> Page:
+    return Page([], None, 0 if page.include_total else None)
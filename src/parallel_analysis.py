@@ -0,0 +1,305 @@
+import asyncio
+import csv
+import json
+import os
+import shutil
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analysis_engine import PLAYER_METRICS_SCHEMA, BALL_METRICS_SCHEMA, _read_metrics_csv
+from services.analysis_progress import ProgressTracker
+
+# Split videos into up to this many segments analyzed side by side (1 disables splitting).
+ANALYSIS_SEGMENTS = int(os.environ.get('ANALYSIS_SEGMENTS', '1'))
+# Videos are not split into segments shorter than this many seconds.
+ANALYSIS_SEGMENT_MIN_SECONDS = float(os.environ.get('ANALYSIS_SEGMENT_MIN_SECONDS', '300'))
+# Largest x/y distance (CSV units, meters with a calibration) for a player to keep their id across a seam.
+ANALYSIS_SEAM_MAX_DISTANCE = float(os.environ.get('ANALYSIS_SEAM_MAX_DISTANCE', '3.0'))
+# Frames on either side of a seam searched for the last/first sighting of each player.
+ANALYSIS_SEAM_WINDOW_FRAMES = int(os.environ.get('ANALYSIS_SEAM_WINDOW_FRAMES', '25'))
+FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
+FFPROBE_PATH = os.environ.get('FFPROBE_PATH', 'ffprobe')
+
+# Columns holding player ids that must be rewritten when ids are reconciled.
+_PLAYER_ID_COLUMNS = ('player_id', 'possession_player_id')
+
+
+class VideoSegment:
+    __slots__ = ('path', 'start_seconds', 'duration_seconds', 'frame_offset')
+
+    def __init__(self, path: str, start_seconds: float, duration_seconds: float, frame_offset: int):
+        self.path = path
+        self.start_seconds = start_seconds
+        self.duration_seconds = duration_seconds
+        self.frame_offset = frame_offset
+
+
+async def _run_tool(*cmd: str) -> str:
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(cmd[0])} failed: {stderr.decode(errors='replace')[-500:]}")
+    return stdout.decode(errors='replace')
+
+
+async def probe_video(video_path: str) -> Tuple[float, float]:
+    """Return `(duration_seconds, fps)` of the first video stream."""
+    output = await _run_tool(FFPROBE_PATH, '-v', 'error', '-select_streams', 'v:0',
+                             '-show_entries', 'stream=avg_frame_rate:format=duration', '-of', 'json', video_path)
+    info = json.loads(output)
+    numerator, _, denominator = info['streams'][0]['avg_frame_rate'].partition('/')
+    fps = float(numerator) / float(denominator or 1)
+    return float(info['format']['duration']), fps
+
+
+async def split_video(video_path: str, segment_dir: str, segment_seconds: float, fps: float) -> List[VideoSegment]:
+    """Cut the video into ~`segment_seconds` pieces with stream copy.
+
+    Stream copy can only cut on keyframes, so ffmpeg picks the first keyframe after
+    each target time; the real boundaries come back in the segment list.
+    """
+    os.makedirs(segment_dir, exist_ok=True)
+    segment_list = os.path.join(segment_dir, 'segments.csv')
+    extension = os.path.splitext(video_path)[1] or '.mp4'
+    await _run_tool(FFMPEG_PATH, '-v', 'error', '-i', video_path, '-map', '0:v:0', '-an', '-c', 'copy',
+                    '-f', 'segment', '-segment_time', f"{segment_seconds:.3f}", '-reset_timestamps', '1',
+                    '-segment_list', segment_list, '-segment_list_type', 'csv',
+                    os.path.join(segment_dir, f"seg_%03d{extension}"))
+    segments = []
+    with open(segment_list, newline='') as handle:
+        for name, start, end in csv.reader(handle):
+            start_seconds = float(start)
+            segments.append(VideoSegment(os.path.join(segment_dir, name), start_seconds,
+                                         float(end) - start_seconds, int(round(start_seconds * fps))))
+    return segments
+
+
+def _concat_tables(tables: List[np.ndarray]) -> np.ndarray:
+    tables = [table for table in tables if table.dtype.names]
+    if not tables:
+        return np.empty(0, dtype=[])
+    names = tables[0].dtype.names
+    # Segments can type a sparse column differently; promote to a common dtype per field.
+    dtype = []
+    for name in names:
+        field_dtype = tables[0].dtype[name]
+        for table in tables[1:]:
+            field_dtype = np.promote_types(field_dtype, table.dtype[name])
+        dtype.append((name, field_dtype))
+    merged = np.empty(sum(len(table) for table in tables), dtype=dtype)
+    start = 0
+    for table in tables:
+        for name in names:
+            merged[name][start:start + len(table)] = table[name]
+        start += len(table)
+    return merged
+
+
+def _sightings(table: np.ndarray, frames: np.ndarray, last: bool) -> Dict[int, np.ndarray]:
+    """Position of each player at their last (or first) frame among `table` rows."""
+    order = np.argsort(frames, kind='stable')
+    if last:
+        order = order[::-1]
+    positions = {}
+    for i in order:
+        player_id = int(table['player_id'][i])
+        if player_id < 0 or player_id in positions:
+            continue
+        x, y = float(table['x'][i]), float(table['y'][i])
+        if x == x and y == y:
+            positions[player_id] = np.array([x, y])
+    return positions
+
+
+def _match_across_seam(before: Dict[int, np.ndarray], after: Dict[int, np.ndarray]) -> Dict[int, int]:
+    """Greedy nearest-neighbour pairing of `after` ids to `before` ids within the distance limit."""
+    if not before or not after:
+        return {}
+    before_ids, after_ids = list(before), list(after)
+    distances = np.linalg.norm(
+        np.stack([after[i] for i in after_ids])[:, None, :] - np.stack([before[i] for i in before_ids])[None, :, :],
+        axis=2,
+    )
+    matches = {}
+    used_before = set()
+    for flat in np.argsort(distances, axis=None):
+        a, b = np.unravel_index(flat, distances.shape)
+        if distances[a, b] > ANALYSIS_SEAM_MAX_DISTANCE:
+            break
+        if after_ids[a] in matches or b in used_before:
+            continue
+        matches[after_ids[a]] = before_ids[b]
+        used_before.add(b)
+    return matches
+
+
+def _remap_ids(table: np.ndarray, mapping: Dict, column: str):
+    values = table[column]
+    unique, inverse = np.unique(values, return_inverse=True)
+    table[column] = np.array([mapping.get(value, value) for value in unique.tolist()], dtype=values.dtype)[inverse]
+
+
+def _replace_field(table: np.ndarray, name: str, values: np.ndarray) -> np.ndarray:
+    """Copy of `table` with field `name` set to `values`, widened to fit them."""
+    dtype = [(field, values.dtype if field == name else table.dtype[field]) for field in table.dtype.names]
+    replaced = np.empty(len(table), dtype=dtype)
+    for field in table.dtype.names:
+        replaced[field] = values if field == name else table[field]
+    return replaced
+
+
+def _reconcile_player_ids(player_tables: List[np.ndarray], ball_tables: List[np.ndarray]) -> int:
+    """Give each player one id across all segments; returns the number of ids carried over a seam.
+
+    The analyzer numbers players per run, so ids restart in every segment. With frame
+    and x/y columns a player seen at the end of one segment is matched to the nearest
+    player at the start of the next; everyone else gets a fresh id. Without positions
+    every segment's ids are simply moved into their own range. Tables are updated in
+    place in the lists; segments without output (no columns) are skipped.
+    """
+    indexes = [k for k, table in enumerate(player_tables) if 'player_id' in (table.dtype.names or ())]
+    if not indexes:
+        return 0
+    if any(player_tables[k]['player_id'].dtype.kind not in 'iu' for k in indexes):
+        for k in indexes[1:]:
+            table = player_tables[k]
+            # np.char.add returns a wider string than the field holds; assigning it back would truncate.
+            player_tables[k] = _replace_field(table, 'player_id', np.char.add(f"s{k}_", table['player_id'].astype(str)))
+        return 0
+
+    has_positions = all(column in player_tables[k].dtype.names for k in indexes for column in ('frame', 'x', 'y'))
+    next_id = int(player_tables[indexes[0]]['player_id'].max(initial=-1)) + 1
+    carried = 0
+    for previous_k, k in zip(indexes, indexes[1:]):
+        previous, current = player_tables[previous_k], player_tables[k]
+        current_ids = [int(i) for i in np.unique(current['player_id']) if i >= 0]
+        matches = {}
+        if has_positions and len(previous) and len(current):
+            prev_frames, cur_frames = previous['frame'], current['frame']
+            before = _sightings(previous[prev_frames >= prev_frames.max() - ANALYSIS_SEAM_WINDOW_FRAMES],
+                                prev_frames[prev_frames >= prev_frames.max() - ANALYSIS_SEAM_WINDOW_FRAMES], last=True)
+            after = _sightings(current[cur_frames <= cur_frames.min() + ANALYSIS_SEAM_WINDOW_FRAMES],
+                               cur_frames[cur_frames <= cur_frames.min() + ANALYSIS_SEAM_WINDOW_FRAMES], last=False)
+            matches = _match_across_seam(before, after)
+        mapping = {}
+        for player_id in current_ids:
+            if player_id in matches:
+                mapping[player_id] = matches[player_id]
+                carried += 1
+            else:
+                mapping[player_id] = next_id
+                next_id += 1
+        _remap_ids(current, mapping, 'player_id')
+        if k < len(ball_tables) and 'possession_player_id' in (ball_tables[k].dtype.names or ()):
+            _remap_ids(ball_tables[k], mapping, 'possession_player_id')
+    return carried
+
+
+def _shift_timeline(table: np.ndarray, segment: VideoSegment):
+    names = table.dtype.names or ()
+    if 'frame' in names:
+        frames = table['frame']
+        table['frame'] = np.where(frames >= 0, frames + segment.frame_offset, frames)
+    if 'timestamp' in names:
+        table['timestamp'] = table['timestamp'] + segment.start_seconds
+
+
+def _write_metrics_csv(path: str, table: np.ndarray):
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(table.dtype.names or ())
+        writer.writerows(table.tolist())
+
+
+def merge_segment_outputs(segments: List[VideoSegment], segment_out_dirs: List[str], out_dir: str) -> Dict:
+    """Merge per-segment CSVs into one timeline in `out_dir`, like a single analyzer run."""
+    player_tables, ball_tables = [], []
+    for segment, segment_out in zip(segments, segment_out_dirs):
+        player_table = _read_metrics_csv(os.path.join(segment_out, 'player_metrics.csv'), PLAYER_METRICS_SCHEMA)
+        ball_table = _read_metrics_csv(os.path.join(segment_out, 'ball_metrics.csv'), BALL_METRICS_SCHEMA)
+        _shift_timeline(player_table, segment)
+        _shift_timeline(ball_table, segment)
+        player_tables.append(player_table)
+        ball_tables.append(ball_table)
+
+    carried = _reconcile_player_ids(player_tables, ball_tables)
+    _write_metrics_csv(os.path.join(out_dir, 'player_metrics.csv'), _concat_tables(player_tables))
+    _write_metrics_csv(os.path.join(out_dir, 'ball_metrics.csv'), _concat_tables(ball_tables))
+    return {'segments': len(segments), 'ids_carried_across_seams': carried}
+
+
+def plan_segment_count(duration_seconds: float) -> int:
+    if ANALYSIS_SEGMENTS <= 1 or ANALYSIS_SEGMENT_MIN_SECONDS <= 0:
+        return 1
+    return max(1, min(ANALYSIS_SEGMENTS, int(duration_seconds // ANALYSIS_SEGMENT_MIN_SECONDS)))
+
+
+async def analyze_in_segments(
+    video_path: str,
+    out_dir: str,
+    run_segment: Callable[[str, str, Callable[[Dict], Awaitable[None]]], Awaitable[None]],
+    on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None,
+) -> Optional[Dict]:
+    """Analyze `video_path` as parallel segments and merge their CSVs into `out_dir`.
+
+    `run_segment(segment_path, segment_out_dir, on_progress)` runs the analyzer on one
+    segment. Returns merge stats, or None when the video should be analyzed in one
+    piece (splitting disabled, video too short, or ffmpeg unavailable).
+    """
+    if ANALYSIS_SEGMENTS <= 1 or shutil.which(FFMPEG_PATH) is None or shutil.which(FFPROBE_PATH) is None:
+        return None
+    try:
+        duration, fps = await probe_video(video_path)
+        count = plan_segment_count(duration)
+        if count <= 1:
+            return None
+        segment_dir = os.path.join(out_dir, 'segments')
+        segments = await split_video(video_path, segment_dir, duration / count, fps)
+    except (RuntimeError, OSError, ValueError, KeyError, IndexError, ZeroDivisionError) as e:
+        print(f"Warning: could not split {video_path} into segments, analyzing it whole: {e}")
+        return None
+    if len(segments) <= 1:
+        return None
+
+    # Overall progress counts frames over all segments; segments that have not reported
+    # a frame total yet are estimated from their duration.
+    tracker = ProgressTracker()
+    segment_totals = [max(1, int(round(segment.duration_seconds * fps))) for segment in segments]
+    segment_frames = [0] * len(segments)
+
+    def segment_reporter(index: int):
+        async def report(progress: Dict):
+            if progress.get('total_frames'):
+                segment_totals[index] = progress['total_frames']
+            if progress.get('frame') is not None:
+                segment_frames[index] = progress['frame']
+            else:
+                segment_frames[index] = int(segment_totals[index] * progress['progress_percent'] / 100.0)
+            if on_progress is not None:
+                frames, total = sum(segment_frames), sum(segment_totals)
+                await on_progress(tracker.update(frames, total, 100.0 * frames / total))
+        return report
+
+    segment_out_dirs = []
+    for index in range(len(segments)):
+        segment_out = os.path.join(segment_dir, f"out_{index:03d}")
+        os.makedirs(segment_out)
+        segment_out_dirs.append(segment_out)
+
+    tasks = [
+        asyncio.ensure_future(run_segment(segment.path, segment_out, segment_reporter(index)))
+        for index, (segment, segment_out) in enumerate(zip(segments, segment_out_dirs))
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # One segment failed (or the job was cancelled): cancel the others, which kills
+        # their analyzer processes, and wait for them before the caller removes out_dir.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    stats = await asyncio.to_thread(merge_segment_outputs, segments, segment_out_dirs, out_dir)
+    shutil.rmtree(segment_dir, ignore_errors=True)
+    return stats
@@ -0,0 +1,71 @@
+import json
+from typing import Dict, List, Optional, Any
+from models.analysis_job import AnalysisJob, AnalysisJobStatusEnum
+
+_SELECT_JOB_SQL = "SELECT * FROM analysis_jobs WHERE id = %s AND user_id = %s"
+_SELECT_LATEST_MATCH_JOB_SQL = "SELECT * FROM analysis_jobs WHERE match_id = %s AND user_id = %s ORDER BY created_at DESC LIMIT 1"
+_INSERT_JOB_SQL = "INSERT INTO analysis_jobs (id, match_id, user_id, status, progress_percent, runner) VALUES (%s, %s, %s, 'PENDING', 0, %s)"
+_SELECT_UNFINISHED_JOBS_SQL = "SELECT id, runner FROM analysis_jobs WHERE status IN ('PENDING', 'PROCESSING') AND runner LIKE %s"
+
+def _to_model(data: Dict[str, Any]) -> AnalysisJob:
+    if isinstance(data.get('result'), str):
+        try:
+            data['result'] = json.loads(data['result'])
+        except json.JSONDecodeError:
+            data['result'] = None
+    return AnalysisJob(**data)
+
+
+class AsyncAnalysisJobService:
+    """Durable state for video analysis jobs, stored in `analysis_jobs` via aiomysql."""
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+
+    async def create_job(self, job_id: str, match_id: Optional[str], user_id: str, runner: str) -> AnalysisJob:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_INSERT_JOB_SQL, (job_id, match_id, user_id, runner))
+            await self.db_connection.commit()
+            await cursor.execute(_SELECT_JOB_SQL, (job_id, user_id))
+            return _to_model(await cursor.fetchone())
+
+    async def get_job(self, job_id: str, user_id: str) -> Optional[AnalysisJob]:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_JOB_SQL, (job_id, user_id))
+            job = await cursor.fetchone()
+            if job:
+                return _to_model(job)
+            return None
+
+    async def get_latest_job_for_match(self, match_id: str, user_id: str) -> Optional[AnalysisJob]:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_LATEST_MATCH_JOB_SQL, (match_id, user_id))
+            job = await cursor.fetchone()
+            if job:
+                return _to_model(job)
+            return None
+
+    async def _update(self, job_id: str, assignments: str, params: tuple):
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(f"UPDATE analysis_jobs SET {assignments} WHERE id = %s", params + (job_id,))
+            await self.db_connection.commit()
+
+    async def mark_processing(self, job_id: str):
+        await self._update(job_id, "status = %s, started_at = NOW()", (AnalysisJobStatusEnum.PROCESSING.value,))
+
+    async def update_progress(self, job_id: str, progress_percent: float):
+        await self._update(job_id, "progress_percent = %s", (round(progress_percent, 2),))
+
+    async def mark_completed(self, job_id: str, result: Dict[str, Any]):
+        await self._update(job_id, "status = %s, progress_percent = 100, result = %s, finished_at = NOW()",
+                           (AnalysisJobStatusEnum.COMPLETED.value, json.dumps(result)))
+
+    async def mark_failed(self, job_id: str, error: str):
+        await self._update(job_id, "status = %s, error = %s, finished_at = NOW()",
+                           (AnalysisJobStatusEnum.FAILED.value, error))
+
+    async def get_unfinished_jobs(self, runner_prefix: str) -> List[Dict[str, str]]:
+        """`id`/`runner` of PENDING or PROCESSING jobs started by runners matching the prefix."""
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_UNFINISHED_JOBS_SQL, (runner_prefix + '%',))
+            return list(await cursor.fetchall())
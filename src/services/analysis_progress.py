@@ -0,0 +1,100 @@
+import asyncio
+import re
+import time
+from typing import Dict, Optional, Set, Tuple
+
+# Progress lines printed by test_runner, e.g. "Frame 120/5400", "processed 120 / 5400 frames"
+# or "Progress: 12.5%". A line may contain either form.
+_FRAME_PROGRESS_RE = re.compile(r'frames?\D{0,20}?(\d+)\s*(?:/|of)\s*(\d+)|(\d+)\s*/\s*(\d+)\s*frames?', re.IGNORECASE)
+_PERCENT_PROGRESS_RE = re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%')
+
+
+def parse_progress_line(line: str) -> Optional[Tuple[Optional[int], Optional[int], Optional[float]]]:
+    """Return `(frame, total_frames, percent)` for an analyzer progress line, else None."""
+    match = _FRAME_PROGRESS_RE.search(line)
+    if match:
+        frame, total = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        frame, total = int(frame), int(total)
+        if total > 0 and frame <= total:
+            return frame, total, 100.0 * frame / total
+    match = _PERCENT_PROGRESS_RE.search(line)
+    if match and float(match.group(1)) <= 100:
+        return None, None, float(match.group(1))
+    return None
+
+
+class ProgressTracker:
+    """Turns successive progress lines into progress, fps and ETA for one analyzer run."""
+
+    def __init__(self):
+        self.first_seen: Optional[Tuple[float, float, Optional[int]]] = None
+        self.state: Dict = {'progress_percent': 0.0, 'frame': None, 'total_frames': None, 'fps': None, 'eta_seconds': None}
+
+    def update(self, frame: Optional[int], total_frames: Optional[int], percent: float) -> Dict:
+        now = time.monotonic()
+        if self.first_seen is None:
+            self.first_seen = (now, percent, frame)
+        started_at, start_percent, start_frame = self.first_seen
+        elapsed = now - started_at
+
+        fps = eta = None
+        if frame is not None and start_frame is not None and elapsed > 0 and frame > start_frame:
+            fps = (frame - start_frame) / elapsed
+            eta = (total_frames - frame) / fps
+        elif elapsed > 0 and percent > start_percent:
+            eta = (100.0 - percent) * elapsed / (percent - start_percent)
+
+        self.state = {
+            'progress_percent': round(percent, 2),
+            'frame': frame,
+            'total_frames': total_frames,
+            'fps': round(fps, 2) if fps is not None else None,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+        }
+        return self.state
+
+
+class ProgressBroker:
+    """In-process fan-out of job progress events to Server-Sent Events subscribers.
+
+    Only jobs running in this worker publish here; subscribers fall back to the
+    job row in the database for jobs owned by other workers.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._latest: Dict[str, Dict] = {}
+
+    def is_live(self, job_id: str) -> bool:
+        return job_id in self._latest
+
+    def publish(self, job_id: str, event: Dict):
+        self._latest[job_id] = event
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                # Slow client: drop the oldest update, the newest one supersedes it.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def finish(self, job_id: str, event: Dict):
+        self.publish(job_id, event)
+        self._latest.pop(job_id, None)
+
+    def subscribe(self, job_id: str) -> Tuple[asyncio.Queue, Optional[Dict]]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue, self._latest.get(job_id)
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def stats(self) -> Dict:
+        return {'live_jobs': len(self._latest), 'subscribers': sum(len(s) for s in self._subscribers.values())}
+
+
+progress_broker = ProgressBroker()
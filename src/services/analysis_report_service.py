@@ -1,24 +1,39 @@
 from typing import List, Optional
 from models.analysis_report import AnalysisReport, AnalysisReportCreate
+from pagination import KeysetQuery, Page, PageParams, empty_page, fetch_page
 import json
+import uuid
+from datetime import datetime
+
+# Newest reports first.
+_REPORT_LIST = KeysetQuery(
+    "analysis_reports ar JOIN matches m ON ar.match_id = m.id",
+    {name: f"ar.{name}" for name in AnalysisReport.model_fields},
+    order_by=("generated_at", "id"),
+    descending=True,
+)
+
+def _load_report_data(report: dict) -> dict:
+    if isinstance(report.get('report_data'), str):
+        report['report_data'] = json.loads(report['report_data'])
+    return report
 
 class AnalysisReportService:
     def __init__(self, db_connection):
         self.db_connection = db_connection
 
-    def create_analysis_report(self, report: AnalysisReportCreate, user_team_ids: List[str]) -> AnalysisReport:
+    def create_analysis_report(self, report: AnalysisReportCreate, user_team_ids: List[str], commit: bool = True) -> AnalysisReport:
         # Validate that the match's teams are owned by the user
         # This requires fetching match details, which is complex here.
         # For simplicity, we'll assume match_id is valid and linked to user's team via MatchService.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO analysis_reports (id, match_id, report_type, report_data, generated_by) VALUES (UUID(), %s, %s, %s, %s)"
-            cursor.execute(sql, (report.match_id, report.report_type, json.dumps(report.report_data), report.generated_by))
-            self.db_connection.commit()
-            cursor.execute("SELECT * FROM analysis_reports WHERE match_id = %s ORDER BY generated_at DESC LIMIT 1", (report.match_id,))
-            new_report = cursor.fetchone()
-            if new_report and isinstance(new_report['report_data'], str):
-                new_report['report_data'] = json.loads(new_report['report_data'])
-            return AnalysisReport(**new_report)
+            new_report_id = str(uuid.uuid4())
+            generated_at = datetime.now().replace(microsecond=0)
+            sql = "INSERT INTO analysis_reports (id, match_id, report_type, report_data, generated_at, generated_by) VALUES (%s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_report_id, report.match_id, report.report_type, json.dumps(report.report_data), generated_at, report.generated_by))
+            if commit:
+                self.db_connection.commit()
+        return AnalysisReport(id=new_report_id, generated_at=generated_at, **report.model_dump())
 
     def get_analysis_report(self, report_id: str, user_team_ids: List[str]) -> Optional[AnalysisReport]:
         with self.db_connection.cursor() as cursor:
@@ -43,6 +58,21 @@ class AnalysisReportService:
                     report['report_data'] = json.loads(report['report_data'])
             return [AnalysisReport(**report) for report in reports]
 
+    def list_analysis_reports(self, user_team_ids: List[str], page: PageParams, match_id: Optional[str] = None) -> Page:
+        if not user_team_ids:
+            return empty_page(page)
+        where = "(m.home_team_id IN %s OR m.away_team_id IN %s)"
+        params = [user_team_ids, user_team_ids]
+        if match_id:
+            where += " AND ar.match_id = %s"
+            params.append(match_id)
+        with self.db_connection.cursor() as cursor:
+            result = fetch_page(cursor, _REPORT_LIST, where, params, page, lambda row: AnalysisReport(**_load_report_data(row)))
+        if page.fields:
+            for report in result.items:
+                _load_report_data(report)
+        return result
+
     def update_analysis_report(self, report_id: str, report_update: AnalysisReportCreate, user_team_ids: List[str]) -> Optional[AnalysisReport]:
         # Validate that the match's teams are owned by the user
         # This requires fetching match details, which is complex here.
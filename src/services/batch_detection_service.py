@@ -0,0 +1,145 @@
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, UploadFile
+import asyncio
+import itertools
+import json
+import os
+import tarfile
+import zipfile
+
+import numpy as np
+
+from inference_engine import DETECTION_MAX_BATCH
+
+# Threads decoding and resizing frames; cv2 releases the GIL while it works.
+DECODE_WORKERS = int(os.environ.get('DETECTION_DECODE_WORKERS', str(os.cpu_count() or 1)))
+# Frames accepted by one /detect/batch request.
+BATCH_MAX_FRAMES = int(os.environ.get('DETECTION_BATCH_MAX_FRAMES', '2000'))
+
+_decode_pool = ThreadPoolExecutor(max_workers=max(1, DECODE_WORKERS), thread_name_prefix='frame-decode')
+
+Frame = Tuple[str, bytes]
+
+
+def _multipart_frames(uploads: List[UploadFile]) -> Iterator[Frame]:
+    for upload in uploads:
+        upload.file.seek(0)
+        yield upload.filename or '', upload.file.read()
+
+
+def _zip_frames(fileobj) -> Iterator[Frame]:
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if not info.is_dir():
+                yield info.filename, archive.read(info)
+
+
+def _tar_frames(fileobj) -> Iterator[Frame]:
+    # Streaming mode: members are read in order without seeking back.
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, archive.extractfile(member).read()
+
+
+def open_frame_source(files: Optional[List[UploadFile]], archive: Optional[UploadFile]) -> Iterator[Frame]:
+    """Frames as (name, encoded bytes) from multipart files or one zip/tar archive."""
+    if archive is not None:
+        archive.file.seek(0)
+        if zipfile.is_zipfile(archive.file):
+            archive.file.seek(0)
+            return _zip_frames(archive.file)
+        archive.file.seek(0)
+        if tarfile.is_tarfile(archive.file):
+            archive.file.seek(0)
+            return _tar_frames(archive.file)
+        raise HTTPException(status_code=400, detail="archive must be a zip or tar file")
+    if files:
+        return _multipart_frames(files)
+    raise HTTPException(status_code=400, detail="Send images as `files` or one zip/tar `archive`")
+
+
+def _take(frames: Iterator[Frame], count: int) -> List[Frame]:
+    return list(itertools.islice(frames, count))
+
+
+def decode_image(data: bytes) -> Optional[np.ndarray]:
+    """BGR image from encoded bytes, or None if OpenCV cannot decode them."""
+    import cv2
+
+    # np.frombuffer wraps the upload bytes without copying them.
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _decode(data: bytes, detector, buffer: Optional[np.ndarray], slot: int):
+    image = decode_image(data)
+    if image is None or detector is None:
+        return image
+    return detector.prepare(image, buffer[slot])
+
+
+async def _read_and_decode(frames: Iterator[Frame], batch_size: int, detector, buffer: Optional[np.ndarray]):
+    try:
+        chunk = await asyncio.to_thread(_take, frames, batch_size)
+    except (tarfile.TarError, zipfile.BadZipFile, OSError) as e:
+        raise ValueError(f"Could not read archive: {e}")
+    loop = asyncio.get_running_loop()
+    decoded = await asyncio.gather(*(
+        loop.run_in_executor(_decode_pool, _decode, data, detector, buffer, slot)
+        for slot, (_, data) in enumerate(chunk)
+    ))
+    return chunk, decoded
+
+
+def _line(payload: dict) -> str:
+    return json.dumps(payload) + "\n"
+
+
+async def stream_batch_detections(frames: Iterator[Frame], analyzer, max_frames: int = BATCH_MAX_FRAMES) -> AsyncIterator[str]:
+    """NDJSON detections, one line per frame, emitted as each sub-batch finishes.
+
+    Frames are decoded in parallel straight into one of two preallocated batch
+    buffers; while the model runs on one buffer the next sub-batch is read and
+    decoded into the other.
+    """
+    await asyncio.to_thread(analyzer.load)
+    detector = analyzer.detector
+    batch_size = detector.max_batch if detector is not None else DETECTION_MAX_BATCH
+    buffers = [detector.new_batch_buffer(), detector.new_batch_buffer()] if detector is not None else [None, None]
+    turn = 0
+    index = 0
+    upcoming = asyncio.ensure_future(_read_and_decode(frames, batch_size, detector, buffers[turn]))
+    try:
+        while True:
+            try:
+                chunk, decoded = await upcoming
+            except ValueError as e:
+                yield _line({"error": str(e)})
+                return
+            if not chunk:
+                return
+            if index + len(chunk) > max_frames:
+                yield _line({"error": f"Frame limit of {max_frames} per request reached"})
+                return
+            buffer = buffers[turn]
+            turn ^= 1
+            upcoming = asyncio.ensure_future(_read_and_decode(frames, batch_size, detector, buffers[turn]))
+
+            valid = [slot for slot, item in enumerate(decoded) if item is not None]
+            if not valid:
+                results = []
+            elif detector is None:
+                results = await asyncio.to_thread(analyzer.analyze_batch, [decoded[slot] for slot in valid])
+            else:
+                blob = buffer[:len(chunk)] if len(valid) == len(chunk) else buffer[valid]
+                results = await asyncio.to_thread(detector.detect_prepared, blob, [decoded[slot] for slot in valid])
+            by_slot = dict(zip(valid, results))
+            for slot, (name, _) in enumerate(chunk):
+                if slot in by_slot:
+                    yield _line({"index": index + slot, "filename": name, "detections": by_slot[slot]})
+                else:
+                    yield _line({"index": index + slot, "filename": name, "error": "Could not decode image"})
+            index += len(chunk)
+    finally:
+        upcoming.cancel()
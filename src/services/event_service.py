@@ -1,5 +1,7 @@
 from typing import List, Optional
 from models.event import Event, EventCreate
+import uuid
+from datetime import datetime
 
 class EventService:
     def __init__(self, db_connection):
@@ -9,12 +11,12 @@ class EventService:
         # Events are not directly linked to teams in the model, 
         # but if they were, we'd validate user_team_ids here.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO events (id, name) VALUES (UUID(), %s)"
-            cursor.execute(sql, (event.name,))
+            new_event_id = str(uuid.uuid4())
+            created_at = datetime.now().replace(microsecond=0)
+            sql = "INSERT INTO events (id, name, created_at) VALUES (%s, %s, %s)"
+            cursor.execute(sql, (new_event_id, event.name, created_at))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM events WHERE name = %s ORDER BY created_at DESC LIMIT 1", (event.name,))
-            new_event = cursor.fetchone()
-            return Event(**new_event)
+        return Event(id=new_event_id, created_at=created_at, **event.model_dump())
 
     def get_event(self, event_id: str, user_team_ids: List[str]) -> Optional[Event]:
         # Events are not directly linked to teams in the model, 
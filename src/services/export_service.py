@@ -0,0 +1,163 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import json
+import os
+
+import pymysql
+from pymysql.cursors import SSDictCursor
+
+from database import pool
+
+# Rows read from the server per fetch; each fetch becomes one response chunk.
+EXPORT_FETCH_ROWS = int(os.environ.get('EXPORT_FETCH_ROWS', '1000'))
+# Seconds MySQL waits on a slow export client before aborting the result stream
+# (the server default of 60s is too short for a client reading a season export).
+EXPORT_NET_WRITE_TIMEOUT = int(os.environ.get('EXPORT_NET_WRITE_TIMEOUT', '600'))
+
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'json': 'application/json'}
+
+Row = Dict[str, Any]
+
+
+def _json_default(value):
+    # Same representations the response models produce.
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_json_default, separators=(',', ':'))
+
+
+class ExportStream:
+    """Rows of one query read with an unbuffered server-side cursor and encoded in chunks.
+
+    The query runs when the stream is opened, so database errors surface before the
+    response starts. Iterating yields one chunk of `fetch_rows` encoded rows at a time;
+    only that chunk is ever held in memory. The pooled connection is returned once the
+    result is fully read; a stream abandoned midway (client gone) discards it instead,
+    since the unread rest of the result would otherwise have to be drained first.
+    """
+
+    def __init__(self, sql: str, params: Sequence[Any], fmt: str = 'ndjson',
+                 prepare: Optional[Callable[[Row], Row]] = None, fetch_rows: int = EXPORT_FETCH_ROWS):
+        if fmt not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unknown export format {fmt}")
+        self.fmt = fmt
+        self.media_type = EXPORT_MEDIA_TYPES[fmt]
+        self.prepare = prepare
+        self.fetch_rows = max(1, fetch_rows)
+        self.rows = 0
+        self._cursor = None
+        self._conn = pool.acquire()
+        try:
+            with self._conn.cursor() as cursor:
+                cursor.execute("SET SESSION net_write_timeout = %s", (EXPORT_NET_WRITE_TIMEOUT,))
+            self._cursor = self._conn.cursor(SSDictCursor)
+            self._cursor.execute(sql, tuple(params))
+        except pymysql.err.OperationalError:
+            self.close(discard=True)
+            raise
+        except Exception:
+            self.close(discard=False)
+            raise
+
+    def _encode(self, rows: List[Row]) -> List[str]:
+        if self.prepare is not None:
+            rows = [self.prepare(row) for row in rows]
+        return [_encoder.encode(row) for row in rows]
+
+    def __iter__(self) -> Iterator[str]:
+        finished = False
+        try:
+            if self.fmt == 'json':
+                yield '['
+            separator = ''
+            while True:
+                rows = self._cursor.fetchmany(self.fetch_rows)
+                if not rows:
+                    break
+                encoded = self._encode(rows)
+                self.rows += len(encoded)
+                if self.fmt == 'ndjson':
+                    yield '\n'.join(encoded) + '\n'
+                else:
+                    yield separator + ','.join(encoded)
+                    separator = ','
+            if self.fmt == 'json':
+                yield ']'
+            finished = True
+        finally:
+            self.close(discard=not finished)
+
+    def close(self, discard: bool = True):
+        """Give the connection back; safe to call more than once."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if not discard:
+            try:
+                if self._cursor is not None:
+                    self._cursor.close()
+                with conn.cursor() as cursor:
+                    cursor.execute("SET SESSION net_write_timeout = DEFAULT")
+            except pymysql.Error:
+                discard = True
+        pool.release(conn, discard=discard)
+
+
+def _load_json_column(name: str) -> Callable[[Row], Row]:
+    # JSON columns come back as text; decode them so they nest in the exported row.
+    def prepare(row: Row) -> Row:
+        if isinstance(row.get(name), str):
+            row[name] = json.loads(row[name])
+        return row
+    return prepare
+
+
+def _scope(alias: str, user_team_ids: List[str], match_id: Optional[str], since: Optional[date], until: Optional[date]):
+    where = "(m.home_team_id IN %s OR m.away_team_id IN %s)"
+    params: List[Any] = [user_team_ids, user_team_ids]
+    if match_id:
+        where += f" AND {alias}.match_id = %s"
+        params.append(match_id)
+    if since:
+        where += " AND m.date_time >= %s"
+        params.append(since)
+    if until:
+        # `until` is inclusive: everything before the next day.
+        where += " AND m.date_time < %s"
+        params.append(until + timedelta(days=1))
+    return where, params
+
+
+def export_player_match_statistics(user_team_ids: List[str], fmt: str, match_id: Optional[str] = None,
+                                   since: Optional[date] = None, until: Optional[date] = None) -> ExportStream:
+    """Every player statistics row of the user's matches, oldest match first."""
+    where, params = _scope('pms', user_team_ids, match_id, since, until)
+    sql = ("SELECT pms.*, m.date_time AS match_date_time FROM player_match_statistics pms "
+           f"JOIN matches m ON pms.match_id = m.id WHERE {where} ORDER BY m.date_time, pms.match_id, pms.id")
+    return ExportStream(sql, params, fmt)
+
+
+def export_analysis_reports(user_team_ids: List[str], fmt: str, match_id: Optional[str] = None,
+                            since: Optional[date] = None, until: Optional[date] = None) -> ExportStream:
+    where, params = _scope('ar', user_team_ids, match_id, since, until)
+    sql = ("SELECT ar.id, ar.match_id, ar.report_type, ar.report_data, ar.generated_at, ar.generated_by "
+           f"FROM analysis_reports ar JOIN matches m ON ar.match_id = m.id WHERE {where} ORDER BY ar.generated_at, ar.id")
+    return ExportStream(sql, params, fmt, prepare=_load_json_column('report_data'))
+
+
+def export_match_events(user_team_ids: List[str], fmt: str, match_id: Optional[str] = None,
+                        since: Optional[date] = None, until: Optional[date] = None) -> ExportStream:
+    where, params = _scope('me', user_team_ids, match_id, since, until)
+    sql = ("SELECT me.* FROM match_events me "
+           f"JOIN matches m ON me.match_id = m.id WHERE {where} ORDER BY m.date_time, me.match_id, me.minute, me.id")
+    return ExportStream(sql, params, fmt)
@@ -1,6 +1,8 @@
 import json
 from typing import List, Optional
 from models.formation import Formation, FormationCreate
+import uuid
+from datetime import datetime
 
 class FormationService:
     def __init__(self, db_connection):
@@ -19,12 +21,12 @@ class FormationService:
     def create_formation(self, formation: FormationCreate, user_id: str) -> Formation:
         with self.db_connection.cursor() as cursor:
             positions_json = json.dumps(formation.positions) if formation.positions is not None else None
-            sql = "INSERT INTO formations (id, name, description, positions, user_id) VALUES (UUID(), %s, %s, %s, %s)"
-            cursor.execute(sql, (formation.name, formation.description, positions_json, user_id))
+            new_formation_id = str(uuid.uuid4())
+            created_at = datetime.now().replace(microsecond=0)
+            sql = "INSERT INTO formations (id, name, description, positions, user_id, created_at) VALUES (%s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_formation_id, formation.name, formation.description, positions_json, user_id, created_at))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM formations WHERE name = %s AND user_id = %s ORDER BY created_at DESC LIMIT 1", (formation.name, user_id))
-            new_formation = cursor.fetchone()
-            return self._to_model(new_formation)
+        return Formation(**{**formation.model_dump(), 'id': new_formation_id, 'user_id': user_id, 'created_at': created_at})
 
     def get_formation(self, formation_id: str, user_id: str) -> Optional[Formation]:
         with self.db_connection.cursor() as cursor:
@@ -33,6 +35,15 @@ class FormationService:
             formation = cursor.fetchone()
             return self._to_model(formation)
 
+    def get_formations_by_ids(self, formation_ids: List[str], user_id: str) -> List[Formation]:
+        if not formation_ids:
+            return []
+        with self.db_connection.cursor() as cursor:
+            sql = "SELECT * FROM formations WHERE id IN %s AND (user_id = %s OR user_id IS NULL)"
+            cursor.execute(sql, (list(set(formation_ids)), user_id))
+            formations = cursor.fetchall()
+            return [self._to_model(f) for f in formations]
+
     def get_all_formations(self, user_id: str) -> List[Formation]:
         with self.db_connection.cursor() as cursor:
             sql = "SELECT * FROM formations WHERE user_id = %s OR user_id IS NULL"
@@ -0,0 +1,266 @@
+import asyncio
+import os
+import re
+import socket
+import tempfile
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from analysis_engine import ANALYZER_TIMEOUT, build_analyzer_command, analysis_cache_key, read_analysis_tables, build_analysis_result, parse_and_persist_results
+from analysis_cache import analysis_cache, file_sha256
+from async_database import connection as async_connection
+from database import pool
+from parallel_analysis import analyze_in_segments
+from models.analysis_job import AnalysisJob, AnalysisJobStatusEnum
+from .analysis_job_service import AsyncAnalysisJobService
+from .analysis_progress import ProgressTracker, parse_progress_line, progress_broker
+
+# Identifies the process that owns a job, so a restart can tell its own
+# orphaned jobs apart from jobs still running in sibling workers.
+RUNNER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Progress is streamed to subscribers live but only written to the job row this often.
+PROGRESS_DB_INTERVAL = float(os.environ.get('ANALYSIS_PROGRESS_DB_INTERVAL', '5'))
+
+_LINE_SPLIT_RE = re.compile(rb'[\r\n]')
+
+
+def _runner_alive(runner: str) -> bool:
+    try:
+        pid = int(runner.rsplit(':', 1)[1])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        # Recorded by an earlier process that had our pid (e.g. pid 1 in a restarted container).
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def _pump_lines(stream: asyncio.StreamReader, on_line: Callable[[str], Awaitable[None]]):
+    # Progress bars often redraw with '\r', so both '\r' and '\n' end a line.
+    pending = b''
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            break
+        *lines, pending = _LINE_SPLIT_RE.split(pending + chunk)
+        for line in lines:
+            if line:
+                await on_line(line.decode(errors='replace'))
+    if pending:
+        await on_line(pending.decode(errors='replace'))
+
+
+async def run_analyzer(cmd: List[str], timeout: float = ANALYZER_TIMEOUT,
+                       on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None):
+    """Run the C++ analyzer without blocking the event loop; kills it on timeout or cancellation.
+
+    stdout/stderr are read as they are produced; progress lines are parsed and
+    passed to `on_progress` with fps/ETA estimates.
+    """
+    print(f"Running C++ analyzer: {' '.join(cmd)}")
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    tracker = ProgressTracker()
+    stderr_tail = deque(maxlen=20)
+
+    async def handle(line: str, is_stderr: bool):
+        if is_stderr:
+            stderr_tail.append(line)
+        progress = parse_progress_line(line)
+        if progress is not None and on_progress is not None:
+            await on_progress(tracker.update(*progress))
+
+    async def handle_stdout(line: str):
+        await handle(line, False)
+
+    async def handle_stderr(line: str):
+        await handle(line, True)
+
+    try:
+        await asyncio.wait_for(asyncio.gather(
+            _pump_lines(proc.stdout, handle_stdout),
+            _pump_lines(proc.stderr, handle_stderr),
+            proc.wait(),
+        ), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise RuntimeError('C++ analyzer timed out')
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        stderr_text = '\n'.join(stderr_tail)
+        print('Analyzer failed:', stderr_text)
+        raise RuntimeError(f"C++ analyzer exited with status {proc.returncode}: {stderr_text[-500:]}")
+
+
+def _collect_results(video_path: str, out_dir: str, match_id: Optional[str], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Parse the analyzer output once and persist it for `user_id`; runs in a worker thread."""
+    player_table, ball_table = read_analysis_tables(out_dir)
+    result = build_analysis_result(video_path, player_table, ball_table)
+    if match_id:
+        with pool.connection() as db:
+            result['persisted'] = parse_and_persist_results(out_dir, db, match_id, player_table=player_table, ball_table=ball_table, generated_by=user_id)
+    return result
+
+
+class AnalysisJobManager:
+    """Runs video analysis jobs in the background, at most `max_concurrency` at a time.
+
+    Analyzer processes are limited separately to `max_processes`, since a job split
+    into segments runs several of them at once. Job state lives in the `analysis_jobs` table so clients can poll it from any
+    worker and it survives restarts. Each job owns its video file and deletes it
+    when it finishes.
+    """
+
+    def __init__(self, max_concurrency: int, max_processes: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_processes = max(1, max_processes)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._process_slots = asyncio.Semaphore(self.max_processes)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = 0
+        self._processes = 0
+        self._segmented = 0
+        self._completed = 0
+        self._failed = 0
+
+    async def submit(self, video_path: str, user_id: str, match_id: Optional[str] = None, video_sha256: Optional[str] = None) -> AnalysisJob:
+        """Record a PENDING job and schedule it; returns without waiting for the analyzer."""
+        job_id = str(uuid.uuid4())
+        async with async_connection() as db:
+            job = await AsyncAnalysisJobService(db).create_job(job_id, match_id, user_id, RUNNER_ID)
+        task = asyncio.create_task(self._run(job_id, video_path, match_id, video_sha256, user_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def _set_state(self, job_id: str, method: str, *args):
+        try:
+            async with async_connection() as db:
+                await getattr(AsyncAnalysisJobService(db), method)(job_id, *args)
+        except Exception as e:
+            print(f"Warning: could not update analysis job {job_id}: {e}")
+
+    def _progress_reporter(self, job_id: str) -> Callable[[Dict], Awaitable[None]]:
+        last_write = 0.0
+
+        async def report(progress: Dict):
+            nonlocal last_write
+            progress_broker.publish(job_id, {'job_id': job_id, 'status': AnalysisJobStatusEnum.PROCESSING.value, **progress})
+            now = time.monotonic()
+            if now - last_write >= PROGRESS_DB_INTERVAL:
+                last_write = now
+                await self._set_state(job_id, 'update_progress', progress['progress_percent'])
+
+        return report
+
+    async def _run_process(self, video_path: str, out_dir: str, on_progress: Callable[[Dict], Awaitable[None]]):
+        async with self._process_slots:
+            self._processes += 1
+            try:
+                await run_analyzer(build_analyzer_command(video_path, out_dir), on_progress=on_progress)
+            finally:
+                self._processes -= 1
+
+    async def _analyze(self, job_id: str, video_path: str, out_dir: str) -> int:
+        """Run the analyzer into `out_dir`, split into parallel segments when enabled; returns the segment count."""
+        reporter = self._progress_reporter(job_id)
+        merged = await analyze_in_segments(video_path, out_dir, self._run_process, reporter)
+        if merged is not None:
+            self._segmented += 1
+            return merged['segments']
+        await self._run_process(video_path, out_dir, reporter)
+        return 1
+
+    async def _run(self, job_id: str, video_path: str, match_id: Optional[str], video_sha256: Optional[str], user_id: Optional[str] = None):
+        try:
+            async with self._semaphore:
+                self._running += 1
+                try:
+                    progress_broker.publish(job_id, {'job_id': job_id, 'status': AnalysisJobStatusEnum.PROCESSING.value, 'progress_percent': 0.0})
+                    await self._set_state(job_id, 'mark_processing')
+                    with tempfile.TemporaryDirectory() as out_dir:
+                        cached = False
+                        segments = 0
+                        if analysis_cache.enabled:
+                            video_sha256 = video_sha256 or await asyncio.to_thread(file_sha256, video_path)
+                            cache_key = analysis_cache_key(video_sha256)
+                            cached = await asyncio.to_thread(analysis_cache.restore, cache_key, out_dir)
+                        if not cached:
+                            segments = await self._analyze(job_id, video_path, out_dir)
+                            if analysis_cache.enabled:
+                                await asyncio.to_thread(analysis_cache.store, cache_key, out_dir)
+                        result = await asyncio.to_thread(_collect_results, video_path, out_dir, match_id, user_id)
+                    result['video_sha256'] = video_sha256
+                    result['cached'] = cached
+                    result['segments'] = segments
+                finally:
+                    self._running -= 1
+            await self._set_state(job_id, 'mark_completed', result)
+            progress_broker.finish(job_id, {'job_id': job_id, 'status': AnalysisJobStatusEnum.COMPLETED.value, 'progress_percent': 100.0})
+            self._completed += 1
+        except asyncio.CancelledError:
+            self._failed += 1
+            await self._fail(job_id, 'Cancelled: server shutting down')
+            raise
+        except Exception as e:
+            self._failed += 1
+            print(f"Warning: analysis job {job_id} failed: {e}")
+            await self._fail(job_id, str(e) or type(e).__name__)
+        finally:
+            try:
+                os.remove(video_path)
+            except OSError:
+                pass
+
+    async def _fail(self, job_id: str, error: str):
+        await self._set_state(job_id, 'mark_failed', error)
+        progress_broker.finish(job_id, {'job_id': job_id, 'status': AnalysisJobStatusEnum.FAILED.value, 'error': error})
+
+    async def recover_interrupted_jobs(self) -> int:
+        """Fail jobs that an earlier process on this host left PENDING or PROCESSING."""
+        host = RUNNER_ID.rsplit(':', 1)[0]
+        async with async_connection() as db:
+            service = AsyncAnalysisJobService(db)
+            jobs = await service.get_unfinished_jobs(host + ':')
+            interrupted = [job for job in jobs if not _runner_alive(job['runner'])]
+            for job in interrupted:
+                await service.mark_failed(job['id'], 'Interrupted by server restart')
+        return len(interrupted)
+
+    def stats(self) -> Dict:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_processes': self.max_processes,
+            'running': self._running,
+            'analyzer_processes': self._processes,
+            'segmented_jobs': self._segmented,
+            'queued': max(0, len(self._tasks) - self._running),
+            'completed': self._completed,
+            'failed': self._failed,
+            **progress_broker.stats(),
+        }
+
+    async def shutdown(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_max_concurrency = int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', str(os.cpu_count() or 1)))
+job_manager = AnalysisJobManager(
+    max_concurrency=_max_concurrency,
+    max_processes=int(os.environ.get('ANALYSIS_MAX_PROCESSES', str(_max_concurrency))),
+)
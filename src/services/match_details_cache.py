@@ -0,0 +1,82 @@
+import hashlib
+import os
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from cache import make_cache
+from models.match_details import MatchDetails
+
+# Serialized MatchDetails payloads keyed by match and team scope. Each match has a
+# generation token that is part of the payload key; invalidating a match drops the
+# token, which orphans every scope's payload at once (they then age out via TTL).
+match_details_cache = make_cache(
+    'match_details',
+    ttl=float(os.environ.get('MATCH_DETAILS_CACHE_TTL', '600')),
+    maxsize=int(os.environ.get('MATCH_DETAILS_CACHE_SIZE', '2048')),
+)
+
+# Tables whose rows carry a match_id and feed the match details screen.
+_MATCH_CHILD_TABLES = {'match_lineups', 'player_match_statistics', 'match_team_statistics', 'match_events'}
+
+
+def _generation_key(match_id: str) -> str:
+    return f"gen:{match_id}"
+
+
+def _scope_key(user_id: str, user_team_ids: List[str]) -> str:
+    scope = user_id + ':' + ','.join(sorted(user_team_ids))
+    return hashlib.sha1(scope.encode('utf-8')).hexdigest()
+
+
+def _generation(match_id: str) -> str:
+    generation = match_details_cache.get(_generation_key(match_id))
+    if generation is None:
+        generation = uuid.uuid4().hex
+        match_details_cache.set(_generation_key(match_id), generation)
+    return generation
+
+
+def get_or_build_match_details(match_id: str, user_id: str, user_team_ids: List[str],
+                               build: Callable[[], Optional[MatchDetails]]) -> Optional[Tuple[str, str]]:
+    """Return `(json_body, etag)` for a match, building and caching it on a miss.
+
+    Returns None when `build` finds no match for this scope (nothing is cached).
+    """
+    # Read the generation before building so a write that lands mid-build
+    # leaves this payload under an already-invalidated key.
+    generation = _generation(match_id)
+    key = f"details:{match_id}:{generation}:{_scope_key(user_id, user_team_ids)}"
+    cached = match_details_cache.get(key)
+    if cached is not None:
+        return cached['body'], cached['etag']
+
+    details = build()
+    if details is None:
+        return None
+    body = details.model_dump_json()
+    etag = '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+    match_details_cache.set(key, {'body': body, 'etag': etag})
+    return body, etag
+
+
+def invalidate_match_details(*match_ids: Optional[str]):
+    for match_id in set(match_ids):
+        if match_id:
+            match_details_cache.delete(_generation_key(match_id))
+
+
+def lookup_match_id(db_connection, table: str, row_id: str) -> Optional[str]:
+    """match_id of a lineup/stats/event row, read before it is updated or deleted."""
+    if table not in _MATCH_CHILD_TABLES:
+        raise ValueError(f"{table} is not a match child table")
+    with db_connection.cursor() as cursor:
+        cursor.execute(f"SELECT match_id FROM {table} WHERE id = %s", (row_id,))
+        row = cursor.fetchone()
+        return row['match_id'] if row else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or any(tag.removeprefix('W/') == etag for tag in candidates)
@@ -1,5 +1,15 @@
 from typing import List, Optional
 from models.match_event import MatchEvent, MatchEventCreate
+from pagination import KeysetQuery, Page, PageParams, fetch_page
+from .match_details_cache import invalidate_match_details, lookup_match_id
+import uuid
+
+# Grouped by match, in match-minute order within each.
+_EVENT_LIST = KeysetQuery(
+    "match_events",
+    {name: name for name in MatchEvent.model_fields},
+    order_by=("match_id", "minute", "id"),
+)
 
 class MatchEventService:
     def __init__(self, db_connection):
@@ -7,12 +17,12 @@ class MatchEventService:
 
     def create_match_event(self, event: MatchEventCreate) -> MatchEvent:
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO match_events (id, match_id, player_id, event_type, minute, video_timestamp, coordinates) VALUES (UUID(), %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (event.match_id, event.player_id, event.event_type.value, event.minute, event.video_timestamp, event.coordinates))
+            new_event_id = str(uuid.uuid4())
+            sql = "INSERT INTO match_events (id, match_id, player_id, event_type, minute, video_timestamp, coordinates) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_event_id, event.match_id, event.player_id, event.event_type.value, event.minute, event.video_timestamp, event.coordinates))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM match_events WHERE match_id = %s AND player_id = %s AND event_type = %s AND minute = %s ORDER BY id DESC LIMIT 1", (event.match_id, event.player_id, event.event_type.value, event.minute))
-            new_event = cursor.fetchone()
-            return MatchEvent(**new_event)
+            invalidate_match_details(event.match_id)
+        return MatchEvent(id=new_event_id, **event.model_dump())
 
     def get_match_event(self, event_id: str) -> Optional[MatchEvent]:
         with self.db_connection.cursor() as cursor:
@@ -34,16 +44,25 @@ class MatchEventService:
             events = cursor.fetchall()
             return [MatchEvent(**e) for e in events]
 
+    def list_match_events(self, page: PageParams, match_id: Optional[str] = None) -> Page:
+        where, params = ("match_id = %s", (match_id,)) if match_id else ("", ())
+        with self.db_connection.cursor() as cursor:
+            return fetch_page(cursor, _EVENT_LIST, where, params, page, lambda row: MatchEvent(**row))
+
     def update_match_event(self, event_id: str, event_update: MatchEventCreate) -> Optional[MatchEvent]:
+        previous_match_id = lookup_match_id(self.db_connection, 'match_events', event_id)
         with self.db_connection.cursor() as cursor:
             sql = "UPDATE match_events SET match_id = %s, player_id = %s, event_type = %s, minute = %s, video_timestamp = %s, coordinates = %s WHERE id = %s"
             cursor.execute(sql, (event_update.match_id, event_update.player_id, event_update.event_type.value, event_update.minute, event_update.video_timestamp, event_update.coordinates, event_id))
             self.db_connection.commit()
+            invalidate_match_details(previous_match_id, event_update.match_id)
             return self.get_match_event(event_id)
 
     def delete_match_event(self, event_id: str) -> bool:
+        match_id = lookup_match_id(self.db_connection, 'match_events', event_id)
         with self.db_connection.cursor() as cursor:
             sql = "DELETE FROM match_events WHERE id = %s"
             cursor.execute(sql, (event_id,))
             self.db_connection.commit()
+            invalidate_match_details(match_id)
             return cursor.rowcount > 0
@@ -1,5 +1,7 @@
 from typing import List, Optional
 from models.match_lineup import MatchLineup, MatchLineupCreate
+from .match_details_cache import invalidate_match_details, lookup_match_id
+import uuid
 
 class MatchLineupService:
     def __init__(self, db_connection):
@@ -9,12 +11,12 @@ class MatchLineupService:
         if lineup.team_id not in user_team_ids:
             raise ValueError("Team not owned by current user.")
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO match_lineups (id, match_id, team_id, formation_id, is_starting, player_id, position_in_formation) VALUES (UUID(), %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (lineup.match_id, lineup.team_id, lineup.formation_id, lineup.is_starting, lineup.player_id, lineup.position_in_formation))
+            new_lineup_id = str(uuid.uuid4())
+            sql = "INSERT INTO match_lineups (id, match_id, team_id, formation_id, is_starting, player_id, position_in_formation) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_lineup_id, lineup.match_id, lineup.team_id, lineup.formation_id, lineup.is_starting, lineup.player_id, lineup.position_in_formation))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM match_lineups WHERE match_id = %s AND team_id = %s AND player_id = %s ORDER BY id DESC LIMIT 1", (lineup.match_id, lineup.team_id, lineup.player_id))
-            new_lineup = cursor.fetchone()
-            return MatchLineup(**new_lineup)
+            invalidate_match_details(lineup.match_id)
+        return MatchLineup(id=new_lineup_id, **lineup.model_dump())
 
     def get_match_lineup(self, lineup_id: str, user_team_ids: List[str]) -> Optional[MatchLineup]:
         with self.db_connection.cursor() as cursor:
@@ -46,15 +48,19 @@ class MatchLineupService:
     def update_match_lineup(self, lineup_id: str, lineup_update: MatchLineupCreate, user_team_ids: List[str]) -> Optional[MatchLineup]:
         if lineup_update.team_id not in user_team_ids:
             raise ValueError("Team not owned by current user.")
+        previous_match_id = lookup_match_id(self.db_connection, 'match_lineups', lineup_id)
         with self.db_connection.cursor() as cursor:
             sql = "UPDATE match_lineups SET match_id = %s, team_id = %s, formation_id = %s, is_starting = %s, player_id = %s, position_in_formation = %s WHERE id = %s AND team_id IN %s"
             cursor.execute(sql, (lineup_update.match_id, lineup_update.team_id, lineup_update.formation_id, lineup_update.is_starting, lineup_update.player_id, lineup_update.position_in_formation, lineup_id, user_team_ids))
             self.db_connection.commit()
+            invalidate_match_details(previous_match_id, lineup_update.match_id)
             return self.get_match_lineup(lineup_id, user_team_ids)
 
     def delete_match_lineup(self, lineup_id: str, user_team_ids: List[str]) -> bool:
+        match_id = lookup_match_id(self.db_connection, 'match_lineups', lineup_id)
         with self.db_connection.cursor() as cursor:
             sql = "DELETE FROM match_lineups WHERE id = %s AND team_id IN %s"
             cursor.execute(sql, (lineup_id, user_team_ids))
             self.db_connection.commit()
+            invalidate_match_details(match_id)
             return cursor.rowcount > 0
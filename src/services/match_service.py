@@ -5,14 +5,71 @@ from models.event import Event
 from models.formation import Formation
 from models.player import Player
 from models.match_details import MatchDetails, TeamLineup, PlayerWithPosition
+from tracking_store import tracking_store
+from pagination import KeysetQuery, Page, PageParams, empty_page, fetch_page, fetch_page_async
 from .match_lineup_service import MatchLineupService
 from .player_match_statistics_service import PlayerMatchStatisticsService
 from .match_team_statistics_service import MatchTeamStatisticsService
 from .match_event_service import MatchEventService
+from .match_details_cache import invalidate_match_details
 from .player_service import PlayerService
 from .formation_service import FormationService
 import uuid
 
+_SELECT_MATCH_SQL = """
+    SELECT
+        m.*,
+        ht.name as home_team_name,
+        at.name as away_team_name,
+        e.name as event_name
+    FROM matches m
+    JOIN teams ht ON m.home_team_id = ht.id
+    JOIN teams at ON m.away_team_id = at.id
+    LEFT JOIN events e ON m.event_id = e.id
+    WHERE m.id = %s AND (m.home_team_id IN %s OR m.away_team_id IN %s)
+"""
+
+_MATCH_LIST_FROM = """matches m
+    JOIN teams ht ON m.home_team_id = ht.id
+    JOIN teams at ON m.away_team_id = at.id
+    LEFT JOIN events e ON m.event_id = e.id"""
+
+_MATCH_LIST_COLUMNS = {
+    'id': 'm.id',
+    'home_team_id': 'm.home_team_id',
+    'away_team_id': 'm.away_team_id',
+    'date_time': 'm.date_time',
+    'venue': 'm.venue',
+    'event_id': 'm.event_id',
+    'status': 'm.status',
+    'home_score': 'm.home_score',
+    'away_score': 'm.away_score',
+    'home_team_name': 'ht.name',
+    'away_team_name': 'at.name',
+    'event_name': 'e.name',
+}
+
+_SELECT_ALL_MATCHES_SQL = "SELECT " + ", ".join(f"{sql} AS {name}" for name, sql in _MATCH_LIST_COLUMNS.items()) + " FROM " + _MATCH_LIST_FROM
+
+# Most recent matches first.
+_MATCH_LIST = KeysetQuery(_MATCH_LIST_FROM, _MATCH_LIST_COLUMNS, order_by=("date_time", "id"), descending=True)
+
+def _match_filters(user_team_ids: List[str], status: Optional[str] = None, event_id: Optional[str] = None):
+    # The team scope is parenthesized so the filters below apply to both sides of the OR.
+    where = "(m.home_team_id IN %s OR m.away_team_id IN %s)"
+    params = [user_team_ids, user_team_ids]
+    if status:
+        where += " AND m.status = %s"
+        params.append(status)
+    if event_id:
+        where += " AND m.event_id = %s"
+        params.append(event_id)
+    return where, params
+
+def _build_all_matches_query(user_team_ids: List[str], status: Optional[str] = None, event_id: Optional[str] = None):
+    where, params = _match_filters(user_team_ids, status, event_id)
+    return f"{_SELECT_ALL_MATCHES_SQL} WHERE {where}", tuple(params)
+
 class MatchService:
     def __init__(self, db_connection):
         self.db_connection = db_connection
@@ -40,19 +97,7 @@ class MatchService:
 
     def get_match(self, match_id: str, user_team_ids: List[str]) -> Optional[Match]:
         with self.db_connection.cursor() as cursor:
-            sql = """
-                SELECT
-                    m.*,
-                    ht.name as home_team_name,
-                    at.name as away_team_name,
-                    e.name as event_name
-                FROM matches m
-                JOIN teams ht ON m.home_team_id = ht.id
-                JOIN teams at ON m.away_team_id = at.id
-                LEFT JOIN events e ON m.event_id = e.id
-                WHERE m.id = %s AND (m.home_team_id IN %s OR m.away_team_id IN %s)
-            """
-            cursor.execute(sql, (match_id, user_team_ids, user_team_ids))
+            cursor.execute(_SELECT_MATCH_SQL, (match_id, user_team_ids, user_team_ids))
             match_data = cursor.fetchone()
             if match_data:
                 return Match(**match_data)
@@ -62,44 +107,18 @@ class MatchService:
         if not user_team_ids:
             return [] # No teams, no matches
         with self.db_connection.cursor() as cursor:
-            sql = """
-                SELECT
-                    m.id,
-                    m.home_team_id,
-                    m.away_team_id,
-                    m.date_time,
-                    m.venue,
-                    m.event_id,
-                    m.status,
-                    m.home_score,
-                    m.away_score,
-                    ht.name as home_team_name,
-                    at.name as away_team_name,
-                    e.name as event_name
-                FROM matches m
-                JOIN teams ht ON m.home_team_id = ht.id
-                JOIN teams at ON m.away_team_id = at.id
-                LEFT JOIN events e ON m.event_id = e.id
-                WHERE m.home_team_id IN %s OR m.away_team_id IN %s
-            """
-
-            params = [user_team_ids, user_team_ids]
-            conditions = []
-
-            if status:
-                conditions.append("m.status = %s")
-                params.append(status)
-            if event_id:
-                conditions.append("m.event_id = %s")
-                params.append(event_id)
-
-            if conditions:
-                sql += " AND " + " AND ".join(conditions)
-
-            cursor.execute(sql, tuple(params))
+            sql, params = _build_all_matches_query(user_team_ids, status, event_id)
+            cursor.execute(sql, params)
             matches_data = cursor.fetchall()
             return [Match(**match) for match in matches_data]
 
+    def list_matches(self, user_team_ids: List[str], page: PageParams, status: Optional[str] = None, event_id: Optional[str] = None) -> Page:
+        if not user_team_ids:
+            return empty_page(page)
+        where, params = _match_filters(user_team_ids, status, event_id)
+        with self.db_connection.cursor() as cursor:
+            return fetch_page(cursor, _MATCH_LIST, where, params, page, lambda row: Match(**row))
+
     def update_match(self, match_id: str, match_update: MatchCreate, user_team_ids: List[str]) -> Optional[Match]:
         if match_update.home_team_id not in user_team_ids:
             raise ValueError(f"Home team with ID {match_update.home_team_id} not owned by current user.")
@@ -107,6 +126,7 @@ class MatchService:
             sql = "UPDATE matches SET home_team_id = %s, away_team_id = %s, date_time = %s, venue = %s, event_id = %s, status = %s, home_score = %s, away_score = %s WHERE id = %s AND (home_team_id IN %s OR away_team_id IN %s)"
             cursor.execute(sql, (match_update.home_team_id, match_update.away_team_id, match_update.date_time, match_update.venue, match_update.event_id, match_update.status.value if match_update.status else None, match_update.home_score, match_update.away_score, match_id, user_team_ids, user_team_ids))
             self.db_connection.commit()
+            invalidate_match_details(match_id)
             return self.get_match(match_id, user_team_ids)
 
     def delete_match(self, match_id: str, user_team_ids: List[str]) -> bool:
@@ -114,6 +134,9 @@ class MatchService:
             sql = "DELETE FROM matches WHERE id = %s AND (home_team_id IN %s OR away_team_id IN %s)"
             cursor.execute(sql, (match_id, user_team_ids, user_team_ids))
             self.db_connection.commit()
+            invalidate_match_details(match_id)
+            if cursor.rowcount > 0:
+                tracking_store.delete(match_id)
             return cursor.rowcount > 0
 
     def get_match_details(self, match_id: str, user_team_ids: List[str], user_id: str) -> Optional[MatchDetails]:
@@ -126,18 +149,25 @@ class MatchService:
         team_stats = self.team_stats_service.get_by_match_id(match_id=match_id, user_team_ids=user_team_ids)
         events = self.match_event_service.get_all_match_events(match_id=match_id)
 
+        # Load every lineup player and both formations with one set-based query each
+        # instead of one lookup per lineup entry / team.
+        players_by_id = {p.id: p for p in self.player_service.get_players_by_ids([lu.player_id for lu in all_lineups], user_team_ids)}
+
+        def first_formation_id(team_id: str) -> Optional[str]:
+            team_lineups = [lu for lu in all_lineups if lu.team_id == team_id]
+            return team_lineups[0].formation_id if team_lineups else None
+
+        formation_ids = [fid for fid in (first_formation_id(match_info.home_team_id), first_formation_id(match_info.away_team_id)) if fid]
+        formations_by_id = {f.id: f for f in self.formation_service.get_formations_by_ids(formation_ids, user_id)}
+
         def get_team_lineup(team_id: str, team_name: str) -> TeamLineup:
             team_lineups = [lu for lu in all_lineups if lu.team_id == team_id]
-            formation = None
-            if team_lineups and team_lineups[0].formation_id:
-                formation = self.formation_service.get_formation(team_lineups[0].formation_id, user_id)
+            formation_id = first_formation_id(team_id)
+            formation = formations_by_id.get(formation_id) if formation_id else None
 
-            player_ids = [lu.player_id for lu in team_lineups]
-            players = [self.player_service.get_player(pid, user_team_ids) for pid in player_ids]
-            
             players_with_position = []
             for lu in team_lineups:
-                player = next((p for p in players if p and p.id == lu.player_id), None)
+                player = players_by_id.get(lu.player_id)
                 if player:
                     player_data = player.model_dump()
                     player_data['position_in_formation'] = lu.position_in_formation
@@ -162,3 +192,36 @@ class MatchService:
             team_stats=team_stats,
         )
 
+
+class AsyncMatchService:
+    """Hot-path MatchService reads for `async def` routes, backed by an aiomysql connection."""
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+
+    async def get_match(self, match_id: str, user_team_ids: List[str]) -> Optional[Match]:
+        if not user_team_ids:
+            return None
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_MATCH_SQL, (match_id, user_team_ids, user_team_ids))
+            match_data = await cursor.fetchone()
+            if match_data:
+                return Match(**match_data)
+            return None
+
+    async def get_all_matches(self, user_team_ids: List[str], status: Optional[str] = None, event_id: Optional[str] = None) -> List[Match]:
+        if not user_team_ids:
+            return []
+        async with self.db_connection.cursor() as cursor:
+            sql, params = _build_all_matches_query(user_team_ids, status, event_id)
+            await cursor.execute(sql, params)
+            matches_data = await cursor.fetchall()
+            return [Match(**match) for match in matches_data]
+
+    async def list_matches(self, user_team_ids: List[str], page: PageParams, status: Optional[str] = None, event_id: Optional[str] = None) -> Page:
+        """One page of the user's matches, most recent first."""
+        if not user_team_ids:
+            return empty_page(page)
+        where, params = _match_filters(user_team_ids, status, event_id)
+        async with self.db_connection.cursor() as cursor:
+            return await fetch_page_async(cursor, _MATCH_LIST, where, params, page, lambda row: Match(**row))
@@ -1,6 +1,10 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from models.match_team_statistics import MatchTeamStatistics, MatchTeamStatisticsCreate
+from .match_details_cache import invalidate_match_details, lookup_match_id
 import json
+import uuid
+
+_JSON_FIELDS = ('high_turnover_zones_data', 'set_piece_xg_breakdown_data', 'transition_speed_data', 'build_up_patterns', 'defensive_block_patterns', 'physical_data')
 
 class MatchTeamStatisticsService:
     def __init__(self, db_connection):
@@ -8,7 +12,7 @@ class MatchTeamStatisticsService:
 
     def _to_model(self, data: dict) -> MatchTeamStatistics:
         # Manually parse JSON fields
-        for key in ['high_turnover_zones_data', 'set_piece_xg_breakdown_data', 'transition_speed_data', 'build_up_patterns', 'defensive_block_patterns']:
+        for key in _JSON_FIELDS:
             if key in data and isinstance(data[key], str):
                 try:
                     data[key] = json.loads(data[key])
@@ -30,26 +34,61 @@ class MatchTeamStatisticsService:
         # This requires fetching match details, which is complex here.
         # For simplicity, we'll assume match_id is valid and linked to user's team via MatchService.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO match_team_statistics (id, match_id, team_id, possession_percentage, total_shots, shots_on_target, expected_goals, pressures, final_third_passes, high_turnover_zones_data, set_piece_xg_breakdown_data, transition_speed_data, build_up_patterns, defensive_block_patterns) VALUES (UUID(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (stats.match_id, stats.team_id, stats.possession_percentage, stats.total_shots, stats.shots_on_target, stats.expected_goals, stats.pressures, stats.final_third_passes, json.dumps(stats.high_turnover_zones_data), json.dumps(stats.set_piece_xg_breakdown_data), json.dumps(stats.transition_speed_data), json.dumps(stats.build_up_patterns), json.dumps(stats.defensive_block_patterns)))
+            new_stats_id = str(uuid.uuid4())
+            sql = "INSERT INTO match_team_statistics (id, match_id, team_id, possession_percentage, total_shots, shots_on_target, expected_goals, pressures, final_third_passes, high_turnover_zones_data, set_piece_xg_breakdown_data, transition_speed_data, build_up_patterns, defensive_block_patterns, physical_data) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_stats_id, stats.match_id, stats.team_id, stats.possession_percentage, stats.total_shots, stats.shots_on_target, stats.expected_goals, stats.pressures, stats.final_third_passes, json.dumps(stats.high_turnover_zones_data), json.dumps(stats.set_piece_xg_breakdown_data), json.dumps(stats.transition_speed_data), json.dumps(stats.build_up_patterns), json.dumps(stats.defensive_block_patterns), json.dumps(stats.physical_data)))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM match_team_statistics WHERE match_id = %s AND team_id = %s ORDER BY id DESC LIMIT 1", (stats.match_id, stats.team_id))
-            new_stats = cursor.fetchone()
-            return self._to_model(new_stats)
+            invalidate_match_details(stats.match_id)
+        return MatchTeamStatistics(id=new_stats_id, **stats.model_dump())
 
     def update_match_team_statistics(self, stat_id: str, stats_update: MatchTeamStatisticsCreate, user_team_ids: List[str]) -> Optional[MatchTeamStatistics]:
         # Validate that the match's teams are owned by the user
         # This requires fetching match details, which is complex here.
         # For simplicity, we'll assume match_id is valid and linked to user's team via MatchService.
+        previous_match_id = lookup_match_id(self.db_connection, 'match_team_statistics', stat_id)
         with self.db_connection.cursor() as cursor:
-            sql = "UPDATE match_team_statistics SET match_id = %s, team_id = %s, possession_percentage = %s, total_shots = %s, shots_on_target = %s, expected_goals = %s, pressures = %s, final_third_passes = %s, high_turnover_zones_data = %s, set_piece_xg_breakdown_data = %s, transition_speed_data = %s, build_up_patterns = %s, defensive_block_patterns = %s WHERE id = %s"
-            cursor.execute(sql, (stats_update.match_id, stats_update.team_id, stats_update.possession_percentage, stats_update.total_shots, stats_update.shots_on_target, stats_update.expected_goals, stats_update.pressures, stats_update.final_third_passes, json.dumps(stats_update.high_turnover_zones_data), json.dumps(stats_update.set_piece_xg_breakdown_data), json.dumps(stats_update.transition_speed_data), json.dumps(stats_update.build_up_patterns), json.dumps(stats_update.defensive_block_patterns), stat_id))
+            sql = "UPDATE match_team_statistics SET match_id = %s, team_id = %s, possession_percentage = %s, total_shots = %s, shots_on_target = %s, expected_goals = %s, pressures = %s, final_third_passes = %s, high_turnover_zones_data = %s, set_piece_xg_breakdown_data = %s, transition_speed_data = %s, build_up_patterns = %s, defensive_block_patterns = %s, physical_data = %s WHERE id = %s"
+            cursor.execute(sql, (stats_update.match_id, stats_update.team_id, stats_update.possession_percentage, stats_update.total_shots, stats_update.shots_on_target, stats_update.expected_goals, stats_update.pressures, stats_update.final_third_passes, json.dumps(stats_update.high_turnover_zones_data), json.dumps(stats_update.set_piece_xg_breakdown_data), json.dumps(stats_update.transition_speed_data), json.dumps(stats_update.build_up_patterns), json.dumps(stats_update.defensive_block_patterns), json.dumps(stats_update.physical_data), stat_id))
             self.db_connection.commit()
+            invalidate_match_details(previous_match_id, stats_update.match_id)
             return self.get_by_match_id(stats_update.match_id, user_team_ids)[0] if self.get_by_match_id(stats_update.match_id, user_team_ids) else None
 
+    def get_match_team_ids(self, match_id: str) -> Optional[Tuple[str, str]]:
+        """(home_team_id, away_team_id) of a match, without team scoping; for pipeline use."""
+        with self.db_connection.cursor() as cursor:
+            cursor.execute("SELECT home_team_id, away_team_id FROM matches WHERE id = %s", (match_id,))
+            row = cursor.fetchone()
+            return (row['home_team_id'], row['away_team_id']) if row else None
+
+    def upsert_team_json_fields(self, match_id: str, team_id: str, fields: Dict[str, Any], commit: bool = True):
+        """Set only the given JSON columns on the match/team row, creating the row if there is none.
+
+        Other columns keep their values, so analytics can fill in their fields without
+        touching manually entered statistics.
+        """
+        unknown = set(fields) - set(_JSON_FIELDS)
+        if unknown:
+            raise ValueError(f"Not JSON statistics fields: {sorted(unknown)}")
+        columns = list(fields)
+        values = [json.dumps(fields[column]) for column in columns]
+        with self.db_connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM match_team_statistics WHERE match_id = %s AND team_id = %s ORDER BY id LIMIT 1 FOR UPDATE", (match_id, team_id))
+            row = cursor.fetchone()
+            if row:
+                assignments = ", ".join(f"{column} = %s" for column in columns)
+                cursor.execute(f"UPDATE match_team_statistics SET {assignments} WHERE id = %s", (*values, row['id']))
+            else:
+                placeholders = ", ".join(["%s"] * len(columns))
+                cursor.execute(f"INSERT INTO match_team_statistics (id, match_id, team_id, {', '.join(columns)}) VALUES (%s, %s, %s, {placeholders})", (str(uuid.uuid4()), match_id, team_id, *values))
+        if commit:
+            self.db_connection.commit()
+            invalidate_match_details(match_id)
+
     def delete_match_team_statistics(self, stat_id: str, user_team_ids: List[str]) -> bool:
+        match_id = lookup_match_id(self.db_connection, 'match_team_statistics', stat_id)
         with self.db_connection.cursor() as cursor:
             sql = "DELETE FROM match_team_statistics WHERE id = %s AND match_id IN (SELECT id FROM matches WHERE home_team_id IN %s OR away_team_id IN %s)"
             cursor.execute(sql, (stat_id, user_team_ids, user_team_ids))
             self.db_connection.commit()
+            invalidate_match_details(match_id)
             return cursor.rowcount > 0
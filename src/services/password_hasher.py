@@ -0,0 +1,119 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HasherOverloadedError(Exception):
+    """Raised instead of queueing when too many hash operations are pending."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-limited worker pool.
+
+    bcrypt costs a few hundred milliseconds of CPU per call, so it must never run
+    on the event loop thread. Work goes to a process pool by default (not GIL-bound);
+    once `max_pending` operations are queued or running, new calls fail fast with
+    HasherOverloadedError so a login burst can't starve the rest of the API.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, use_processes: bool = True):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        # spawn: forking a process that already runs threads is unsafe.
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context('spawn'),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HasherOverloadedError("Password hashing is overloaded, retry shortly")
+            self._pending += 1
+        executor = None
+        try:
+            executor = self._get_executor()
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next caller.
+            with self._lock:
+                self._failed += 1
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self._completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'executor': 'process' if self.use_processes else 'thread',
+                'workers': self.max_workers,
+                'pending': self._pending,
+                'queued': max(0, self._pending - self.max_workers),
+                'max_pending': self.max_pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'failed': self._failed,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '2')),
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '32')),
+    use_processes=os.environ.get('PASSWORD_HASH_EXECUTOR', 'process') == 'process',
+)
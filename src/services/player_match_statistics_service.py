@@ -1,5 +1,15 @@
-from typing import List, Optional
+import uuid
+from typing import Dict, List, Optional, Tuple
 from models.player_match_statistics import PlayerMatchStatistics, PlayerMatchStatisticsCreate
+from .match_details_cache import invalidate_match_details, lookup_match_id
+
+_SELECT_MATCH_SQUAD_NUMBERS_SQL = (
+    "SELECT p.id, p.jersey_number, IF(p.team_id = m.home_team_id, 'home', 'away') AS side "
+    "FROM matches m JOIN players p ON p.team_id IN (m.home_team_id, m.away_team_id) "
+    "WHERE m.id = %s AND p.jersey_number IS NOT NULL"
+)
+_INSERT_PLAYER_MATCH_STATISTICS_COLUMNS = "id, match_id, player_id, minutes_played, shots, shots_on_target, passes, accurate_passes, tackles, interceptions, clearances, saves, fouls_committed, fouls_suffered, offsides, distance_covered_km, notes, rating"
+
 
 class PlayerMatchStatisticsService:
     def __init__(self, db_connection):
@@ -10,12 +20,52 @@ class PlayerMatchStatisticsService:
         # This requires fetching match details, which is complex here.
         # For simplicity, we'll assume match_id is valid and linked to user's team via MatchService.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO player_match_statistics (id, match_id, player_id, minutes_played, shots, shots_on_target, passes, accurate_passes, tackles, interceptions, clearances, saves, fouls_committed, fouls_suffered, offsides, distance_covered_km, notes, rating) VALUES (UUID(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (stats.match_id, stats.player_id, stats.minutes_played, stats.shots, stats.shots_on_target, stats.passes, stats.accurate_passes, stats.tackles, stats.interceptions, stats.clearances, stats.saves, stats.fouls_committed, stats.fouls_suffered, stats.offsides, stats.distance_covered_km, stats.notes, stats.rating))
+            new_stats_id = str(uuid.uuid4())
+            sql = f"INSERT INTO player_match_statistics ({_INSERT_PLAYER_MATCH_STATISTICS_COLUMNS}) VALUES ({', '.join(['%s'] * 18)})"
+            cursor.execute(sql, (new_stats_id, stats.match_id, stats.player_id, stats.minutes_played, stats.shots, stats.shots_on_target, stats.passes, stats.accurate_passes, stats.tackles, stats.interceptions, stats.clearances, stats.saves, stats.fouls_committed, stats.fouls_suffered, stats.offsides, stats.distance_covered_km, stats.notes, stats.rating))
+            self.db_connection.commit()
+            invalidate_match_details(stats.match_id)
+        return PlayerMatchStatistics(id=new_stats_id, **stats.model_dump())
+
+    def get_squad_numbers(self, match_id: str) -> Dict[Tuple[str, int], str]:
+        """(side, jersey number) -> player id for both teams of a match; for pipeline use.
+
+        A number worn by more than one player of a team is left out rather than guessed.
+        """
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(_SELECT_MATCH_SQUAD_NUMBERS_SQL, (match_id,))
+            rows = cursor.fetchall()
+        squad, ambiguous = {}, set()
+        for row in rows:
+            key = (row['side'], int(row['jersey_number']))
+            if key in squad:
+                ambiguous.add(key)
+            squad[key] = row['id']
+        for key in ambiguous:
+            del squad[key]
+        return squad
+
+    def bulk_create_player_match_statistics(self, stats_rows: List[PlayerMatchStatisticsCreate], batch_size: int = 1000, commit: bool = True) -> int:
+        """Insert many rows with multi-row INSERTs and no read-back; returns the number inserted.
+
+        Ids are generated here so PyMySQL can fold each batch into a single statement.
+        With `commit=False` the caller owns the transaction (and the cache invalidation).
+        """
+        sql = f"INSERT INTO player_match_statistics ({_INSERT_PLAYER_MATCH_STATISTICS_COLUMNS}) VALUES ({', '.join(['%s'] * 18)})"
+        batch_size = max(1, batch_size)
+        inserted = 0
+        with self.db_connection.cursor() as cursor:
+            for start in range(0, len(stats_rows), batch_size):
+                batch = stats_rows[start:start + batch_size]
+                cursor.executemany(sql, [
+                    (str(uuid.uuid4()), s.match_id, s.player_id, s.minutes_played, s.shots, s.shots_on_target, s.passes, s.accurate_passes, s.tackles, s.interceptions, s.clearances, s.saves, s.fouls_committed, s.fouls_suffered, s.offsides, s.distance_covered_km, s.notes, s.rating)
+                    for s in batch
+                ])
+                inserted += len(batch)
+        if commit:
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM player_match_statistics WHERE match_id = %s AND player_id = %s ORDER BY id DESC LIMIT 1", (stats.match_id, stats.player_id))
-            new_stats = cursor.fetchone()
-            return PlayerMatchStatistics(**new_stats)
+            invalidate_match_details(*{s.match_id for s in stats_rows})
+        return inserted
 
     def get_player_match_statistics(self, stat_id: str, user_team_ids: List[str]) -> Optional[PlayerMatchStatistics]:
         with self.db_connection.cursor() as cursor:
@@ -43,17 +93,21 @@ class PlayerMatchStatisticsService:
         # Validate that the match's teams are owned by the user
         # This requires fetching match details, which is complex here.
         # For simplicity, we'll assume match_id is valid and linked to user's team via MatchService.
+        previous_match_id = lookup_match_id(self.db_connection, 'player_match_statistics', stat_id)
         with self.db_connection.cursor() as cursor:
             sql = "UPDATE player_match_statistics SET match_id = %s, player_id = %s, minutes_played = %s, shots = %s, shots_on_target = %s, passes = %s, accurate_passes = %s, tackles = %s, interceptions = %s, clearances = %s, saves = %s, fouls_committed = %s, fouls_suffered = %s, offsides = %s, distance_covered_km = %s, notes = %s, rating = %s WHERE id = %s"
             cursor.execute(sql, (stats_update.match_id, stats_update.player_id, stats_update.minutes_played, stats_update.shots, stats_update.shots_on_target, stats_update.passes, stats_update.accurate_passes, stats_update.tackles, stats_update.interceptions, stats_update.clearances, stats_update.saves, stats_update.fouls_committed, stats_update.fouls_suffered, stats_update.offsides, stats_update.distance_covered_km, stats_update.notes, stats_update.rating, stat_id))
             self.db_connection.commit()
+            invalidate_match_details(previous_match_id, stats_update.match_id)
             return self.get_player_match_statistics(stat_id, user_team_ids)
 
     def delete_player_match_statistics(self, stat_id: str, user_team_ids: List[str]) -> bool:
+        match_id = lookup_match_id(self.db_connection, 'player_match_statistics', stat_id)
         with self.db_connection.cursor() as cursor:
             sql = "DELETE FROM player_match_statistics WHERE id = %s AND match_id IN (SELECT id FROM matches WHERE home_team_id IN %s OR away_team_id IN %s)"
             cursor.execute(sql, (stat_id, user_team_ids, user_team_ids))
             self.db_connection.commit()
+            invalidate_match_details(match_id)
             return cursor.rowcount > 0
 
     def get_player_match_statistics_by_player_id(self, player_id: str, user_team_ids: List[str]) -> List[PlayerMatchStatistics]:
@@ -1,10 +1,17 @@
 from typing import List, Optional
 from models.player import Player, PlayerCreate
+from pagination import KeysetQuery, Page, PageParams, empty_page, fetch_page
 from fastapi import UploadFile
 import os
 import shutil
 import uuid
 
+_PLAYER_LIST = KeysetQuery(
+    "players",
+    {name: name for name in Player.model_fields},
+    order_by=("name", "id"),
+)
+
 class PlayerService:
     def __init__(self, db_connection):
         self.db_connection = db_connection
@@ -13,12 +20,11 @@ class PlayerService:
         if player.team_id not in user_team_ids:
             raise ValueError("Team not owned by current user.")
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO players (id, team_id, name, position, jersey_number, birth_date, dominant_foot, height_cm, weight_kg, nationality, country_code, image_url, market_value) VALUES (UUID(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (player.team_id, player.name, player.position.value if player.position else None, player.jersey_number, player.birth_date, player.dominant_foot.value if player.dominant_foot else None, player.height_cm, player.weight_kg, player.nationality, player.country_code, player.image_url, player.market_value))
+            new_player_id = str(uuid.uuid4())
+            sql = "INSERT INTO players (id, team_id, name, position, jersey_number, birth_date, dominant_foot, height_cm, weight_kg, nationality, country_code, image_url, market_value) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_player_id, player.team_id, player.name, player.position.value if player.position else None, player.jersey_number, player.birth_date, player.dominant_foot.value if player.dominant_foot else None, player.height_cm, player.weight_kg, player.nationality, player.country_code, player.image_url, player.market_value))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM players WHERE name = %s ORDER BY id DESC LIMIT 1", (player.name,))
-            new_player = cursor.fetchone()
-            return Player(**new_player)
+        return Player(id=new_player_id, **player.model_dump())
 
     def get_player(self, player_id: str, user_team_ids: List[str]) -> Optional[Player]:
         with self.db_connection.cursor() as cursor:
@@ -29,6 +35,15 @@ class PlayerService:
                 return Player(**player)
             return None
 
+    def get_players_by_ids(self, player_ids: List[str], user_team_ids: List[str]) -> List[Player]:
+        if not player_ids or not user_team_ids:
+            return []
+        with self.db_connection.cursor() as cursor:
+            sql = "SELECT * FROM players WHERE id IN %s AND team_id IN %s"
+            cursor.execute(sql, (list(set(player_ids)), user_team_ids))
+            players = cursor.fetchall()
+            return [Player(**player) for player in players]
+
     def get_all_players(self, user_team_ids: List[str]) -> List[Player]:
         if not user_team_ids:
             return [] # No teams, no players
@@ -39,6 +54,13 @@ class PlayerService:
             players = cursor.fetchall()
             return [Player(**player) for player in players]
 
+    def list_players(self, user_team_ids: List[str], page: PageParams) -> Page:
+        """One page of the user's players, ordered by name."""
+        if not user_team_ids:
+            return empty_page(page)
+        with self.db_connection.cursor() as cursor:
+            return fetch_page(cursor, _PLAYER_LIST, "team_id IN %s", (user_team_ids,), page, lambda row: Player(**row))
+
     def update_player(self, player_id: str, player_update: PlayerCreate, user_team_ids: List[str]) -> Optional[Player]:
         if player_update.team_id not in user_team_ids:
             raise ValueError("Team not owned by current user.")
@@ -1,6 +1,7 @@
 from typing import List
 from models.reunion import Reunion, ReunionCreate
 from datetime import datetime
+import uuid
 
 class ReunionService:
     def __init__(self, db_connection):
@@ -24,12 +25,11 @@ class ReunionService:
         # Assuming reunion is not directly linked to a team in the model, 
         # but if it were, we'd validate user_team_ids here.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO reunions (id, title, date, location, icon_name) VALUES (UUID(), %s, %s, %s, %s)"
-            cursor.execute(sql, (reunion.title, reunion.date, reunion.location, reunion.icon_name))
+            new_reunion_id = str(uuid.uuid4())
+            sql = "INSERT INTO reunions (id, title, date, location, icon_name, created_at) VALUES (%s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_reunion_id, reunion.title, reunion.date, reunion.location, reunion.icon_name, datetime.now().replace(microsecond=0)))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM reunions WHERE title = %s ORDER BY created_at DESC LIMIT 1", (reunion.title,))
-            new_reunion = cursor.fetchone()
-            return Reunion(**new_reunion)
+        return Reunion(id=new_reunion_id, **reunion.model_dump())
 
     def delete_reunion(self, reunion_id: str, user_team_ids: List[str]) -> bool:
         with self.db_connection.cursor() as cursor:
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from models.staff import Staff, StaffCreate
+import uuid
 
 class StaffService:
     def __init__(self, db_connection):
@@ -9,12 +10,11 @@ class StaffService:
         if staff.team_id not in user_team_ids:
             raise ValueError("Team not owned by current user.")
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO staff (id, team_id, name, role) VALUES (UUID(), %s, %s, %s)"
-            cursor.execute(sql, (staff.team_id, staff.name, staff.role.value if staff.role else None))
+            new_staff_id = str(uuid.uuid4())
+            sql = "INSERT INTO staff (id, team_id, name, role) VALUES (%s, %s, %s, %s)"
+            cursor.execute(sql, (new_staff_id, staff.team_id, staff.name, staff.role.value if staff.role else None))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM staff WHERE name = %s ORDER BY id DESC LIMIT 1", (staff.name,))
-            new_staff = cursor.fetchone()
-            return Staff(**new_staff)
+        return Staff(id=new_staff_id, **staff.model_dump())
 
     def get_staff(self, staff_id: str, user_team_ids: List[str]) -> Optional[Staff]:
         with self.db_connection.cursor() as cursor:
@@ -1,9 +1,30 @@
 from typing import List, Optional
 from models.team import Team, TeamCreate
+from cache import make_cache
 from fastapi import UploadFile
 import os
 import shutil
 import uuid
+from datetime import datetime
+
+_SELECT_TEAM_SQL = "SELECT * FROM teams WHERE id = %s AND user_id = %s"
+_SELECT_USER_TEAMS_SQL = "SELECT * FROM teams WHERE user_id = %s"
+_SELECT_USER_TEAM_IDS_SQL = "SELECT id FROM teams WHERE user_id = %s"
+
+# Team ids owned by each user; almost every request is scoped by them.
+team_scope_cache = make_cache(
+    'team_scope',
+    ttl=float(os.environ.get('TEAM_SCOPE_CACHE_TTL', '60')),
+    maxsize=int(os.environ.get('TEAM_SCOPE_CACHE_SIZE', '10000')),
+)
+
+def get_cached_team_ids(user_id: str) -> Optional[List[str]]:
+    team_ids = team_scope_cache.get(user_id)
+    return list(team_ids) if team_ids is not None else None
+
+def invalidate_team_scope(user_id: Optional[str]):
+    if user_id:
+        team_scope_cache.delete(user_id)
 
 class TeamService:
     def __init__(self, db_connection):
@@ -11,16 +32,17 @@ class TeamService:
 
     def create_team(self, team: TeamCreate, user_id: str) -> Team:
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO teams (id, name, user_id, primary_color, secondary_color, logo_url) VALUES (UUID(), %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (team.name, user_id, team.primary_color, team.secondary_color, team.logo_url))
+            new_team_id = str(uuid.uuid4())
+            created_at = datetime.now().replace(microsecond=0)
+            sql = "INSERT INTO teams (id, name, user_id, primary_color, secondary_color, logo_url, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_team_id, team.name, user_id, team.primary_color, team.secondary_color, team.logo_url, created_at))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM teams WHERE name = %s AND user_id = %s ORDER BY created_at DESC LIMIT 1", (team.name, user_id))
-            new_team = cursor.fetchone()
-            return Team(**new_team)
+            invalidate_team_scope(user_id)
+        return Team(**{**team.model_dump(), 'id': new_team_id, 'user_id': user_id, 'created_at': created_at})
 
     def get_team(self, team_id: str, user_id: str) -> Optional[Team]:
         with self.db_connection.cursor() as cursor:
-            sql = "SELECT * FROM teams WHERE id = %s AND user_id = %s"
+            sql = _SELECT_TEAM_SQL
             cursor.execute(sql, (team_id, user_id))
             team = cursor.fetchone()
             if team:
@@ -38,11 +60,21 @@ class TeamService:
 
     def get_all_teams(self, user_id: str) -> List[Team]:
         with self.db_connection.cursor() as cursor:
-            sql = "SELECT * FROM teams WHERE user_id = %s"
+            sql = _SELECT_USER_TEAMS_SQL
             cursor.execute(sql, (user_id,))
             teams = cursor.fetchall()
             return [Team(**team) for team in teams]
 
+    def get_team_ids(self, user_id: str) -> List[str]:
+        team_ids = get_cached_team_ids(user_id)
+        if team_ids is not None:
+            return team_ids
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(_SELECT_USER_TEAM_IDS_SQL, (user_id,))
+            team_ids = [row['id'] for row in cursor.fetchall()]
+        team_scope_cache.set(user_id, team_ids)
+        return team_ids
+
     def update_team(self, team_id: str, team_update: TeamCreate, user_id: str) -> Optional[Team]:
         team = self.get_team(team_id, user_id)
         if not team:
@@ -58,9 +90,13 @@ class TeamService:
 
     def delete_team(self, team_id: str) -> bool:
         with self.db_connection.cursor() as cursor:
+            cursor.execute("SELECT user_id FROM teams WHERE id = %s", (team_id,))
+            owner = cursor.fetchone()
             sql = "DELETE FROM teams WHERE id = %s"
             cursor.execute(sql, (team_id,))
             self.db_connection.commit()
+            if owner:
+                invalidate_team_scope(owner['user_id'])
             return cursor.rowcount > 0
 
     def save_team_logo(self, team_id: str, file: UploadFile, user_id: str) -> Team:
@@ -88,3 +124,34 @@ class TeamService:
 
         # Return the updated team object
         return self.get_team(team_id, user_id)
+
+
+class AsyncTeamService:
+    """Read-side TeamService for `async def` routes, backed by an aiomysql connection."""
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+
+    async def get_team(self, team_id: str, user_id: str) -> Optional[Team]:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_TEAM_SQL, (team_id, user_id))
+            team = await cursor.fetchone()
+            if team:
+                return Team(**team)
+            return None
+
+    async def get_all_teams(self, user_id: str) -> List[Team]:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_USER_TEAMS_SQL, (user_id,))
+            teams = await cursor.fetchall()
+            return [Team(**team) for team in teams]
+
+    async def get_team_ids(self, user_id: str) -> List[str]:
+        team_ids = get_cached_team_ids(user_id)
+        if team_ids is not None:
+            return team_ids
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_USER_TEAM_IDS_SQL, (user_id,))
+            team_ids = [row['id'] for row in await cursor.fetchall()]
+        team_scope_cache.set(user_id, team_ids)
+        return team_ids
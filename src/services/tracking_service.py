@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+import asyncio
+import io
+import json
+import os
+
+import numpy as np
+
+from tracking_store import tracking_store
+from tracking_analytics import build_heatmaps, compute_player_analytics
+from .match_service import AsyncMatchService
+
+# Largest number of rows a single tracking response may carry; wider windows must be
+# narrowed or downsampled with `step`.
+TRACKING_MAX_ROWS = int(os.environ.get('TRACKING_MAX_ROWS', '500000'))
+
+# Decimals kept for float columns in JSON responses (millimetres / milliseconds).
+_JSON_DECIMALS = 3
+
+
+def parse_player_ids(players: Optional[str]) -> Optional[List[int]]:
+    if not players:
+        return None
+    try:
+        return [int(player_id) for player_id in players.split(',') if player_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="players must be a comma-separated list of player ids")
+
+
+async def get_tracking_window(
+    match_id: str,
+    entity: str,
+    user_team_ids: List[str],
+    match_service: AsyncMatchService,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    start_frame: Optional[int] = None,
+    end_frame: Optional[int] = None,
+    player_ids: Optional[List[int]] = None,
+    step: int = 1,
+) -> Dict[str, np.ndarray]:
+    """Columns of the match's `entity` tracking rows inside the requested window."""
+    match = await match_service.get_match(match_id, user_team_ids)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    try:
+        window = await asyncio.to_thread(
+            tracking_store.query, match_id, entity, start_frame=start_frame, end_frame=end_frame,
+            start_time=start, end_time=end, player_ids=player_ids, step=step,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if window is None:
+        raise HTTPException(status_code=404, detail="No tracking data for match")
+    rows = len(window['frame'])
+    if rows > TRACKING_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"Window has {rows} rows (limit {TRACKING_MAX_ROWS}); narrow it or raise step")
+    return window
+
+
+async def get_player_heatmaps(
+    match_id: str,
+    user_team_ids: List[str],
+    match_service: AsyncMatchService,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    start_frame: Optional[int] = None,
+    end_frame: Optional[int] = None,
+    player_ids: Optional[List[int]] = None,
+) -> Dict:
+    """Per-player and per-team heatmaps over a window of the match's player tracks.
+
+    The response size depends on the number of players, not the window, so there is
+    no row limit here.
+    """
+    match = await match_service.get_match(match_id, user_team_ids)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    try:
+        window = await asyncio.to_thread(
+            tracking_store.query, match_id, 'players', start_frame=start_frame, end_frame=end_frame,
+            start_time=start, end_time=end, player_ids=player_ids,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if window is None or 'player_id' not in window:
+        raise HTTPException(status_code=404, detail="No tracking data for match")
+    players = await asyncio.to_thread(compute_player_analytics, window)
+    return {'match_id': match_id, **build_heatmaps(players)}
+
+
+def _json_column(values: np.ndarray) -> list:
+    if values.dtype.kind != 'f':
+        return values.tolist()
+    rounded = np.round(values.astype(np.float64), _JSON_DECIMALS)
+    missing = np.isnan(rounded)
+    if missing.any():
+        return np.where(missing, None, rounded.astype(object)).tolist()
+    return rounded.tolist()
+
+
+def encode_tracking_json(match_id: str, entity: str, window: Dict[str, np.ndarray]) -> bytes:
+    """Column-oriented JSON: one array per column instead of one object per row."""
+    body = {
+        'match_id': match_id,
+        'entity': entity,
+        'rows': len(window['frame']),
+        'columns': {name: _json_column(values) for name, values in window.items()},
+    }
+    return json.dumps(body, separators=(',', ':')).encode('utf-8')
+
+
+def encode_tracking_npy(window: Dict[str, np.ndarray]) -> bytes:
+    """The window as one structured `.npy` array (`numpy.load` reads it back)."""
+    table = np.empty(len(window['frame']), dtype=[(name, values.dtype) for name, values in window.items()])
+    for name, values in window.items():
+        table[name] = values
+    buffer = io.BytesIO()
+    np.save(buffer, table, allow_pickle=False)
+    return buffer.getvalue()
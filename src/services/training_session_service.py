@@ -1,6 +1,7 @@
 from typing import List
 from models.training_session import TrainingSession, TrainingSessionCreate
 from datetime import datetime
+import uuid
 
 class TrainingSessionService:
     def __init__(self, db_connection):
@@ -24,12 +25,11 @@ class TrainingSessionService:
         # Assuming training session is not directly linked to a team in the model, 
         # but if it were, we'd validate user_team_ids here.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO training_sessions (id, title, date, focus, icon_name) VALUES (UUID(), %s, %s, %s, %s)"
-            cursor.execute(sql, (session.title, session.date, session.focus, session.icon_name))
+            new_session_id = str(uuid.uuid4())
+            sql = "INSERT INTO training_sessions (id, title, date, focus, icon_name, created_at) VALUES (%s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_session_id, session.title, session.date, session.focus, session.icon_name, datetime.now().replace(microsecond=0)))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM training_sessions WHERE title = %s ORDER BY created_at DESC LIMIT 1", (session.title,))
-            new_session = cursor.fetchone()
-            return TrainingSession(**new_session)
+        return TrainingSession(id=new_session_id, **session.model_dump())
 
     def delete_training_session(self, session_id: str, user_team_ids: List[str]) -> bool:
         with self.db_connection.cursor() as cursor:
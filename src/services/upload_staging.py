@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from typing import AsyncIterator, BinaryIO, Optional
+
+from fastapi import HTTPException, Request, UploadFile
+
+UPLOAD_DIR = os.environ.get('UPLOAD_DIR', './uploads')
+MAX_UPLOAD_SIZE = int(float(os.environ.get('MAX_UPLOAD_SIZE_MB', '500')) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE_KB', '1024')) * 1024
+
+# Staged files older than this belong to jobs that can no longer run.
+_STALE_UPLOAD_SECONDS = 24 * 3600
+
+
+class StagedUpload:
+    """A video written to UPLOAD_DIR; whoever it is handed to owns (and deletes) the file."""
+
+    __slots__ = ('path', 'size', 'sha256')
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {MAX_UPLOAD_SIZE // (1024 * 1024)} MB limit")
+
+
+def enforce_content_length(request: Request):
+    """Dependency rejecting oversized uploads from their Content-Length before the body is read."""
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_SIZE:
+        raise _too_large()
+
+
+def _write_chunk(handle: BinaryIO, digest, chunk: bytes):
+    digest.update(chunk)
+    handle.write(chunk)
+
+
+async def stage_upload(chunks: AsyncIterator[bytes], suffix: str = '.mp4') -> StagedUpload:
+    """Write an upload to the staging directory chunk by chunk, hashing it on the way.
+
+    The next chunk is only pulled once the previous one is on disk, so a slow disk
+    slows the client down instead of buffering the video in memory. Uploads over
+    MAX_UPLOAD_SIZE_MB are aborted with 413 and their partial file removed.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise _too_large()
+                await asyncio.to_thread(_write_chunk, handle, digest, chunk)
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return StagedUpload(path, size, digest.hexdigest())
+
+
+async def iter_upload_file(upload: UploadFile) -> AsyncIterator[bytes]:
+    """Chunks of a multipart upload (already spooled by the form parser)."""
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await upload.close()
+
+
+def upload_suffix(filename: Optional[str]) -> str:
+    return os.path.splitext(filename or '')[1] or '.mp4'
+
+
+def remove_stale_uploads() -> int:
+    """Delete staged videos left behind by jobs that died with their server."""
+    if not os.path.isdir(UPLOAD_DIR):
+        return 0
+    cutoff = time.time() - _STALE_UPLOAD_SECONDS
+    removed = 0
+    for entry in os.scandir(UPLOAD_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
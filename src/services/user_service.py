@@ -1,8 +1,50 @@
 from typing import List, Optional
 from models.user import User, UserCreate
-from passlib.context import CryptContext
+from cache import make_cache
+from .team_service import invalidate_team_scope
+from .password_hasher import pwd_context, password_hasher
+import os
+import uuid
+from datetime import datetime
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified principals keyed by token subject (email), so authenticated
+# requests don't have to look the user up on every call.
+principal_cache = make_cache(
+    'principal',
+    ttl=float(os.environ.get('PRINCIPAL_CACHE_TTL', '300')),
+    maxsize=int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000')),
+)
+
+def get_cached_principal(email: str) -> Optional[User]:
+    data = principal_cache.get(email)
+    return User(**data, password_hash='') if data is not None else None
+
+def cache_principal(user: User):
+    # The hash stays out of the (possibly shared) cache; only login needs it, and
+    # login reads the user from the database.
+    principal_cache.set(user.email, user.model_dump(mode='json', exclude={'password_hash'}))
+
+def invalidate_principal(email: Optional[str]):
+    if email:
+        principal_cache.delete(email)
+
+_SELECT_USER_SQL = "SELECT * FROM users WHERE id = %s"
+_SELECT_USER_BY_EMAIL_SQL = "SELECT * FROM users WHERE email = %s"
+_INSERT_USER_SQL = "INSERT INTO users (id, email, password_hash, full_name, is_active, created_at) VALUES (%s, %s, %s, %s, %s, %s)"
+
+def _new_user(user: UserCreate, hashed_password: str) -> User:
+    """The row `create_user` inserts; id and created_at are set here so no read-back is needed."""
+    return User(
+        id=str(uuid.uuid4()),
+        email=user.email,
+        full_name=user.full_name,
+        is_active=user.is_active,
+        password_hash=hashed_password,
+        created_at=datetime.now().replace(microsecond=0),
+    )
+
+def _insert_user_params(new_user: User) -> tuple:
+    return (new_user.id, new_user.email, new_user.password_hash, new_user.full_name, new_user.is_active, new_user.created_at)
 
 class UserService:
     def __init__(self, db_connection):
@@ -15,18 +57,15 @@ class UserService:
         return pwd_context.verify(plain_password, hashed_password)
 
     def create_user(self, user: UserCreate) -> User:
-        hashed_password = self.get_password_hash(user.password)
+        new_user = _new_user(user, self.get_password_hash(user.password))
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO users (id, email, password_hash, full_name, is_active) VALUES (UUID(), %s, %s, %s, %s)"
-            cursor.execute(sql, (user.email, hashed_password, user.full_name, user.is_active))
+            cursor.execute(_INSERT_USER_SQL, _insert_user_params(new_user))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM users WHERE email = %s ORDER BY created_at DESC LIMIT 1", (user.email,))
-            new_user = cursor.fetchone()
-            return User(**new_user)
+        return new_user
 
     def get_user(self, user_id: str) -> Optional[User]:
         with self.db_connection.cursor() as cursor:
-            sql = "SELECT * FROM users WHERE id = %s"
+            sql = _SELECT_USER_SQL
             cursor.execute(sql, (user_id,))
             user = cursor.fetchone()
             if user:
@@ -35,7 +74,7 @@ class UserService:
 
     def get_user_by_email(self, email: str) -> Optional[User]:
         with self.db_connection.cursor() as cursor:
-            sql = "SELECT * FROM users WHERE email = %s"
+            sql = _SELECT_USER_BY_EMAIL_SQL
             cursor.execute(sql, (email,))
             user = cursor.fetchone()
             if user:
@@ -51,15 +90,61 @@ class UserService:
 
     def update_user(self, user_id: str, user_update: UserCreate) -> Optional[User]:
         hashed_password = self.get_password_hash(user_update.password) if user_update.password else None
+        previous = self.get_user(user_id)
         with self.db_connection.cursor() as cursor:
             sql = "UPDATE users SET email = %s, password_hash = %s, full_name = %s, is_active = %s WHERE id = %s"
             cursor.execute(sql, (user_update.email, hashed_password, user_update.full_name, user_update.is_active, user_id))
             self.db_connection.commit()
-            return self.get_user(user_id)
+        # The token subject may have changed, so drop both the old and new email.
+        if previous:
+            invalidate_principal(previous.email)
+        invalidate_principal(user_update.email)
+        return self.get_user(user_id)
 
     def delete_user(self, user_id: str) -> bool:
+        previous = self.get_user(user_id)
         with self.db_connection.cursor() as cursor:
             sql = "DELETE FROM users WHERE id = %s"
             cursor.execute(sql, (user_id,))
             self.db_connection.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if previous:
+            invalidate_principal(previous.email)
+        invalidate_team_scope(user_id)
+        return deleted
+
+
+class AsyncUserService:
+    """UserService counterpart for `async def` routes, backed by an aiomysql connection."""
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+
+    async def get_password_hash(self, password):
+        return await password_hasher.hash(password)
+
+    async def verify_password(self, plain_password, hashed_password):
+        return await password_hasher.verify(plain_password, hashed_password)
+
+    async def create_user(self, user: UserCreate) -> User:
+        new_user = _new_user(user, await self.get_password_hash(user.password))
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_INSERT_USER_SQL, _insert_user_params(new_user))
+            await self.db_connection.commit()
+        return new_user
+
+    async def get_user(self, user_id: str) -> Optional[User]:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_USER_SQL, (user_id,))
+            user = await cursor.fetchone()
+            if user:
+                return User(**user)
+            return None
+
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        async with self.db_connection.cursor() as cursor:
+            await cursor.execute(_SELECT_USER_BY_EMAIL_SQL, (email,))
+            user = await cursor.fetchone()
+            if user:
+                return User(**user)
+            return None
@@ -1,105 +1,87 @@
-from typing import Dict, Optional
-from fastapi import UploadFile, HTTPException, BackgroundTasks
-from tempfile import NamedTemporaryFile
-import shutil
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import HTTPException
+import asyncio
+import json
 import os
 
-from services.match_service import MatchService
-from services.player_match_statistics_service import PlayerMatchStatisticsService
-from analysis_engine import analyze_football_match
+from async_database import connection as async_connection
+from models.analysis_job import AnalysisJob, AnalysisJobStatusEnum
+from .match_service import AsyncMatchService
+from .analysis_job_service import AsyncAnalysisJobService
+from .analysis_progress import progress_broker
+from .job_manager import job_manager
+from .upload_staging import stage_upload
 
-# In-memory store for analysis status
-# In production, use Redis or similar
-_analysis_status: Dict[str, Dict] = {}
+# How often an event stream re-reads the job row when no live update arrives
+# (jobs running in another worker, or a quiet analyzer).
+EVENTS_POLL_INTERVAL = float(os.environ.get('ANALYSIS_EVENTS_POLL_INTERVAL', '5'))
+
+_FINISHED_STATUSES = {AnalysisJobStatusEnum.COMPLETED.value, AnalysisJobStatusEnum.FAILED.value}
 
-async def start_video_analysis(
-    match_id: str,
-    video_file: UploadFile,
-    background_tasks: BackgroundTasks,
-    match_service: MatchService,
-    player_stats_service: PlayerMatchStatisticsService,
-) -> Dict:
-    """Start video analysis in background and return status tracking ID."""
-    
-    # Validate match exists
-    match = match_service.get_match(match_id)
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
 
-    # Save uploaded video to temp file
-    with NamedTemporaryFile(delete=False, suffix=".mp4") as temp_video:
-        try:
-            shutil.copyfileobj(video_file.file, temp_video)
-            temp_video_path = temp_video.name
-        finally:
-            video_file.file.close()
+async def start_video_analysis(
+    chunks: AsyncIterator[bytes],
+    suffix: str,
+    user_id: str,
+    match_id: Optional[str],
+    user_team_ids: List[str],
+) -> AnalysisJob:
+    """Stage an uploaded video and queue it for analysis; progress is polled via the job id."""
 
-    # Initialize status tracking
-    _analysis_status[match_id] = {
-        "status": "pending",
-        "progress": 0.0,
-        "error": None
-    }
+    # Only persist results into matches the user can see (checked before reading the body).
+    # The connection goes back to the pool before the upload, which can take minutes.
+    if match_id:
+        async with async_connection() as db:
+            match = await AsyncMatchService(db).get_match(match_id, user_team_ids)
+        if not match:
+            raise HTTPException(status_code=404, detail="Match not found")
 
-    # Start analysis in background
-    background_tasks.add_task(
-        _run_analysis,
-        match_id=match_id,
-        video_path=temp_video_path,
-        match_service=match_service,
-        player_stats_service=player_stats_service
-    )
+    # The staged file is handed to the job as-is; the job deletes it when done
+    staged = await stage_upload(chunks, suffix)
+    try:
+        return await job_manager.submit(staged.path, user_id, match_id, video_sha256=staged.sha256)
+    except Exception:
+        staged.discard()
+        raise
 
-    return {
-        "status": "accepted",
-        "message": "Video analysis started"
-    }
 
-def get_analysis_status(match_id: str) -> Dict:
-    """Get current status of video analysis for a match."""
-    if match_id not in _analysis_status:
+async def get_analysis_status(match_id: str, user_id: str, job_service: AsyncAnalysisJobService) -> AnalysisJob:
+    """Get the most recent analysis job for a match."""
+    job = await job_service.get_latest_job_for_match(match_id, user_id)
+    if not job:
         raise HTTPException(status_code=404, detail="No analysis found for match")
-    return _analysis_status[match_id]
+    return job
 
-async def _run_analysis(
-    match_id: str,
-    video_path: str,
-    match_service: MatchService,
-    player_stats_service: PlayerMatchStatisticsService
-):
-    """Background task to run video analysis and persist results."""
-    try:
-        # Update status to running
-        _analysis_status[match_id].update({
-            "status": "running",
-            "progress": 0.0
-        })
 
-        # Run analysis (this blocks until complete)
-        results = analyze_football_match(
-            video_path=video_path,
-            match_id=match_id,
-            db_connection=match_service.db_connection
-        )
+def _job_event(job: AnalysisJob) -> Dict:
+    event = {'job_id': job.id, 'status': job.status.value, 'progress_percent': job.progress_percent}
+    if job.error:
+        event['error'] = job.error
+    return event
 
-        # Update status on success
-        _analysis_status[match_id].update({
-            "status": "completed",
-            "progress": 1.0,
-            "results": results
-        })
 
-    except Exception as e:
-        # Update status on failure
-        _analysis_status[match_id].update({
-            "status": "failed",
-            "error": str(e)
-        })
-        raise
-    
+def _sse(event: Dict) -> str:
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+
+async def job_event_stream(job: AnalysisJob, user_id: str) -> AsyncIterator[str]:
+    """Server-Sent Events for one job: progress, fps and ETA until it completes or fails."""
+    queue, latest = progress_broker.subscribe(job.id)
+    try:
+        event = latest or _job_event(job)
+        yield _sse(event)
+        while event['status'] not in _FINISHED_STATUSES:
+            try:
+                event = await asyncio.wait_for(queue.get(), EVENTS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                if progress_broker.is_live(job.id):
+                    yield ": keepalive\n\n"
+                    continue
+                async with async_connection() as db:
+                    stored = await AsyncAnalysisJobService(db).get_job(job.id, user_id)
+                if stored is None:
+                    return
+                event = _job_event(stored)
+            yield _sse(event)
     finally:
-        # Clean up temp file
-        try:
-            os.unlink(video_path)
-        except:
-            pass
\ No newline at end of file
+        progress_broker.unsubscribe(job.id, queue)
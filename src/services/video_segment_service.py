@@ -1,5 +1,15 @@
 from typing import List, Optional
 from models.video_segment import VideoSegment, VideoSegmentCreate
+from pagination import KeysetQuery, Page, PageParams, empty_page, fetch_page
+import uuid
+
+# Segments are listed grouped by match. start_time_sec is a FLOAT, which does not
+# round-trip exactly through a cursor, so it is not part of the key.
+_SEGMENT_LIST = KeysetQuery(
+    "video_segments vs JOIN matches m ON vs.match_id = m.id",
+    {name: f"vs.{name}" for name in VideoSegment.model_fields},
+    order_by=("match_id", "id"),
+)
 
 class VideoSegmentService:
     def __init__(self, db_connection):
@@ -10,12 +20,11 @@ class VideoSegmentService:
         # This requires fetching match details, which is complex here.
         # For simplicity, we'll assume match_id is valid and linked to user's team via MatchService.
         with self.db_connection.cursor() as cursor:
-            sql = "INSERT INTO video_segments (id, match_id, event_id, analysis_report_id, start_time_sec, end_time_sec, description, video_url) VALUES (UUID(), %s, %s, %s, %s, %s, %s, %s)"
-            cursor.execute(sql, (segment.match_id, segment.event_id, segment.analysis_report_id, segment.start_time_sec, segment.end_time_sec, segment.description, segment.video_url))
+            new_segment_id = str(uuid.uuid4())
+            sql = "INSERT INTO video_segments (id, match_id, event_id, analysis_report_id, start_time_sec, end_time_sec, description, video_url) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+            cursor.execute(sql, (new_segment_id, segment.match_id, segment.event_id, segment.analysis_report_id, segment.start_time_sec, segment.end_time_sec, segment.description, segment.video_url))
             self.db_connection.commit()
-            cursor.execute("SELECT * FROM video_segments WHERE match_id = %s AND start_time_sec = %s AND end_time_sec = %s ORDER BY id DESC LIMIT 1", (segment.match_id, segment.start_time_sec, segment.end_time_sec))
-            new_segment = cursor.fetchone()
-            return VideoSegment(**new_segment)
+        return VideoSegment(id=new_segment_id, **segment.model_dump())
 
     def get_video_segment(self, segment_id: str, user_team_ids: List[str]) -> Optional[VideoSegment]:
         with self.db_connection.cursor() as cursor:
@@ -35,6 +44,17 @@ class VideoSegmentService:
             segments = cursor.fetchall()
             return [VideoSegment(**s) for s in segments]
 
+    def list_video_segments(self, user_team_ids: List[str], page: PageParams, match_id: Optional[str] = None) -> Page:
+        if not user_team_ids:
+            return empty_page(page)
+        where = "(m.home_team_id IN %s OR m.away_team_id IN %s)"
+        params = [user_team_ids, user_team_ids]
+        if match_id:
+            where += " AND vs.match_id = %s"
+            params.append(match_id)
+        with self.db_connection.cursor() as cursor:
+            return fetch_page(cursor, _SEGMENT_LIST, where, params, page, lambda row: VideoSegment(**row))
+
     def update_video_segment(self, segment_id: str, segment_update: VideoSegmentCreate, user_team_ids: List[str]) -> Optional[VideoSegment]:
         # Validate that the match's teams are owned by the user
         # This requires fetching match details, which is complex here.
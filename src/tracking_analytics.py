@@ -0,0 +1,239 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tracking_store import tracking_store
+from services.match_team_statistics_service import MatchTeamStatisticsService
+from services.match_details_cache import invalidate_match_details
+
+# Pitch size in tracking units (meters with a calibration); positions are clipped to it.
+PITCH_LENGTH = float(os.environ.get('PITCH_LENGTH', '105'))
+PITCH_WIDTH = float(os.environ.get('PITCH_WIDTH', '68'))
+# Heatmap cells along the pitch length and width (5 m cells by default).
+HEATMAP_COLS = int(os.environ.get('ANALYTICS_HEATMAP_COLS', '21'))
+HEATMAP_ROWS = int(os.environ.get('ANALYTICS_HEATMAP_ROWS', '14'))
+# Lower bounds (m/s) of the speed zones above standing/walking.
+SPEED_ZONES = tuple(float(v) for v in os.environ.get('ANALYTICS_SPEED_ZONES', '2,4,5.5,7').split(','))
+# A sprint is at least this long above the top speed zone bound.
+SPRINT_MIN_SECONDS = float(os.environ.get('ANALYTICS_SPRINT_MIN_SECONDS', '1.0'))
+# Samples further apart than this are a tracking gap, not movement.
+MAX_SAMPLE_GAP_SECONDS = float(os.environ.get('ANALYTICS_MAX_SAMPLE_GAP', '1.0'))
+# Faster steps than this are id switches or detection jumps and are ignored.
+MAX_PLAYER_SPEED = float(os.environ.get('ANALYTICS_MAX_PLAYER_SPEED', '12.5'))
+# Frame rate assumed when the tracking data has no timestamps.
+ANALYTICS_FPS = float(os.environ.get('ANALYTICS_FPS', '25'))
+
+# Turnover zones: thirds of the pitch length by left/centre/right channels.
+_TURNOVER_GRID = (3, 3)
+
+
+def _zone_labels() -> List[str]:
+    bounds = (0.0,) + SPEED_ZONES
+    labels = [f"{low:g}-{high:g}" for low, high in zip(bounds, bounds[1:])]
+    return labels + [f"{SPEED_ZONES[-1]:g}+"]
+
+
+def _cells(x: np.ndarray, y: np.ndarray, cols: int, rows: int) -> np.ndarray:
+    cx = np.clip((x / PITCH_LENGTH * cols).astype(np.int64), 0, cols - 1)
+    cy = np.clip((y / PITCH_WIDTH * rows).astype(np.int64), 0, rows - 1)
+    return cx * rows + cy
+
+
+def _times(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    if 'timestamp' in columns:
+        return columns['timestamp'].astype(np.float64)
+    return columns['frame'].astype(np.float64) / ANALYTICS_FPS
+
+
+def compute_player_analytics(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Distance, speed zones, sprints, top speed and heatmap for every tracked player.
+
+    All players are processed together: rows are ordered by (player, frame) once and
+    every metric is a `bincount` over the consecutive-sample steps, so the cost is a
+    few passes over the arrays regardless of the number of players.
+    """
+    player = columns['player_id'].astype(np.int64)
+    frame = columns['frame'].astype(np.int64)
+    x = columns['x'].astype(np.float64)
+    y = columns['y'].astype(np.float64)
+    t = _times(columns)
+    team = columns['team_id'].astype(np.int64) if 'team_id' in columns else np.full(len(player), -1)
+
+    keep = (player >= 0) & np.isfinite(x) & np.isfinite(y) & np.isfinite(t)
+    order = np.lexsort((frame[keep], player[keep]))
+    player, x, y, t, team = (values[keep][order] for values in (player, x, y, t, team))
+    ids, pidx = np.unique(player, return_inverse=True)
+    n = len(ids)
+    if n == 0:
+        return {'player_ids': ids, 'team': ids, 'distance': np.zeros(0), 'zones': np.zeros((0, len(SPEED_ZONES) + 1)),
+                'max_speed': np.zeros(0), 'sprints': np.zeros(0, dtype=np.int64), 'seconds': np.zeros(0),
+                'heatmap': np.zeros((0, HEATMAP_COLS, HEATMAP_ROWS))}
+
+    # Steps between consecutive samples of the same player.
+    dt = np.diff(t)
+    dist = np.hypot(np.diff(x), np.diff(y))
+    valid = (pidx[1:] == pidx[:-1]) & (dt > 0) & (dt <= MAX_SAMPLE_GAP_SECONDS)
+    speed = np.zeros(len(dt))
+    speed[valid] = dist[valid] / dt[valid]
+    valid &= speed <= MAX_PLAYER_SPEED
+    step_player = pidx[1:]
+
+    p, d, s, dts = step_player[valid], dist[valid], speed[valid], dt[valid]
+    zone_count = len(SPEED_ZONES) + 1
+    zone = np.searchsorted(SPEED_ZONES, s, side='right')
+    distance = np.bincount(p, weights=d, minlength=n)
+    zones = np.bincount(p * zone_count + zone, weights=d, minlength=n * zone_count).reshape(n, zone_count)
+    seconds = np.bincount(p, weights=dts, minlength=n)
+    max_speed = np.zeros(n)
+    np.maximum.at(max_speed, p, s)
+
+    # Sprints: runs of consecutive valid steps in the top zone. Two sprinting steps in a
+    # row share a sample, so they always belong to the same player.
+    sprinting = np.zeros(len(dt), dtype=bool)
+    sprinting[valid] = speed[valid] >= SPEED_ZONES[-1]
+    starts = sprinting & ~np.r_[False, sprinting[:-1]]
+    run = np.cumsum(starts) - 1
+    run_seconds = np.bincount(run[sprinting], weights=dt[sprinting], minlength=int(starts.sum()))
+    sprint_players = step_player[starts][run_seconds >= SPRINT_MIN_SECONDS]
+    sprints = np.bincount(sprint_players, minlength=n)
+
+    # Time-weighted occupancy: each step's duration goes to the cell it started in.
+    cell_count = HEATMAP_COLS * HEATMAP_ROWS
+    cells = _cells(x[:-1][valid], y[:-1][valid], HEATMAP_COLS, HEATMAP_ROWS)
+    heatmap = np.bincount(p * cell_count + cells, weights=dts, minlength=n * cell_count).reshape(n, HEATMAP_COLS, HEATMAP_ROWS)
+
+    # A player's team is the label they carry most often.
+    labels, team_idx = np.unique(team, return_inverse=True)
+    team_votes = np.bincount(pidx * len(labels) + team_idx, minlength=n * len(labels)).reshape(n, len(labels))
+    player_team = labels[team_votes.argmax(axis=1)]
+
+    return {'player_ids': ids, 'team': player_team, 'distance': distance, 'zones': zones, 'max_speed': max_speed,
+            'sprints': sprints, 'seconds': seconds, 'heatmap': heatmap}
+
+
+def compute_turnovers(ball: Dict[str, np.ndarray], player_ids: np.ndarray, player_team: np.ndarray) -> Dict[int, np.ndarray]:
+    """Where each team won the ball: a per-team grid of possession changes between teams."""
+    if 'possession_player_id' not in ball or not len(player_ids):
+        return {}
+    holder = ball['possession_player_id'].astype(np.int64)
+    has = holder >= 0
+    holder, x, y = holder[has], ball['x'][has].astype(np.float64), ball['y'][has].astype(np.float64)
+    position = np.searchsorted(player_ids, holder)
+    known = (position < len(player_ids)) & (player_ids[np.minimum(position, len(player_ids) - 1)] == holder)
+    team = np.where(known, player_team[np.minimum(position, len(player_ids) - 1)], -1)
+    located = (team >= 0) & np.isfinite(x) & np.isfinite(y)
+    team, x, y = team[located], x[located], y[located]
+    won = np.flatnonzero(team[1:] != team[:-1]) + 1
+    cols, rows = _TURNOVER_GRID
+    cells = _cells(x[won], y[won], cols, rows)
+    return {
+        int(label): np.bincount(cells[team[won] == label], minlength=cols * rows).reshape(cols, rows)
+        for label in np.unique(team)
+    }
+
+
+def _round(values: np.ndarray, decimals: int = 1) -> list:
+    return np.round(values, decimals).tolist()
+
+
+def build_team_analytics(players: Dict[str, Any], turnovers: Dict[int, np.ndarray], team_label: int) -> Dict[str, Dict]:
+    """JSON fields for one team: `physical_data` and `high_turnover_zones_data`.
+
+    Heatmaps are left out: they are large and served by the tracking heatmap endpoint.
+    """
+    mine = players['team'] == team_label
+    zone_labels = _zone_labels()
+    physical = {
+        'distance_m': round(float(players['distance'][mine].sum()), 1),
+        'speed_zones_m': dict(zip(zone_labels, _round(players['zones'][mine].sum(axis=0)))),
+        'sprints': int(players['sprints'][mine].sum()),
+        'players': {
+            str(player_id): {
+                'distance_m': round(float(players['distance'][i]), 1),
+                'tracked_seconds': round(float(players['seconds'][i]), 1),
+                'max_speed_ms': round(float(players['max_speed'][i]), 2),
+                'sprints': int(players['sprints'][i]),
+                'speed_zones_m': dict(zip(zone_labels, _round(players['zones'][i]))),
+            }
+            for i, player_id in zip(np.flatnonzero(mine), players['player_ids'][mine].tolist())
+        },
+    }
+    grid = turnovers.get(team_label)
+    cols, rows = _TURNOVER_GRID
+    turnover_zones = {
+        'balls_won': int(grid.sum()) if grid is not None else 0,
+        'grid': grid.tolist() if grid is not None else np.zeros(_TURNOVER_GRID, dtype=int).tolist(),
+        'grid_shape': {'cols': cols, 'rows': rows, 'length': PITCH_LENGTH, 'width': PITCH_WIDTH},
+    }
+    return {'physical_data': physical, 'high_turnover_zones_data': turnover_zones}
+
+
+def build_heatmaps(players: Dict[str, Any]) -> Dict[str, Any]:
+    """Time-weighted heatmaps (seconds per cell) for every player and analyzer team label."""
+    teams = {}
+    for label in np.unique(players['team']).tolist():
+        teams[str(label)] = _round(players['heatmap'][players['team'] == label].sum(axis=0))
+    return {
+        'grid': {'cols': HEATMAP_COLS, 'rows': HEATMAP_ROWS, 'length': PITCH_LENGTH, 'width': PITCH_WIDTH},
+        'teams': teams,
+        'players': {
+            str(player_id): {'team': int(players['team'][i]), 'heatmap_seconds': _round(players['heatmap'][i])}
+            for i, player_id in enumerate(players['player_ids'].tolist())
+        },
+    }
+
+
+def team_sides(player_table: np.ndarray) -> Optional[Dict[str, int]]:
+    """Analyzer team label of the home and away team, from the `team_side` column.
+
+    Each side takes the label most of its rows carry. Returns None when the analyzer
+    did not report sides, or when both sides resolve to the same label.
+    """
+    names = player_table.dtype.names or ()
+    if 'team_side' not in names or 'team_id' not in names:
+        return None
+    side = np.char.lower(np.char.strip(player_table['team_side'].astype(str)))
+    label = player_table['team_id'].astype(np.int64)
+    sides = {}
+    for name in ('home', 'away'):
+        labels = label[(side == name) & (label >= 0)]
+        if not len(labels):
+            return None
+        values, counts = np.unique(labels, return_counts=True)
+        sides[name] = int(values[counts.argmax()])
+    if sides['home'] == sides['away']:
+        return None
+    return sides
+
+
+def persist_match_analytics(db_connection, match_id: str, sides: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    """Compute tracking analytics for a match and store them on its team statistics rows.
+
+    `sides` maps 'home' and 'away' to analyzer team labels (see `team_sides`). Without
+    it the team rows are left untouched, since the labels alone do not say which team
+    is which. Returns a summary, or None when the match has no player tracking data.
+    """
+    player_columns = tracking_store.read(match_id, 'players')
+    if player_columns is None or 'player_id' not in player_columns:
+        return None
+    players = compute_player_analytics(player_columns)
+    if not sides:
+        print(f"Warning: no home/away mapping for the analyzer team labels of match {match_id}; skipping team analytics")
+        return {'players': len(players['player_ids']), 'teams': 0, 'skipped': 'no home/away team mapping'}
+    ball_columns = tracking_store.read(match_id, 'ball')
+    turnovers = compute_turnovers(ball_columns, players['player_ids'], players['team']) if ball_columns else {}
+
+    service = MatchTeamStatisticsService(db_connection)
+    team_ids = service.get_match_team_ids(match_id)
+    if team_ids is None:
+        return None
+    try:
+        for team_id, label in zip(team_ids, (sides['home'], sides['away'])):
+            service.upsert_team_json_fields(match_id, team_id, build_team_analytics(players, turnovers, label), commit=False)
+        db_connection.commit()
+    except Exception:
+        db_connection.rollback()
+        raise
+    invalidate_match_details(match_id)
+    return {'players': len(players['player_ids']), 'teams': len(team_ids)}
@@ -0,0 +1,285 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+TRACKING_DIR = os.environ.get('TRACKING_DIR', './tracking_data')
+TRACKING_FORMAT_VERSION = 1
+# Frame indexes kept in memory (one per match and entity).
+TRACKING_INDEX_CACHE_SIZE = int(os.environ.get('TRACKING_INDEX_CACHE_SIZE', '64'))
+
+# Stored columns per entity with their on-disk dtype. Positions and times fit float32
+# and speeds float16; id columns are narrowed further to the smallest integer type
+# that holds their values. Columns missing from the analyzer output are skipped.
+TRACKING_COLUMNS = {
+    'ball': {
+        'frame': np.int32,
+        'timestamp': np.float32,
+        'x': np.float32,
+        'y': np.float32,
+        'speed': np.float16,
+        'possession_player_id': None,
+    },
+    'players': {
+        'frame': np.int32,
+        'timestamp': np.float32,
+        'player_id': None,
+        'team_id': None,
+        'x': np.float32,
+        'y': np.float32,
+        'speed': np.float16,
+    },
+}
+
+
+def _narrow_int_dtype(values: np.ndarray) -> np.dtype:
+    if values.dtype.kind not in 'iu':
+        return values.dtype
+    low, high = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _track_columns(table: np.ndarray, entity: str) -> Optional[Dict[str, np.ndarray]]:
+    """Frame-ordered tracking columns from an analyzer table, or None without per-frame positions."""
+    names = table.dtype.names or ()
+    if not all(column in names for column in ('frame', 'x', 'y')):
+        return None
+    rows = table[table['frame'] >= 0]
+    # Stable sort keeps the analyzer's order within a frame.
+    rows = rows[np.argsort(rows['frame'], kind='stable')]
+    columns = {}
+    for name, dtype in TRACKING_COLUMNS[entity].items():
+        if name not in names:
+            continue
+        values = rows[name]
+        if values.dtype.kind not in 'iuf':
+            continue
+        columns[name] = values.astype(dtype or _narrow_int_dtype(values))
+    return columns
+
+
+def _build_frame_index(frames: np.ndarray, timestamps: Optional[np.ndarray]) -> np.ndarray:
+    """One entry per distinct frame: the frame, its first row and that row's timestamp."""
+    starts = np.flatnonzero(np.r_[True, frames[1:] != frames[:-1]]) if len(frames) else np.empty(0, dtype=np.int64)
+    index = np.empty(len(starts), dtype=[('frame', np.int32), ('row', np.int64), ('timestamp', np.float32)])
+    index['frame'] = frames[starts]
+    index['row'] = starts
+    index['timestamp'] = timestamps[starts] if timestamps is not None else np.nan
+    return index
+
+
+def _data_offset(path: str) -> Tuple[int, np.dtype]:
+    """Byte offset of the array data in a `.npy` file, and its dtype."""
+    with open(path, 'rb') as handle:
+        version = np.lib.format.read_magic(handle)
+        if version == (1, 0):
+            _, _, dtype = np.lib.format.read_array_header_1_0(handle)
+        else:
+            _, _, dtype = np.lib.format.read_array_header_2_0(handle)
+        return handle.tell(), dtype
+
+
+class _EntityIndex:
+    __slots__ = ('created_at', 'frames', 'rows', 'timestamps', 'total_rows', 'columns')
+
+    def __init__(self, created_at: float, index: np.ndarray, total_rows: int, columns: Dict[str, Tuple[int, np.dtype]]):
+        self.created_at = created_at
+        self.frames = index['frame']
+        self.rows = index['row']
+        self.timestamps = index['timestamp']
+        self.total_rows = total_rows
+        self.columns = columns
+
+    def row_range(self, start_frame: Optional[int], end_frame: Optional[int]) -> Tuple[int, int]:
+        lo = 0 if start_frame is None else int(np.searchsorted(self.frames, start_frame, side='left'))
+        hi = len(self.frames) if end_frame is None else int(np.searchsorted(self.frames, end_frame, side='right'))
+        start_row = int(self.rows[lo]) if lo < len(self.rows) else self.total_rows
+        end_row = int(self.rows[hi]) if hi < len(self.rows) else self.total_rows
+        return start_row, max(start_row, end_row)
+
+    def frame_at(self, seconds: float, side: str) -> Optional[int]:
+        """First frame at or after `seconds` (side='left') or last frame at or before it (side='right').
+
+        None when there are no frames. Raises ValueError when the frames have no
+        timestamps, rather than silently returning the unbounded window.
+        """
+        if not len(self.frames):
+            return None
+        if np.isnan(self.timestamps).all():
+            raise ValueError("Tracking data for this match has no timestamps; filter by start_frame/end_frame instead of seconds")
+        position = int(np.searchsorted(self.timestamps, seconds, side=side))
+        if side == 'left':
+            return int(self.frames[position]) if position < len(self.frames) else int(self.frames[-1]) + 1
+        return int(self.frames[position - 1]) if position > 0 else int(self.frames[0]) - 1
+
+
+class TrackingStore:
+    """Frame-level ball and player positions per match, one `.npy` file per column.
+
+    A match directory holds `ball/` and `players/`, each with rows sorted by frame,
+    an `index.npy` mapping every frame (and its timestamp) to its first row, and a
+    `meta.json` describing them. A read looks the window up in the index and maps
+    only that byte range of each column file.
+    """
+
+    def __init__(self, directory: str, index_cache_size: int = TRACKING_INDEX_CACHE_SIZE):
+        self.directory = directory
+        self.index_cache_size = max(1, index_cache_size)
+        self._lock = threading.Lock()
+        self._indexes: 'OrderedDict[Tuple[str, str], _EntityIndex]' = OrderedDict()
+
+    def _match_dir(self, match_id: str) -> str:
+        if not match_id or os.sep in match_id or match_id.startswith('.'):
+            raise ValueError(f"Invalid match id for tracking store: {match_id!r}")
+        return os.path.join(self.directory, match_id)
+
+    def write(self, match_id: str, player_table: np.ndarray, ball_table: np.ndarray) -> Dict:
+        """Replace the match's tracking data; returns rows and bytes written per entity."""
+        match_dir = self._match_dir(match_id)
+        os.makedirs(self.directory, exist_ok=True)
+        staging = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        summary = {}
+        try:
+            for entity, table in (('ball', ball_table), ('players', player_table)):
+                columns = _track_columns(table, entity)
+                if columns is None:
+                    continue
+                entity_dir = os.path.join(staging, entity)
+                os.makedirs(entity_dir)
+                for name, values in columns.items():
+                    np.save(os.path.join(entity_dir, f"{name}.npy"), values)
+                frames = columns['frame']
+                np.save(os.path.join(entity_dir, 'index.npy'), _build_frame_index(frames, columns.get('timestamp')))
+                meta = {
+                    'version': TRACKING_FORMAT_VERSION,
+                    'match_id': match_id,
+                    'rows': int(len(frames)),
+                    'first_frame': int(frames[0]) if len(frames) else None,
+                    'last_frame': int(frames[-1]) if len(frames) else None,
+                    'columns': {name: values.dtype.str for name, values in columns.items()},
+                    'created_at': time.time(),
+                }
+                with open(os.path.join(entity_dir, 'meta.json'), 'w') as handle:
+                    json.dump(meta, handle)
+                summary[entity] = {'rows': meta['rows'], 'bytes': sum(values.nbytes for values in columns.values())}
+            if not summary:
+                shutil.rmtree(staging, ignore_errors=True)
+                return summary
+            # Swap directories so readers see either the old data or the new, never a mix.
+            with self._lock:
+                previous = None
+                if os.path.exists(match_dir):
+                    previous = os.path.join(self.directory, f".old-{uuid.uuid4().hex}")
+                    os.rename(match_dir, previous)
+                os.rename(staging, match_dir)
+            if previous:
+                shutil.rmtree(previous, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return summary
+
+    def meta(self, match_id: str, entity: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self._match_dir(match_id), entity, 'meta.json')) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def _index(self, match_id: str, entity: str) -> Optional[_EntityIndex]:
+        meta = self.meta(match_id, entity)
+        if meta is None:
+            return None
+        key = (match_id, entity)
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached.created_at == meta['created_at']:
+                self._indexes.move_to_end(key)
+                return cached
+        entity_dir = os.path.join(self._match_dir(match_id), entity)
+        index_path = os.path.join(entity_dir, 'index.npy')
+        if os.path.exists(index_path):
+            index = np.load(index_path)
+        else:
+            timestamps = np.load(os.path.join(entity_dir, 'timestamp.npy')) if 'timestamp' in meta['columns'] else None
+            index = _build_frame_index(np.load(os.path.join(entity_dir, 'frame.npy')), timestamps)
+        columns = {name: _data_offset(os.path.join(entity_dir, f"{name}.npy")) for name in meta['columns']}
+        entry = _EntityIndex(meta['created_at'], index, meta['rows'], columns)
+        with self._lock:
+            self._indexes[key] = entry
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.index_cache_size:
+                self._indexes.popitem(last=False)
+        return entry
+
+    def read(self, match_id: str, entity: str, start_frame: Optional[int] = None, end_frame: Optional[int] = None,
+             columns: Optional[Iterable[str]] = None, start_time: Optional[float] = None,
+             end_time: Optional[float] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-mapped views of `entity` rows with `start_frame <= frame <= end_frame`.
+
+        `start_time`/`end_time` (seconds) narrow the window further through the
+        timestamp index; they raise ValueError when the rows have no timestamps.
+        Returns None when the match has no tracking data for `entity`. The arrays are read-only; copy them to keep them past a rewrite.
+        """
+        index = self._index(match_id, entity)
+        if index is None:
+            return None
+        if start_time is not None:
+            frame = index.frame_at(start_time, 'left')
+            start_frame = frame if start_frame is None or frame is None else max(start_frame, frame)
+        if end_time is not None:
+            frame = index.frame_at(end_time, 'right')
+            end_frame = frame if end_frame is None or frame is None else min(end_frame, frame)
+        start_row, end_row = index.row_range(start_frame, end_frame)
+        entity_dir = os.path.join(self._match_dir(match_id), entity)
+        window = {}
+        for name in (columns or index.columns):
+            if name not in index.columns:
+                continue
+            offset, dtype = index.columns[name]
+            if end_row == start_row:
+                window[name] = np.empty(0, dtype=dtype)
+                continue
+            window[name] = np.memmap(os.path.join(entity_dir, f"{name}.npy"), dtype=dtype, mode='r',
+                                     offset=offset + start_row * dtype.itemsize, shape=(end_row - start_row,))
+        return window
+
+    def query(self, match_id: str, entity: str, start_frame: Optional[int] = None, end_frame: Optional[int] = None,
+              start_time: Optional[float] = None, end_time: Optional[float] = None,
+              player_ids: Optional[Sequence[int]] = None, step: int = 1,
+              columns: Optional[Iterable[str]] = None) -> Optional[Dict[str, np.ndarray]]:
+        """`read` plus filtering to `player_ids` and keeping every `step`-th frame of the window.
+
+        Without filters the memory-mapped views are returned as they are.
+        """
+        columns = list(columns) if columns else None
+        needed = None if columns is None else set(columns) | {'frame'} | ({'player_id'} if player_ids else set())
+        window = self.read(match_id, entity, start_frame, end_frame, needed, start_time, end_time)
+        if window is None or (not player_ids and step <= 1):
+            return window
+        keep = np.ones(len(window['frame']), dtype=bool)
+        if player_ids:
+            if 'player_id' not in window:
+                raise ValueError(f"{entity} tracking data has no player ids")
+            keep &= np.isin(window['player_id'], np.asarray(player_ids))
+        if step > 1 and len(window['frame']):
+            keep &= (window['frame'] - window['frame'][0]) % step == 0
+        return {name: values[keep] for name, values in window.items() if columns is None or name in columns}
+
+    def delete(self, match_id: str):
+        shutil.rmtree(self._match_dir(match_id), ignore_errors=True)
+        with self._lock:
+            for entity in TRACKING_COLUMNS:
+                self._indexes.pop((match_id, entity), None)
+
+
+tracking_store = TrackingStore(TRACKING_DIR)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'src')
+
+# The API modules import each other from the flat src/ layout.
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
@@ -0,0 +1,56 @@
+"""In-memory stand-ins for a PyMySQL connection that record every query."""
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+Responder = Callable[[str, Any], List[dict]]
+
+
+class RecordingCursor:
+    def __init__(self, conn: 'RecordingConnection'):
+        self.conn = conn
+        self.rows: List[dict] = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None):
+        self.conn.queries.append((sql, params))
+        self.rows = list(self.conn.responder(sql, params))
+        self.rowcount = len(self.rows)
+
+    def executemany(self, sql: str, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        self.conn.queries.append((sql, seq_of_params))
+        for params in seq_of_params:
+            self.conn.responder(sql, params)
+        self.rowcount = len(seq_of_params)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    """Answers each query with `responder(sql, params)` (a list of dict rows)."""
+
+    def __init__(self, responder: Responder = lambda sql, params: []):
+        self.responder = responder
+        self.queries: List[Tuple[str, Any]] = []
+        self.commits = 0
+
+    def cursor(self, cursorclass=None) -> RecordingCursor:
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
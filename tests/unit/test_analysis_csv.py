@@ -0,0 +1,144 @@
+import json
+import os
+
+import numpy as np
+import pymysql
+
+import analysis_engine
+from analysis_engine import PLAYER_METRICS_SCHEMA, _int_column, _read_metrics_csv, parse_and_persist_results
+from fakes import RecordingConnection
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'analyzer')
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_clean_file_is_typed_from_the_schema(tmp_path):
+    path = _write(tmp_path, 'player_metrics.csv', "frame,player_id,shots,rating\n1,7,2,6.5\n2,9,0,7.0\n")
+
+    table = _read_metrics_csv(path, PLAYER_METRICS_SCHEMA)
+
+    assert table['shots'].dtype == np.int32
+    assert table['shots'].tolist() == [2, 0]
+    assert table['rating'].tolist() == [6.5, 7.0]
+
+
+def test_float_written_and_empty_cells_in_integer_column(tmp_path):
+    path = _write(tmp_path, 'player_metrics.csv', "player_id,shots,passes\n7,2.0,10\n9,,\n")
+
+    table = _read_metrics_csv(path, PLAYER_METRICS_SCHEMA)
+
+    assert table['shots'].tolist() == [2, 0]
+    assert table['passes'].tolist() == [10, 0]
+    assert _int_column(table, 'shots') == [2, 0]
+
+
+def test_quoted_fields_keep_their_commas(tmp_path):
+    path = _write(tmp_path, 'player_metrics.csv', 'player_id,shots,label\n7,1,"left, wide"\n9,3,centre\n')
+
+    table = _read_metrics_csv(path, PLAYER_METRICS_SCHEMA)
+
+    assert table['label'].tolist() == ['left, wide', 'centre']
+    assert table['shots'].tolist() == [1, 3]
+
+
+def test_text_in_numeric_column_does_not_abort_conversion(tmp_path):
+    path = _write(tmp_path, 'player_metrics.csv', "player_id,shots\n7,n/a\n9,4\n")
+
+    table = _read_metrics_csv(path, PLAYER_METRICS_SCHEMA)
+
+    assert _int_column(table, 'shots') == [0, 4]
+
+
+def test_persist_accepts_float_written_and_empty_counts(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_engine, 'invalidate_match_details', lambda *match_ids: None)
+    _write(tmp_path, 'player_metrics.csv',
+           'player_id,team_side,jersey_number,shots,passes,note\n7,home,9.0,2.0,,"a,b"\n9,away,1,,5,c\n')
+    _write(tmp_path, 'ball_metrics.csv', "frame,x,y\n1,0.5,0.5\n")
+    conn = RecordingConnection(_Schema())
+
+    summary = parse_and_persist_results(str(tmp_path), conn, _Schema.MATCH)
+
+    assert summary['player_rows'] == 2
+    inserts = [params for sql, params in conn.queries if 'INSERT INTO player_match_statistics' in sql]
+    assert inserts, 'player statistics were not persisted'
+    rows = [row for batch in inserts for row in (batch if isinstance(batch, list) else [batch])]
+    assert json.loads(rows[0][-2])['note'] == 'a,b'
+
+
+class _Schema:
+    """Responder enforcing the foreign keys of the rows the analyzer output is stored in."""
+
+    USER, MATCH, HOME, AWAY = 'user-1', 'match-1', 'team-home', 'team-away'
+    PLAYERS = [('player-9', HOME, 9), ('player-1', AWAY, 1), ('player-4', AWAY, 4), ('player-4b', AWAY, 4)]
+
+    def __call__(self, sql, params):
+        if sql.startswith('SELECT p.id, p.jersey_number'):
+            assert params == (self.MATCH,)
+            return [{'id': pid, 'jersey_number': number, 'side': 'home' if team == self.HOME else 'away'}
+                    for pid, team, number in self.PLAYERS]
+        if sql.startswith('INSERT INTO analysis_reports'):
+            self._reference('matches', params[1], {self.MATCH})
+            if params[5] is not None:
+                self._reference('users', params[5], {self.USER})
+        elif sql.startswith('INSERT INTO player_match_statistics'):
+            self._reference('matches', params[1], {self.MATCH})
+            self._reference('players', params[2], {pid for pid, _, _ in self.PLAYERS})
+        return []
+
+    @staticmethod
+    def _reference(table, value, keys):
+        if value not in keys:
+            raise pymysql.err.IntegrityError(1452, f"Cannot add or update a child row: {value!r} not in {table}")
+
+
+def test_persist_stores_analyzer_rows_under_squad_players(monkeypatch):
+    monkeypatch.setattr(analysis_engine, 'invalidate_match_details', lambda *match_ids: None)
+    conn = RecordingConnection(_Schema())
+
+    summary = parse_and_persist_results(FIXTURES, conn, _Schema.MATCH, generated_by=_Schema.USER)
+
+    assert summary['player_rows'] == 8
+    assert summary['persisted_rows'] == 4
+    # Tracker 12 has no side or number and #99 is not in the home squad.
+    assert summary['unmapped_player_rows'] == 4
+    inserted = [row for sql, rows in conn.queries if sql.startswith('INSERT INTO player_match_statistics') for row in rows]
+    assert sorted(row[2] for row in inserted) == ['player-1', 'player-1', 'player-9', 'player-9']
+    assert json.loads(inserted[0][-2])['player_id'] in (3, 7)
+    assert conn.commits == 1
+
+
+def test_persist_without_squad_numbers_stores_only_the_report(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_engine, 'invalidate_match_details', lambda *match_ids: None)
+    _write(tmp_path, 'player_metrics.csv', "frame,player_id,team_id,shots\n1,3,0,1\n1,7,1,0\n")
+    _write(tmp_path, 'ball_metrics.csv', "frame,x,y\n1,0.5,0.5\n")
+    conn = RecordingConnection(_Schema())
+
+    summary = parse_and_persist_results(str(tmp_path), conn, _Schema.MATCH)
+
+    assert summary['persisted_rows'] == 0
+    assert summary['unmapped_player_rows'] == 2
+    assert [sql.split(' (')[0] for sql, _ in conn.queries if sql.startswith('INSERT')] == ['INSERT INTO analysis_reports']
+
+
+def test_undeclared_text_columns_are_not_truncated(tmp_path):
+    comment = ' '.join(['pressed high and won the ball back'] * 5)
+    path = _write(tmp_path, 'player_metrics.csv', f"player_id,comment\n7,short\n9,{comment}\n")
+
+    table = _read_metrics_csv(path, PLAYER_METRICS_SCHEMA)
+
+    assert table['comment'].tolist() == ['short', comment]
+
+
+def test_missing_cells_of_undeclared_columns_become_none_in_records(tmp_path):
+    path = _write(tmp_path, 'player_metrics.csv', "player_id,duels,zone,xt\n7,3,left,0.5\n9,,,\n")
+
+    table = _read_metrics_csv(path, PLAYER_METRICS_SCHEMA)
+    records = analysis_engine._table_records(table, PLAYER_METRICS_SCHEMA)
+
+    assert records[0] == {'player_id': 7, 'duels': 3, 'zone': 'left', 'xt': 0.5}
+    assert records[1] == {'player_id': 9, 'duels': None, 'zone': None, 'xt': None}
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+from fakes import RecordingConnection
+from services.match_service import MatchService
+
+HOME, AWAY = 'team-home', 'team-away'
+
+
+def _responder(lineup_size: int):
+    lineups = [
+        dict(id=f'lineup-{i}', match_id='match-1', team_id=HOME if i % 2 == 0 else AWAY,
+             formation_id='formation-home' if i % 2 == 0 else 'formation-away',
+             is_starting=True, player_id=f'player-{i}', position_in_formation='CM')
+        for i in range(lineup_size)
+    ]
+
+    def respond(sql, params):
+        if 'FROM matches m' in sql and 'ht.name' in sql:
+            return [dict(id='match-1', home_team_id=HOME, away_team_id=AWAY, date_time=datetime(2026, 5, 1, 18),
+                         venue=None, event_id=None, status='completed', home_score=2, away_score=1,
+                         home_team_name='Home', away_team_name='Away', event_name=None)]
+        if 'FROM match_lineups' in sql:
+            return lineups
+        if 'FROM players' in sql:
+            return [dict(id=lu['player_id'], team_id=lu['team_id'], name=lu['player_id'])
+                    for lu in lineups if lu['player_id'] in params[0]]
+        if 'FROM formations' in sql:
+            return [dict(id=fid, name=fid, positions='[]', created_at=datetime(2026, 1, 1)) for fid in params[0]]
+        return []
+    return respond
+
+
+def _details(lineup_size: int):
+    conn = RecordingConnection(_responder(lineup_size))
+    details = MatchService(conn).get_match_details('match-1', [HOME], 'user-1')
+    return details, conn.queries
+
+
+@pytest.mark.parametrize('lineup_size', [2, 22, 60])
+def test_match_details_query_count_does_not_grow_with_lineup(lineup_size):
+    _, baseline_queries = _details(1)
+    details, queries = _details(lineup_size)
+
+    assert len(queries) == len(baseline_queries)
+    assert len(details.home_lineup.players) + len(details.away_lineup.players) == lineup_size
+
+
+def test_match_details_without_lineups_skips_player_and_formation_queries():
+    details, queries = _details(0)
+
+    assert not any('FROM players' in sql or 'FROM formations' in sql for sql, _ in queries)
+    assert details.home_lineup.players == [] and details.home_lineup.formation is None
+
+
+def test_match_details_loads_players_and_formations_in_one_query_each():
+    details, queries = _details(22)
+
+    assert sum('FROM players' in sql for sql, _ in queries) == 1
+    assert sum('FROM formations' in sql for sql, _ in queries) == 1
+    assert details.home_lineup.formation.id == 'formation-home'
+    assert details.away_lineup.formation.id == 'formation-away'
+    assert details.home_lineup.players[0].position_in_formation == 'CM'
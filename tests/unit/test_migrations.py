@@ -0,0 +1,122 @@
+import os
+
+import pymysql
+import pytest
+
+import migrations
+from fakes import RecordingConnection
+from migrations import MIGRATIONS_DIR, MigrationError, backfill, discover, split_sql
+
+
+def test_split_sql_drops_comments_and_splits_on_trailing_semicolons():
+    text = """-- header comment
+CREATE TABLE t (
+    a INT,
+    note VARCHAR(10) DEFAULT 'x;y'
+);
+
+-- second
+ALTER TABLE t ADD COLUMN b INT, ALGORITHM=INSTANT;
+DROP TABLE u"""
+
+    assert split_sql(text) == [
+        "CREATE TABLE t (\n    a INT,\n    note VARCHAR(10) DEFAULT 'x;y'\n)",
+        "ALTER TABLE t ADD COLUMN b INT, ALGORITHM=INSTANT",
+        "DROP TABLE u",
+    ]
+
+
+def test_discover_orders_versions_and_pairs_up_and_down(tmp_path):
+    for filename in ('V0002__add_b.up.sql', 'V0001__init.up.sql', 'V0001__init.down.sql', 'V0003__fill.py', 'README.md'):
+        (tmp_path / filename).write_text('')
+
+    found = discover(str(tmp_path))
+
+    assert [(m.version, m.name) for m in found] == [(1, 'init'), (2, 'add_b'), (3, 'fill')]
+    assert os.path.basename(found[0].down_path) == 'V0001__init.down.sql'
+    assert found[1].down_path is None
+    assert found[2].is_python and found[2].down_path == found[2].up_path
+
+
+@pytest.mark.parametrize('filenames, error', [
+    (['V0001__a.up.sql', 'V0001__b.up.sql'], 'used by both'),
+    (['V0001__a.down.sql'], 'no up migration'),
+    (['V0001__a.sql'], '.up.sql/.down.sql'),
+])
+def test_discover_rejects_ambiguous_directories(tmp_path, filenames, error):
+    for filename in filenames:
+        (tmp_path / filename).write_text('')
+
+    with pytest.raises(MigrationError, match=error):
+        discover(str(tmp_path))
+
+
+def test_shipped_migrations_have_up_and_down_scripts():
+    found = discover(MIGRATIONS_DIR)
+
+    assert [m.version for m in found] == list(range(1, len(found) + 1))
+    for migration in found:
+        assert migration.down_path is not None
+        with open(migration.up_path) as f:
+            assert split_sql(f.read())
+
+
+class _Table:
+    """Responder keeping a table of ids plus the `schema_backfills` state in memory."""
+
+    def __init__(self, ids, fail_on_chunk=None):
+        self.ids = sorted(ids)
+        self.updated = []
+        self.state = {}
+        self.chunks = 0
+        self.fail_on_chunk = fail_on_chunk
+
+    def __call__(self, sql, params):
+        sql = ' '.join(sql.split())
+        if sql.startswith('CREATE TABLE IF NOT EXISTS'):
+            return []
+        if sql.startswith('SELECT last_key'):
+            return [dict(self.state[params[0]])] if params[0] in self.state else []
+        if sql.startswith('INSERT INTO schema_backfills'):
+            self.state[params[0]] = {'last_key': '', 'rows_done': 0, 'finished_at': None}
+            return []
+        if sql.startswith('SELECT table_rows'):
+            return [{'table_rows': len(self.ids)}]
+        if sql.startswith('SELECT id FROM items'):
+            after = [key for key in self.ids if key > params[0]]
+            return [{'id': after[params[1]]}] if len(after) > params[1] else []
+        if sql.startswith('SELECT COUNT(*)'):
+            return [{'n': sum(key > params[0] for key in self.ids)}]
+        if sql.startswith('UPDATE items'):
+            self.chunks += 1
+            if self.chunks == self.fail_on_chunk:
+                raise pymysql.err.OperationalError(2013, 'Lost connection to MySQL server during query')
+            lower, upper = (params[-2], params[-1]) if 'id <=' in sql else (params[-1], None)
+            self.updated += [key for key in self.ids if key > lower and (upper is None or key <= upper)]
+            return []
+        if sql.startswith('UPDATE schema_backfills SET last_key'):
+            self.state[params[2]].update(last_key=params[0], rows_done=params[1])
+            return []
+        if sql.startswith('UPDATE schema_backfills SET rows_done'):
+            self.state[params[1]].update(rows_done=params[0], finished_at='now')
+            return []
+        raise AssertionError(f"Unexpected query: {sql}")
+
+
+def test_backfill_resumes_after_the_last_finished_chunk(monkeypatch):
+    monkeypatch.setattr(migrations.time, 'sleep', lambda seconds: None)
+    table = _Table([f'{i:03d}' for i in range(25)], fail_on_chunk=2)
+    conn = RecordingConnection(table)
+
+    with pytest.raises(pymysql.err.OperationalError):
+        backfill(conn, 'fill_items', 'items', 'b = %s', params=(1,), batch_size=10, max_chunk_seconds=60, progress=None)
+    assert table.state['fill_items'] == {'last_key': '009', 'rows_done': 10, 'finished_at': None}
+
+    rows = backfill(conn, 'fill_items', 'items', 'b = %s', params=(1,), batch_size=10, max_chunk_seconds=60, progress=None)
+
+    assert rows == 25
+    assert sorted(table.updated) == table.ids
+    assert table.state['fill_items']['finished_at'] is not None
+    # A finished backfill is not run again.
+    assert backfill(conn, 'fill_items', 'items', 'b = %s', params=(1,), batch_size=10, progress=None) == 25
+    assert table.chunks == 4
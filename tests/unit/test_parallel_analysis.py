@@ -0,0 +1,67 @@
+import asyncio
+
+import numpy as np
+import parallel_analysis
+from parallel_analysis import VideoSegment, _reconcile_player_ids, analyze_in_segments
+
+
+def _players(ids, frames, xs):
+    table = np.empty(len(ids), dtype=[('frame', np.int32), ('player_id', np.int32), ('x', np.float64), ('y', np.float64)])
+    table['frame'], table['player_id'], table['x'], table['y'] = frames, ids, xs, 0.0
+    return table
+
+
+def test_reconcile_skips_segments_without_output():
+    first = _players([1, 2], [100, 100], [10.0, 50.0])
+    empty = np.empty(0, dtype=[])
+    third = _players([7, 8], [0, 0], [10.5, 90.0])
+    tables = [first, empty, third]
+
+    carried = _reconcile_player_ids(tables, [np.empty(0, dtype=[])] * 3)
+
+    assert carried == 1
+    assert tables[2]['player_id'].tolist() == [1, 3]
+
+
+def test_reconcile_widens_text_ids_instead_of_truncating():
+    tables = [np.array([('ab',)], dtype=[('player_id', 'U2')]), np.array([('cd',), ('ef',)], dtype=[('player_id', 'U2')])]
+
+    _reconcile_player_ids(tables, [])
+
+    assert tables[0]['player_id'].tolist() == ['ab']
+    assert tables[1]['player_id'].tolist() == ['s1_cd', 's1_ef']
+
+
+def test_failed_segment_cancels_and_awaits_the_others(monkeypatch, tmp_path):
+    async def probe(video_path):
+        return 1200.0, 25.0
+
+    async def split(video_path, segment_dir, segment_seconds, fps):
+        return [VideoSegment(f"seg_{i}.mp4", i * 400.0, 400.0, i * 10000) for i in range(3)]
+
+    monkeypatch.setattr(parallel_analysis, 'ANALYSIS_SEGMENTS', 3)
+    monkeypatch.setattr(parallel_analysis, 'ANALYSIS_SEGMENT_MIN_SECONDS', 300.0)
+    monkeypatch.setattr(parallel_analysis, 'probe_video', probe)
+    monkeypatch.setattr(parallel_analysis, 'split_video', split)
+    monkeypatch.setattr(parallel_analysis.shutil, 'which', lambda name: name)
+    stopped = []
+
+    async def run_segment(segment_path, segment_out, on_progress):
+        if segment_path == 'seg_1.mp4':
+            await asyncio.sleep(0.01)
+            raise RuntimeError('analyzer failed')
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.01)  # like run_analyzer killing and reaping its process
+            stopped.append(segment_path)
+            raise
+
+    async def analyze():
+        try:
+            await analyze_in_segments('match.mp4', str(tmp_path), run_segment)
+        except RuntimeError:
+            # The siblings must be gone before the caller cleans up their output.
+            return sorted(stopped)
+
+    assert asyncio.run(asyncio.wait_for(analyze(), 5)) == ['seg_0.mp4', 'seg_2.mp4']
@@ -0,0 +1,95 @@
+import json
+import uuid
+
+import numpy as np
+import pytest
+
+import tracking_analytics
+from fakes import RecordingConnection
+from tracking_store import TrackingStore
+
+HOME, AWAY = 'home-team', 'away-team'
+
+
+def _players(labels, sides):
+    """Two seconds of tracking for one player per analyzer label, moving 1 m per frame."""
+    table = np.zeros(len(labels) * 50, dtype=[('frame', np.int32), ('timestamp', np.float64), ('player_id', np.int32),
+                                              ('team_id', np.int32), ('team_side', 'U8'), ('x', np.float64), ('y', np.float64)])
+    for i, (label, side) in enumerate(zip(labels, sides)):
+        rows = table[i * 50:(i + 1) * 50]
+        rows['frame'] = np.arange(50)
+        rows['timestamp'] = np.arange(50) / 25
+        rows['player_id'] = i + 1
+        rows['team_id'] = label
+        rows['team_side'] = side
+        rows['x'] = 10 + np.arange(50) * 0.1
+        rows['y'] = 10
+    return table
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = TrackingStore(str(tmp_path))
+    monkeypatch.setattr(tracking_analytics, 'tracking_store', store)
+    monkeypatch.setattr(tracking_analytics, 'invalidate_match_details', lambda *match_ids: None)
+    return store
+
+
+def _connection():
+    def respond(sql, params):
+        if sql.startswith("SELECT home_team_id"):
+            return [{'home_team_id': HOME, 'away_team_id': AWAY}]
+        return []
+    return RecordingConnection(respond)
+
+
+def _written(conn):
+    """team_id -> physical_data of every team statistics row inserted."""
+    inserts = [params for sql, params in conn.queries if sql.startswith("INSERT")]
+    assert all(uuid.UUID(params[0]) for params in inserts)
+    return {params[2]: json.loads(params[3]) for params in inserts}
+
+
+def test_team_sides_follow_the_analyzer_column():
+    assert tracking_analytics.team_sides(_players([0, 1], ['away', 'home'])) == {'home': 1, 'away': 0}
+    assert tracking_analytics.team_sides(_players([0, 1], ['', ''])) is None
+    assert tracking_analytics.team_sides(_players([0, 0], ['home', 'away'])) is None
+
+
+def test_team_rows_follow_the_sides(store):
+    table = _players([0, 1, 1], ['away', 'home', 'home'])
+    store.write('match-1', table, np.empty(0, dtype=[]))
+    conn = _connection()
+
+    summary = tracking_analytics.persist_match_analytics(conn, 'match-1', tracking_analytics.team_sides(table))
+
+    assert summary == {'players': 3, 'teams': 2}
+    written = _written(conn)
+    assert sorted(written[HOME]['players']) == ['2', '3']
+    assert list(written[AWAY]['players']) == ['1']
+    assert conn.commits == 1
+
+
+def test_no_sides_skips_team_rows(store):
+    store.write('match-1', _players([0, 1], ['', '']), np.empty(0, dtype=[]))
+    conn = _connection()
+
+    summary = tracking_analytics.persist_match_analytics(conn, 'match-1', None)
+
+    assert summary['teams'] == 0
+    assert conn.queries == []
+
+
+def test_heatmaps_stay_out_of_team_statistics(store):
+    table = _players([0, 1], ['home', 'away'])
+    store.write('match-1', table, np.empty(0, dtype=[]))
+    conn = _connection()
+
+    tracking_analytics.persist_match_analytics(conn, 'match-1', tracking_analytics.team_sides(table))
+
+    assert 'heatmap' not in json.dumps(_written(conn))
+    players = tracking_analytics.compute_player_analytics(store.read('match-1', 'players'))
+    heatmaps = tracking_analytics.build_heatmaps(players)
+    assert set(heatmaps['players']) == {'1', '2'}
+    assert heatmaps['players']['1']['team'] == 0
+    assert np.sum(heatmaps['teams']['1']) == pytest.approx(49 / 25, abs=0.1)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from tracking_store import TrackingStore
+
+
+def _ball(frames, timestamps=None):
+    fields = [('frame', np.int32), ('x', np.float64), ('y', np.float64)]
+    if timestamps is not None:
+        fields.append(('timestamp', np.float64))
+    table = np.zeros(len(frames), dtype=fields)
+    table['frame'] = frames
+    if timestamps is not None:
+        table['timestamp'] = timestamps
+    return table
+
+
+def test_seconds_window_uses_timestamps(tmp_path):
+    store = TrackingStore(str(tmp_path))
+    store.write('match-1', np.empty(0, dtype=[]), _ball([0, 25, 50, 75], [0.0, 1.0, 2.0, 3.0]))
+
+    window = store.query('match-1', 'ball', start_time=1.0, end_time=2.0)
+
+    assert window['frame'].tolist() == [25, 50]
+
+
+def test_seconds_window_without_timestamps_is_rejected(tmp_path):
+    store = TrackingStore(str(tmp_path))
+    store.write('match-1', np.empty(0, dtype=[]), _ball([0, 25, 50]))
+
+    with pytest.raises(ValueError, match='no timestamps'):
+        store.query('match-1', 'ball', start_time=1.0)
+    with pytest.raises(ValueError, match='no timestamps'):
+        store.query('match-1', 'ball', end_time=2.0)
+    assert store.query('match-1', 'ball', start_frame=25)['frame'].tolist() == [25, 50]
+
+
+def test_seconds_window_on_empty_tracking(tmp_path):
+    store = TrackingStore(str(tmp_path))
+    store.write('match-1', np.empty(0, dtype=[]), _ball([]))
+
+    assert len(store.query('match-1', 'ball', start_time=1.0, end_time=2.0)['frame']) == 0